@@ -20,204 +20,211 @@
 
 import boto3
 import datetime
+import pyarrow.compute as pc
 from check_register import CheckRegister
-import json
+from credential_report import CredentialReport, older_than, select, unused_for
+from iam_inventory import IamInventory
+from policy_analyzer import PolicyAnalyzer
 
 registry = CheckRegister()
 # import boto3 clients
 iam = boto3.client("iam")
-# loop through IAM users
-def list_users(cache):
-    response = cache.get("list_users")
-    if response:
-        return response
-    cache["list_users"] = iam.list_users(MaxItems=1000)
-    return cache["list_users"]
+# users, groups, roles and policies are swept once per account and shared by every check
+iamInventory = IamInventory(iam)
+# key, password and MFA checks are evaluated from the credential report
+credentialReport = CredentialReport(iam)
+# least privilege ratings are memoized by document so a policy shared by many principals is analyzed once
+policyAnalyzer = PolicyAnalyzer()
+
+@registry.register_prefetch("iam")
+def generate_credential_report(awsAccountId: str, awsRegion: str, awsPartition: str):
+    credentialReport.start(awsAccountId)
 
 @registry.register_check("iam")
 def iam_access_key_age_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.1] IAM Access Keys should be rotated every 90 days"""
-    user = list_users(cache=cache)
-    for users in user["Users"]:
-        userName = str(users["UserName"])
-        userArn = str(users["Arn"])
+    try:
+        report = credentialReport.get(awsAccountId)
+    except Exception as e:
+        print(e)
+        return
+    # ISO Time
+    iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
+    # the credential report does not have key IDs, so keys are only listed for users it shows an active key for
+    activeKeys = pc.fill_null(pc.or_(report["access_key_1_active"], report["access_key_2_active"]), False)
+    for users in select(report, activeKeys):
+        keyUserName = str(users["user"])
+        userArn = str(users["arn"])
         try:
-            response = iam.list_access_keys(UserName=userName)
-            for keys in response["AccessKeyMetadata"]:
-                keyUserName = str(keys["UserName"])
-                keyId = str(keys["AccessKeyId"])
-                keyStatus = str(keys["Status"])
-                # ISO Time
-                iso8601Time = (
-                    datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
-                )
-                if keyStatus == "Active":
-                    keyCreateDate = keys["CreateDate"]
-                    todaysDatetime = datetime.datetime.now(datetime.timezone.utc)
-                    keyAgeFinder = todaysDatetime - keyCreateDate
-                    if keyAgeFinder <= datetime.timedelta(days=90):
-                        # this is a passing check
-                        finding = {
-                            "SchemaVersion": "2018-10-08",
-                            "Id": keyUserName + keyId + "/iam-access-key-age-check",
-                            "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
-                            "GeneratorId": userArn + keyId,
-                            "AwsAccountId": awsAccountId,
-                            "Types": [
-                                "Software and Configuration Checks/AWS Security Best Practices"
-                            ],
-                            "FirstObservedAt": iso8601Time,
-                            "CreatedAt": iso8601Time,
-                            "UpdatedAt": iso8601Time,
-                            "Severity": {"Label": "INFORMATIONAL"},
-                            "Confidence": 99,
-                            "Title": "[IAM.1] IAM Access Keys should be rotated every 90 days",
-                            "Description": "IAM access key "
-                            + keyId
-                            + " for user "
-                            + keyUserName
-                            + " is not over 90 days old.",
-                            "Remediation": {
-                                "Recommendation": {
-                                    "Text": "For information on IAM access key rotation refer to the Rotating Access Keys section of the AWS IAM User Guide",
-                                    "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_access-keys.html#Using_RotateAccessKey",
-                                }
-                            },
-                            "ProductFields": {"Product Name": "ElectricEye"},
-                            "Resources": [
-                                {
-                                    "Type": "AwsIamAccessKey",
-                                    "Id": userArn,
-                                    "Partition": awsPartition,
-                                    "Region": awsRegion,
-                                    "Details": {
-                                        "AwsIamAccessKey": {
-                                            "PrincipalId": keyId,
-                                            "PrincipalName": keyUserName,
-                                            "Status": keyStatus,
-                                        }
-                                    },
-                                }
-                            ],
-                            "Compliance": {
-                                "Status": "PASSED",
-                                "RelatedRequirements": [
-                                    "NIST CSF PR.AC-1",
-                                    "NIST SP 800-53 AC-1",
-                                    "NIST SP 800-53 AC-2",
-                                    "NIST SP 800-53 IA-1",
-                                    "NIST SP 800-53 IA-2",
-                                    "NIST SP 800-53 IA-3",
-                                    "NIST SP 800-53 IA-4",
-                                    "NIST SP 800-53 IA-5",
-                                    "NIST SP 800-53 IA-6",
-                                    "NIST SP 800-53 IA-7",
-                                    "NIST SP 800-53 IA-8",
-                                    "NIST SP 800-53 IA-9",
-                                    "NIST SP 800-53 IA-10",
-                                    "NIST SP 800-53 IA-11",
-                                    "AICPA TSC CC6.1",
-                                    "AICPA TSC CC6.2",
-                                    "ISO 27001:2013 A.9.2.1",
-                                    "ISO 27001:2013 A.9.2.2",
-                                    "ISO 27001:2013 A.9.2.3",
-                                    "ISO 27001:2013 A.9.2.4",
-                                    "ISO 27001:2013 A.9.2.6",
-                                    "ISO 27001:2013 A.9.3.1",
-                                    "ISO 27001:2013 A.9.4.2",
-                                    "ISO 27001:2013 A.9.4.3",
-                                ],
-                            },
-                            "Workflow": {"Status": "RESOLVED"},
-                            "RecordState": "ARCHIVED",
+            response = iam.list_access_keys(UserName=keyUserName)
+        except Exception as e:
+            print(e)
+            continue
+        for keys in response["AccessKeyMetadata"]:
+            keyId = str(keys["AccessKeyId"])
+            keyStatus = str(keys["Status"])
+            if keyStatus != "Active":
+                continue
+            keyAgeFinder = datetime.datetime.now(datetime.timezone.utc) - keys["CreateDate"]
+            if keyAgeFinder <= datetime.timedelta(days=90):
+                # this is a passing check
+                finding = {
+                    "SchemaVersion": "2018-10-08",
+                    "Id": keyUserName + keyId + "/iam-access-key-age-check",
+                    "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                    "GeneratorId": userArn + keyId,
+                    "AwsAccountId": awsAccountId,
+                    "Types": [
+                        "Software and Configuration Checks/AWS Security Best Practices"
+                    ],
+                    "FirstObservedAt": iso8601Time,
+                    "CreatedAt": iso8601Time,
+                    "UpdatedAt": iso8601Time,
+                    "Severity": {"Label": "INFORMATIONAL"},
+                    "Confidence": 99,
+                    "Title": "[IAM.1] IAM Access Keys should be rotated every 90 days",
+                    "Description": "IAM access key "
+                    + keyId
+                    + " for user "
+                    + keyUserName
+                    + " is not over 90 days old.",
+                    "Remediation": {
+                        "Recommendation": {
+                            "Text": "For information on IAM access key rotation refer to the Rotating Access Keys section of the AWS IAM User Guide",
+                            "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_access-keys.html#Using_RotateAccessKey",
                         }
-                        yield finding
-                    else:
-                        finding = {
-                            "SchemaVersion": "2018-10-08",
-                            "Id": keyUserName + keyId + "/iam-access-key-age-check",
-                            "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
-                            "GeneratorId": userArn + keyId,
-                            "AwsAccountId": awsAccountId,
-                            "Types": [
-                                "Software and Configuration Checks/AWS Security Best Practices"
-                            ],
-                            "FirstObservedAt": iso8601Time,
-                            "CreatedAt": iso8601Time,
-                            "UpdatedAt": iso8601Time,
-                            "Severity": {"Label": "MEDIUM"},
-                            "Confidence": 99,
-                            "Title": "[IAM.1] IAM Access Keys should be rotated every 90 days",
-                            "Description": "IAM access key "
-                            + keyId
-                            + " for user "
-                            + keyUserName
-                            + " is over 90 days old. As a security best practice, AWS recommends that you regularly rotate (change) IAM user access keys. If your administrator granted you the necessary permissions, you can rotate your own access keys. Refer to the remediation section to remediate this behavior.",
-                            "Remediation": {
-                                "Recommendation": {
-                                    "Text": "For information on IAM access key rotation refer to the Rotating Access Keys section of the AWS IAM User Guide",
-                                    "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_access-keys.html#Using_RotateAccessKey",
+                    },
+                    "ProductFields": {"Product Name": "ElectricEye"},
+                    "Resources": [
+                        {
+                            "Type": "AwsIamAccessKey",
+                            "Id": userArn,
+                            "Partition": awsPartition,
+                            "Region": awsRegion,
+                            "Details": {
+                                "AwsIamAccessKey": {
+                                    "PrincipalId": keyId,
+                                    "PrincipalName": keyUserName,
+                                    "Status": keyStatus,
                                 }
                             },
-                            "ProductFields": {"Product Name": "ElectricEye"},
-                            "Resources": [
-                                {
-                                    "Type": "AwsIamAccessKey",
-                                    "Id": userArn,
-                                    "Partition": awsPartition,
-                                    "Region": awsRegion,
-                                    "Details": {
-                                        "AwsIamAccessKey": {
-                                            "PrincipalId": keyId,
-                                            "PrincipalName": keyUserName,
-                                            "Status": keyStatus,
-                                        }
-                                    },
+                        }
+                    ],
+                    "Compliance": {
+                        "Status": "PASSED",
+                        "RelatedRequirements": [
+                            "NIST CSF PR.AC-1",
+                            "NIST SP 800-53 AC-1",
+                            "NIST SP 800-53 AC-2",
+                            "NIST SP 800-53 IA-1",
+                            "NIST SP 800-53 IA-2",
+                            "NIST SP 800-53 IA-3",
+                            "NIST SP 800-53 IA-4",
+                            "NIST SP 800-53 IA-5",
+                            "NIST SP 800-53 IA-6",
+                            "NIST SP 800-53 IA-7",
+                            "NIST SP 800-53 IA-8",
+                            "NIST SP 800-53 IA-9",
+                            "NIST SP 800-53 IA-10",
+                            "NIST SP 800-53 IA-11",
+                            "AICPA TSC CC6.1",
+                            "AICPA TSC CC6.2",
+                            "ISO 27001:2013 A.9.2.1",
+                            "ISO 27001:2013 A.9.2.2",
+                            "ISO 27001:2013 A.9.2.3",
+                            "ISO 27001:2013 A.9.2.4",
+                            "ISO 27001:2013 A.9.2.6",
+                            "ISO 27001:2013 A.9.3.1",
+                            "ISO 27001:2013 A.9.4.2",
+                            "ISO 27001:2013 A.9.4.3",
+                        ],
+                    },
+                    "Workflow": {"Status": "RESOLVED"},
+                    "RecordState": "ARCHIVED",
+                }
+                yield finding
+            else:
+                finding = {
+                    "SchemaVersion": "2018-10-08",
+                    "Id": keyUserName + keyId + "/iam-access-key-age-check",
+                    "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                    "GeneratorId": userArn + keyId,
+                    "AwsAccountId": awsAccountId,
+                    "Types": [
+                        "Software and Configuration Checks/AWS Security Best Practices"
+                    ],
+                    "FirstObservedAt": iso8601Time,
+                    "CreatedAt": iso8601Time,
+                    "UpdatedAt": iso8601Time,
+                    "Severity": {"Label": "MEDIUM"},
+                    "Confidence": 99,
+                    "Title": "[IAM.1] IAM Access Keys should be rotated every 90 days",
+                    "Description": "IAM access key "
+                    + keyId
+                    + " for user "
+                    + keyUserName
+                    + " is over 90 days old. As a security best practice, AWS recommends that you regularly rotate (change) IAM user access keys. If your administrator granted you the necessary permissions, you can rotate your own access keys. Refer to the remediation section to remediate this behavior.",
+                    "Remediation": {
+                        "Recommendation": {
+                            "Text": "For information on IAM access key rotation refer to the Rotating Access Keys section of the AWS IAM User Guide",
+                            "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_access-keys.html#Using_RotateAccessKey",
+                        }
+                    },
+                    "ProductFields": {"Product Name": "ElectricEye"},
+                    "Resources": [
+                        {
+                            "Type": "AwsIamAccessKey",
+                            "Id": userArn,
+                            "Partition": awsPartition,
+                            "Region": awsRegion,
+                            "Details": {
+                                "AwsIamAccessKey": {
+                                    "PrincipalId": keyId,
+                                    "PrincipalName": keyUserName,
+                                    "Status": keyStatus,
                                 }
-                            ],
-                            "Compliance": {
-                                "Status": "FAILED",
-                                "RelatedRequirements": [
-                                    "NIST CSF PR.AC-1",
-                                    "NIST SP 800-53 AC-1",
-                                    "NIST SP 800-53 AC-2",
-                                    "NIST SP 800-53 IA-1",
-                                    "NIST SP 800-53 IA-2",
-                                    "NIST SP 800-53 IA-3",
-                                    "NIST SP 800-53 IA-4",
-                                    "NIST SP 800-53 IA-5",
-                                    "NIST SP 800-53 IA-6",
-                                    "NIST SP 800-53 IA-7",
-                                    "NIST SP 800-53 IA-8",
-                                    "NIST SP 800-53 IA-9",
-                                    "NIST SP 800-53 IA-10",
-                                    "NIST SP 800-53 IA-11",
-                                    "AICPA TSC CC6.1",
-                                    "AICPA TSC CC6.2",
-                                    "ISO 27001:2013 A.9.2.1",
-                                    "ISO 27001:2013 A.9.2.2",
-                                    "ISO 27001:2013 A.9.2.3",
-                                    "ISO 27001:2013 A.9.2.4",
-                                    "ISO 27001:2013 A.9.2.6",
-                                    "ISO 27001:2013 A.9.3.1",
-                                    "ISO 27001:2013 A.9.4.2",
-                                    "ISO 27001:2013 A.9.4.3",
-                                ],
                             },
-                            "Workflow": {"Status": "NEW"},
-                            "RecordState": "ACTIVE",
                         }
-                        yield finding
-                else:
-                    pass
-        except Exception as e:
-            print(e)
+                    ],
+                    "Compliance": {
+                        "Status": "FAILED",
+                        "RelatedRequirements": [
+                            "NIST CSF PR.AC-1",
+                            "NIST SP 800-53 AC-1",
+                            "NIST SP 800-53 AC-2",
+                            "NIST SP 800-53 IA-1",
+                            "NIST SP 800-53 IA-2",
+                            "NIST SP 800-53 IA-3",
+                            "NIST SP 800-53 IA-4",
+                            "NIST SP 800-53 IA-5",
+                            "NIST SP 800-53 IA-6",
+                            "NIST SP 800-53 IA-7",
+                            "NIST SP 800-53 IA-8",
+                            "NIST SP 800-53 IA-9",
+                            "NIST SP 800-53 IA-10",
+                            "NIST SP 800-53 IA-11",
+                            "AICPA TSC CC6.1",
+                            "AICPA TSC CC6.2",
+                            "ISO 27001:2013 A.9.2.1",
+                            "ISO 27001:2013 A.9.2.2",
+                            "ISO 27001:2013 A.9.2.3",
+                            "ISO 27001:2013 A.9.2.4",
+                            "ISO 27001:2013 A.9.2.6",
+                            "ISO 27001:2013 A.9.3.1",
+                            "ISO 27001:2013 A.9.4.2",
+                            "ISO 27001:2013 A.9.4.3",
+                        ],
+                    },
+                    "Workflow": {"Status": "NEW"},
+                    "RecordState": "ACTIVE",
+                }
+                yield finding
 
 @registry.register_check("iam")
 def user_permission_boundary_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.2] IAM users should have permissions boundaries attached"""
-    user = list_users(cache=cache)
-    for users in user["Users"]:
+    inventory = iamInventory.get(awsAccountId)
+    for users in inventory.users:
         userName = str(users["UserName"])
         userArn = str(users["Arn"])
         # ISO Time
@@ -350,169 +357,159 @@ def user_permission_boundary_check(cache: dict, awsAccountId: str, awsRegion: st
 @registry.register_check("iam")
 def user_mfa_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.3] IAM users with passwords should have Multi-Factor Authentication (MFA) enabled"""
-    user = list_users(cache=cache)
-    for users in user["Users"]:
-        userName = str(users["UserName"])
-        userArn = str(users["Arn"])
-        # check if the user has a password
-        try:
-            pwCheck = str(users["PasswordLastUsed"])
-        except KeyError:
-            pwCheck = "False"
+    try:
+        report = credentialReport.get(awsAccountId)
+    except Exception as e:
+        print(e)
+        return
+    # only users with a console password are evaluated
+    for users in select(report, report["password_enabled"]):
+        userName = str(users["user"])
+        userArn = str(users["arn"])
         # ISO Time
         iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
-
-        if pwCheck != "False":
-            try:
-                response = iam.list_mfa_devices(UserName=userName)
-                if str(response["MFADevices"]) == "[]":
-                    finding = {
-                        "SchemaVersion": "2018-10-08",
-                        "Id": userArn + "/iam-user-mfa-check",
-                        "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
-                        "GeneratorId": userArn,
-                        "AwsAccountId": awsAccountId,
-                        "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
-                        "FirstObservedAt": iso8601Time,
-                        "CreatedAt": iso8601Time,
-                        "UpdatedAt": iso8601Time,
-                        "Severity": {"Label": "MEDIUM"},
-                        "Confidence": 99,
-                        "Title": "[IAM.3] IAM users should have Multi-Factor Authentication (MFA) enabled",
-                        "Description": "IAM user "
-                        + userName
-                        + " does not have MFA enabled. For increased security, AWS recommends that you configure multi-factor authentication (MFA) to help protect your AWS resources. Refer to the remediation section to remediate this behavior.",
-                        "Remediation": {
-                            "Recommendation": {
-                                "Text": "For information on MFA refer to the Using Multi-Factor Authentication (MFA) in AWS section of the AWS IAM User Guide",
-                                "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_mfa.html",
-                            }
-                        },
-                        "ProductFields": {"Product Name": "ElectricEye"},
-                        "Resources": [
-                            {
-                                "Type": "AwsIamUser",
-                                "Id": userArn,
-                                "Partition": awsPartition,
-                                "Region": awsRegion,
-                                "Details": {"Other": {"PrincipalName": userName}},
-                            }
-                        ],
-                        "Compliance": {
-                            "Status": "FAILED",
-                            "RelatedRequirements": [
-                                "NIST CSF PR.AC-1",
-                                "NIST SP 800-53 AC-1",
-                                "NIST SP 800-53 AC-2",
-                                "NIST SP 800-53 IA-1",
-                                "NIST SP 800-53 IA-2",
-                                "NIST SP 800-53 IA-3",
-                                "NIST SP 800-53 IA-4",
-                                "NIST SP 800-53 IA-5",
-                                "NIST SP 800-53 IA-6",
-                                "NIST SP 800-53 IA-7",
-                                "NIST SP 800-53 IA-8",
-                                "NIST SP 800-53 IA-9",
-                                "NIST SP 800-53 IA-10",
-                                "NIST SP 800-53 IA-11",
-                                "AICPA TSC CC6.1",
-                                "AICPA TSC CC6.2",
-                                "ISO 27001:2013 A.9.2.1",
-                                "ISO 27001:2013 A.9.2.2",
-                                "ISO 27001:2013 A.9.2.3",
-                                "ISO 27001:2013 A.9.2.4",
-                                "ISO 27001:2013 A.9.2.6",
-                                "ISO 27001:2013 A.9.3.1",
-                                "ISO 27001:2013 A.9.4.2",
-                                "ISO 27001:2013 A.9.4.3",
-                            ],
-                        },
-                        "Workflow": {"Status": "NEW"},
-                        "RecordState": "ACTIVE",
+        if not users["mfa_active"]:
+            finding = {
+                "SchemaVersion": "2018-10-08",
+                "Id": userArn + "/iam-user-mfa-check",
+                "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                "GeneratorId": userArn,
+                "AwsAccountId": awsAccountId,
+                "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
+                "FirstObservedAt": iso8601Time,
+                "CreatedAt": iso8601Time,
+                "UpdatedAt": iso8601Time,
+                "Severity": {"Label": "MEDIUM"},
+                "Confidence": 99,
+                "Title": "[IAM.3] IAM users should have Multi-Factor Authentication (MFA) enabled",
+                "Description": "IAM user "
+                + userName
+                + " does not have MFA enabled. For increased security, AWS recommends that you configure multi-factor authentication (MFA) to help protect your AWS resources. Refer to the remediation section to remediate this behavior.",
+                "Remediation": {
+                    "Recommendation": {
+                        "Text": "For information on MFA refer to the Using Multi-Factor Authentication (MFA) in AWS section of the AWS IAM User Guide",
+                        "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_mfa.html",
                     }
-                    yield finding
-                else:
-                    finding = {
-                        "SchemaVersion": "2018-10-08",
-                        "Id": userArn + "/iam-user-mfa-check",
-                        "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
-                        "GeneratorId": userArn,
-                        "AwsAccountId": awsAccountId,
-                        "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
-                        "FirstObservedAt": iso8601Time,
-                        "CreatedAt": iso8601Time,
-                        "UpdatedAt": iso8601Time,
-                        "Severity": {"Label": "INFORMATIONAL"},
-                        "Confidence": 99,
-                        "Title": "[IAM.3] IAM users should have Multi-Factor Authentication (MFA) enabled",
-                        "Description": "IAM user " + userName + " has MFA enabled.",
-                        "Remediation": {
-                            "Recommendation": {
-                                "Text": "For information on MFA refer to the Using Multi-Factor Authentication (MFA) in AWS section of the AWS IAM User Guide",
-                                "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_mfa.html",
-                            }
-                        },
-                        "ProductFields": {"Product Name": "ElectricEye"},
-                        "Resources": [
-                            {
-                                "Type": "AwsIamUser",
-                                "Id": userArn,
-                                "Partition": awsPartition,
-                                "Region": awsRegion,
-                                "Details": {"Other": {"PrincipalName": userName}},
-                            }
-                        ],
-                        "Compliance": {
-                            "Status": "PASSED",
-                            "RelatedRequirements": [
-                                "NIST CSF PR.AC-1",
-                                "NIST SP 800-53 AC-1",
-                                "NIST SP 800-53 AC-2",
-                                "NIST SP 800-53 IA-1",
-                                "NIST SP 800-53 IA-2",
-                                "NIST SP 800-53 IA-3",
-                                "NIST SP 800-53 IA-4",
-                                "NIST SP 800-53 IA-5",
-                                "NIST SP 800-53 IA-6",
-                                "NIST SP 800-53 IA-7",
-                                "NIST SP 800-53 IA-8",
-                                "NIST SP 800-53 IA-9",
-                                "NIST SP 800-53 IA-10",
-                                "NIST SP 800-53 IA-11",
-                                "AICPA TSC CC6.1",
-                                "AICPA TSC CC6.2",
-                                "ISO 27001:2013 A.9.2.1",
-                                "ISO 27001:2013 A.9.2.2",
-                                "ISO 27001:2013 A.9.2.3",
-                                "ISO 27001:2013 A.9.2.4",
-                                "ISO 27001:2013 A.9.2.6",
-                                "ISO 27001:2013 A.9.3.1",
-                                "ISO 27001:2013 A.9.4.2",
-                                "ISO 27001:2013 A.9.4.3",
-                            ],
-                        },
-                        "Workflow": {"Status": "RESOLVED"},
-                        "RecordState": "ARCHIVED",
+                },
+                "ProductFields": {"Product Name": "ElectricEye"},
+                "Resources": [
+                    {
+                        "Type": "AwsIamUser",
+                        "Id": userArn,
+                        "Partition": awsPartition,
+                        "Region": awsRegion,
+                        "Details": {"Other": {"PrincipalName": userName}},
                     }
-                    yield finding
-            except Exception as e:
-                print(e)
+                ],
+                "Compliance": {
+                    "Status": "FAILED",
+                    "RelatedRequirements": [
+                        "NIST CSF PR.AC-1",
+                        "NIST SP 800-53 AC-1",
+                        "NIST SP 800-53 AC-2",
+                        "NIST SP 800-53 IA-1",
+                        "NIST SP 800-53 IA-2",
+                        "NIST SP 800-53 IA-3",
+                        "NIST SP 800-53 IA-4",
+                        "NIST SP 800-53 IA-5",
+                        "NIST SP 800-53 IA-6",
+                        "NIST SP 800-53 IA-7",
+                        "NIST SP 800-53 IA-8",
+                        "NIST SP 800-53 IA-9",
+                        "NIST SP 800-53 IA-10",
+                        "NIST SP 800-53 IA-11",
+                        "AICPA TSC CC6.1",
+                        "AICPA TSC CC6.2",
+                        "ISO 27001:2013 A.9.2.1",
+                        "ISO 27001:2013 A.9.2.2",
+                        "ISO 27001:2013 A.9.2.3",
+                        "ISO 27001:2013 A.9.2.4",
+                        "ISO 27001:2013 A.9.2.6",
+                        "ISO 27001:2013 A.9.3.1",
+                        "ISO 27001:2013 A.9.4.2",
+                        "ISO 27001:2013 A.9.4.3",
+                    ],
+                },
+                "Workflow": {"Status": "NEW"},
+                "RecordState": "ACTIVE",
+            }
+            yield finding
         else:
-            continue
+            finding = {
+                "SchemaVersion": "2018-10-08",
+                "Id": userArn + "/iam-user-mfa-check",
+                "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                "GeneratorId": userArn,
+                "AwsAccountId": awsAccountId,
+                "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
+                "FirstObservedAt": iso8601Time,
+                "CreatedAt": iso8601Time,
+                "UpdatedAt": iso8601Time,
+                "Severity": {"Label": "INFORMATIONAL"},
+                "Confidence": 99,
+                "Title": "[IAM.3] IAM users should have Multi-Factor Authentication (MFA) enabled",
+                "Description": "IAM user " + userName + " has MFA enabled.",
+                "Remediation": {
+                    "Recommendation": {
+                        "Text": "For information on MFA refer to the Using Multi-Factor Authentication (MFA) in AWS section of the AWS IAM User Guide",
+                        "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_mfa.html",
+                    }
+                },
+                "ProductFields": {"Product Name": "ElectricEye"},
+                "Resources": [
+                    {
+                        "Type": "AwsIamUser",
+                        "Id": userArn,
+                        "Partition": awsPartition,
+                        "Region": awsRegion,
+                        "Details": {"Other": {"PrincipalName": userName}},
+                    }
+                ],
+                "Compliance": {
+                    "Status": "PASSED",
+                    "RelatedRequirements": [
+                        "NIST CSF PR.AC-1",
+                        "NIST SP 800-53 AC-1",
+                        "NIST SP 800-53 AC-2",
+                        "NIST SP 800-53 IA-1",
+                        "NIST SP 800-53 IA-2",
+                        "NIST SP 800-53 IA-3",
+                        "NIST SP 800-53 IA-4",
+                        "NIST SP 800-53 IA-5",
+                        "NIST SP 800-53 IA-6",
+                        "NIST SP 800-53 IA-7",
+                        "NIST SP 800-53 IA-8",
+                        "NIST SP 800-53 IA-9",
+                        "NIST SP 800-53 IA-10",
+                        "NIST SP 800-53 IA-11",
+                        "AICPA TSC CC6.1",
+                        "AICPA TSC CC6.2",
+                        "ISO 27001:2013 A.9.2.1",
+                        "ISO 27001:2013 A.9.2.2",
+                        "ISO 27001:2013 A.9.2.3",
+                        "ISO 27001:2013 A.9.2.4",
+                        "ISO 27001:2013 A.9.2.6",
+                        "ISO 27001:2013 A.9.3.1",
+                        "ISO 27001:2013 A.9.4.2",
+                        "ISO 27001:2013 A.9.4.3",
+                    ],
+                },
+                "Workflow": {"Status": "RESOLVED"},
+                "RecordState": "ARCHIVED",
+            }
+            yield finding
 
 @registry.register_check("iam")
 def user_inline_policy_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.4] IAM users should not have attached in-line policies"""
-    user = list_users(cache=cache)
-    allUsers = user["Users"]
-    for users in allUsers:
+    inventory = iamInventory.get(awsAccountId)
+    for users in inventory.users:
         userName = str(users["UserName"])
         userArn = str(users["Arn"])
         # ISO Time
         iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
         try:
-            response = iam.list_user_policies(UserName=userName)
-            if str(response["PolicyNames"]) != "[]":
+            if users.get("UserPolicyList"):
                 finding = {
                     "SchemaVersion": "2018-10-08",
                     "Id": userArn + "/iam-user-attach-inline-check",
@@ -650,16 +647,14 @@ def user_inline_policy_check(cache: dict, awsAccountId: str, awsRegion: str, aws
 @registry.register_check("iam")
 def user_direct_attached_policy_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.5] IAM users should not have attached managed policies"""
-    user = list_users(cache=cache)
-    allUsers = user["Users"]
-    for users in allUsers:
+    inventory = iamInventory.get(awsAccountId)
+    for users in inventory.users:
         userName = str(users["UserName"])
         userArn = str(users["Arn"])
         # ISO Time
         iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
         try:
-            response = iam.list_attached_user_policies(UserName=userName)
-            if str(response["AttachedPolicies"]) != "[]":
+            if users.get("AttachedManagedPolicies"):
                 finding = {
                     "SchemaVersion": "2018-10-08",
                     "Id": userArn + "/iam-user-attach-managed-policy-check",
@@ -1161,42 +1156,15 @@ def server_certs_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartit
 def iam_mngd_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.8] Managed policies should follow least privilege principles"""
     try:
-        policies = iam.list_policies(Scope='Local')
-        for mngd_policy in policies['Policies']:
+        inventory = iamInventory.get(awsAccountId)
+        # every distinct document is analyzed up front, on a process pool when there are many
+        policyAnalyzer.analyze_many(list(inventory.defaultVersions.values()))
+        for mngd_policy in inventory.policies:
             policy_arn = mngd_policy['Arn']
-            version_id = mngd_policy['DefaultVersionId']
 
-            policy_doc = iam.get_policy_version(
-                PolicyArn=policy_arn,
-                VersionId=version_id
-            )['PolicyVersion']['Document']
-            #handle policies docs returned as strings
-            if type(policy_doc) == str:
-                policy_doc = json.loads(policy_doc)
-
-            least_priv_rating = 'passing'
-            for statement in policy_doc['Statement']:
-                if statement["Effect"] == 'Allow':
-                    if statement.get('Condition') == None: 
-                        # action structure could be a string or a list
-                        if type(statement['Action']) == list: 
-                            if len(['True' for x in statement['Action'] if ":*" in x or '*' == x]) > 0:
-                                if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                    least_priv_rating = 'failed_high'
-                                    # Means that an initial failure will not be overwritten by a lower finding later
-                                    next
-                                elif type(statement['Resource']) == list: 
-                                    least_priv_rating = 'failed_low'
-
-                        # Single action in a statement
-                        elif type(statement['Action']) == str:
-                            if ":*" in statement['Action'] or statement['Action'] == '*':
-                                if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                    least_priv_rating = 'failed_high'
-                                    # Means that an initial failure will not be overwritten by a lower finding later
-                                    next
-                                elif type(statement['Resource']) == list: 
-                                    least_priv_rating = 'failed_low'
+            policy_doc = inventory.defaultVersions[policy_arn]
+            policy_analysis = policyAnalyzer.analyze(policy_doc)
+            least_priv_rating = policy_analysis['Rating']
 
             iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
             if least_priv_rating == 'passing':
@@ -1264,7 +1232,7 @@ def iam_mngd_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                     "Severity": {"Label": "LOW"},
                     "Confidence": 99,
                     "Title": "[IAM.8] Managed policies should follow least privilege principles",
-                    "Description": f"The customer managed policy {policy_arn} is not following least privilege principles and has been rated: {least_priv_rating}.",
+                    "Description": f"The customer managed policy {policy_arn} is not following least privilege principles and has been rated: {least_priv_rating} as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                     "Remediation": {
                         "Recommendation": {
                             "Text": "For information on IAM least privilege refer to the Controlling access section of the AWS IAM User Guide",
@@ -1315,7 +1283,7 @@ def iam_mngd_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                     "Severity": {"Label": "HIGH"},
                     "Confidence": 99,
                     "Title": "[IAM.8] Managed policies should follow least privilege principles",
-                    "Description": f"The customer managed policy {policy_arn} is not following least privilege principles and has been rated: {least_priv_rating}.",
+                    "Description": f"The customer managed policy {policy_arn} is not following least privilege principles and has been rated: {least_priv_rating} as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                     "Remediation": {
                         "Recommendation": {
                             "Text": "For information on IAM least privilege refer to the Controlling access section of the AWS IAM User Guide",
@@ -1360,47 +1328,21 @@ def iam_mngd_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
 def iam_user_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.9] User inline policies should follow least privilege principles"""
     try:
-        Users = iam.list_users()
-        for user in Users['Users']:
+        inventory = iamInventory.get(awsAccountId)
+        # every distinct document is analyzed up front, on a process pool when there are many
+        policyAnalyzer.analyze_many(
+            [policy['PolicyDocument'] for user in inventory.users for policy in user.get('UserPolicyList', [])]
+        )
+        for user in inventory.users:
             user_arn = user['Arn']
             UserName = user['UserName']
 
-            policy_names = iam.list_user_policies(
-                UserName=UserName
-            )['PolicyNames']
-            for policy_name in policy_names:
-                policy_doc = iam.get_user_policy(
-                    UserName=UserName,
-                    PolicyName=policy_name
-                )['PolicyDocument']
-
-                #handle policies docs returned as strings
-                if type(policy_doc) == str:
-                    policy_doc = json.loads(policy_doc)
-
-                least_priv_rating = 'passing'
-                for statement in policy_doc['Statement']:
-                    if statement["Effect"] == 'Allow':
-                        if statement.get('Condition') == None: 
-                            # action structure could be a string or a list
-                            if type(statement['Action']) == list: 
-                                if len(['True' for x in statement['Action'] if ":*" in x or '*' == x]) > 0:
-                                    if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                        least_priv_rating = 'failed_high'
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement['Resource']) == list: 
-                                        least_priv_rating = 'failed_low'
+            for inline_policy in user.get('UserPolicyList', []):
+                policy_name = inline_policy['PolicyName']
+                policy_doc = inline_policy['PolicyDocument']
 
-                            # Single action in a statement
-                            elif type(statement['Action']) == str:
-                                if ":*" in statement['Action'] or statement['Action'] == '*':
-                                    if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                        least_priv_rating = 'failed_high'
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement['Resource']) == list: 
-                                        least_priv_rating = 'failed_low'
+                policy_analysis = policyAnalyzer.analyze(policy_doc)
+                least_priv_rating = policy_analysis['Rating']
 
                 iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
                 if least_priv_rating == 'passing':
@@ -1473,7 +1415,7 @@ def iam_user_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                         "Severity": {"Label": "LOW"},
                         "Confidence": 99,
                         "Title": "[IAM.9] User inline policies should follow least privilege principles",
-                        "Description": f"The user {user_arn} inline policy {policy_name} is not following least privilege principles.",
+                        "Description": f"The user {user_arn} inline policy {policy_name} is not following least privilege principles as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                         "Remediation": {
                             "Recommendation": {
                                 "Text": "For information on IAM least privilege refer to the inline policy section of the AWS IAM User Guide",
@@ -1529,7 +1471,7 @@ def iam_user_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                         "Severity": {"Label": "HIGH"},
                         "Confidence": 99,
                         "Title": "[IAM.9] User inline policies should follow least privilege principles",
-                        "Description": f"The user {user_arn} inline policy {policy_name} is not following least privilege principles.",
+                        "Description": f"The user {user_arn} inline policy {policy_name} is not following least privilege principles as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                         "Remediation": {
                             "Recommendation": {
                                 "Text": "For information on IAM least privilege refer to the inline policy section of the AWS IAM User Guide",
@@ -1579,47 +1521,21 @@ def iam_user_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
 def iam_group_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.10] Group inline policies should follow least privilege principles"""
     try:
-        Groups = iam.list_groups()
-        for group in Groups['Groups']:
+        inventory = iamInventory.get(awsAccountId)
+        # every distinct document is analyzed up front, on a process pool when there are many
+        policyAnalyzer.analyze_many(
+            [policy['PolicyDocument'] for group in inventory.groups for policy in group.get('GroupPolicyList', [])]
+        )
+        for group in inventory.groups:
             group_arn = group['Arn']
             GroupName = group['GroupName']
 
-            policy_names = iam.list_group_policies(
-                GroupName=GroupName
-            )['PolicyNames']
-            for policy_name in policy_names:
-                policy_doc = iam.get_group_policy(
-                    GroupName=GroupName,
-                    PolicyName=policy_name
-                )['PolicyDocument']
+            for inline_policy in group.get('GroupPolicyList', []):
+                policy_name = inline_policy['PolicyName']
+                policy_doc = inline_policy['PolicyDocument']
 
-                #handle policies docs returned as strings
-                if type(policy_doc) == str:
-                    policy_doc = json.loads(policy_doc)
-
-                least_priv_rating = 'passing'
-                for statement in policy_doc['Statement']:
-                    if statement["Effect"] == 'Allow':
-                        if statement.get('Condition') == None: 
-                            # action structure could be a string or a list
-                            if type(statement['Action']) == list: 
-                                if len(['True' for x in statement['Action'] if ":*" in x or '*' == x]) > 0:
-                                    if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                        least_priv_rating = 'failed_high'
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement['Resource']) == list: 
-                                        least_priv_rating = 'failed_low'
-
-                            # Single action in a statement
-                            elif type(statement['Action']) == str:
-                                if ":*" in statement['Action'] or statement['Action'] == '*':
-                                    if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                        least_priv_rating = 'failed_high'
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement['Resource']) == list: 
-                                        least_priv_rating = 'failed_low'
+                policy_analysis = policyAnalyzer.analyze(policy_doc)
+                least_priv_rating = policy_analysis['Rating']
 
                 iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
                 if least_priv_rating == 'passing':
@@ -1688,7 +1604,7 @@ def iam_group_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                         "Severity": {"Label": "LOW"},
                         "Confidence": 99,
                         "Title": "[IAM.10] Group inline policies should follow least privilege principles",
-                        "Description": f"The group {group_arn} inline policy {policy_name} is not following least privilege principles.",
+                        "Description": f"The group {group_arn} inline policy {policy_name} is not following least privilege principles as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                         "Remediation": {
                             "Recommendation": {
                                 "Text": "For information on IAM least privilege refer to the inline policy section of the AWS IAM User Guide",
@@ -1740,7 +1656,7 @@ def iam_group_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                         "Severity": {"Label": "HIGH"},
                         "Confidence": 99,
                         "Title": "[IAM.10] Group inline policies should follow least privilege principles",
-                        "Description": f"The group {group_arn} inline policy {policy_name} is not following least privilege principles.",
+                        "Description": f"The group {group_arn} inline policy {policy_name} is not following least privilege principles as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                         "Remediation": {
                             "Recommendation": {
                                 "Text": "For information on IAM least privilege refer to the inline policy section of the AWS IAM User Guide",
@@ -1786,47 +1702,21 @@ def iam_group_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
 def iam_role_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[IAM.11] Role inline policies should follow least privilege principles"""
     try:
-        Roles = iam.list_roles()
-        for role in Roles['Roles']:
+        inventory = iamInventory.get(awsAccountId)
+        # every distinct document is analyzed up front, on a process pool when there are many
+        policyAnalyzer.analyze_many(
+            [policy['PolicyDocument'] for role in inventory.roles for policy in role.get('RolePolicyList', [])]
+        )
+        for role in inventory.roles:
             role_arn = role['Arn']
             RoleName = role['RoleName']
 
-            policy_names = iam.list_role_policies(
-                RoleName=RoleName
-            )['PolicyNames']
-            for policy_name in policy_names:
-                policy_doc = iam.get_role_policy(
-                    RoleName=RoleName,
-                    PolicyName=policy_name
-                )['PolicyDocument']
-
-                #handle policies docs returned as strings
-                if type(policy_doc) == str:
-                    policy_doc = json.loads(policy_doc)
-
-                least_priv_rating = 'passing'
-                for statement in policy_doc['Statement']:
-                    if statement["Effect"] == 'Allow':
-                        if statement.get('Condition') == None: 
-                            # action structure could be a string or a list
-                            if type(statement['Action']) == list: 
-                                if len(['True' for x in statement['Action'] if ":*" in x or '*' == x]) > 0:
-                                    if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                        least_priv_rating = 'failed_high'
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement['Resource']) == list: 
-                                        least_priv_rating = 'failed_low'
+            for inline_policy in role.get('RolePolicyList', []):
+                policy_name = inline_policy['PolicyName']
+                policy_doc = inline_policy['PolicyDocument']
 
-                            # Single action in a statement
-                            elif type(statement['Action']) == str:
-                                if ":*" in statement['Action'] or statement['Action'] == '*':
-                                    if type(statement['Resource']) == str and statement['Resource'] == '*':
-                                        least_priv_rating = 'failed_high'
-                                        # Means that an initial failure will not be overwritten by a lower finding later
-                                        next
-                                    elif type(statement['Resource']) == list: 
-                                        least_priv_rating = 'failed_low'
+                policy_analysis = policyAnalyzer.analyze(policy_doc)
+                least_priv_rating = policy_analysis['Rating']
 
                 iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
                 if least_priv_rating == 'passing':
@@ -1896,7 +1786,7 @@ def iam_role_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                         "Severity": {"Label": "LOW"},
                         "Confidence": 99,
                         "Title": "[IAM.11] Role inline policies should follow least privilege principles",
-                        "Description": f"The role {role_arn} inline policy {policy_name} is not following least privilege principles.",
+                        "Description": f"The role {role_arn} inline policy {policy_name} is not following least privilege principles as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                         "Remediation": {
                             "Recommendation": {
                                 "Text": "For information on IAM least privilege refer to the inline policy section of the AWS IAM User Guide",
@@ -1949,7 +1839,7 @@ def iam_role_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                         "Severity": {"Label": "HIGH"},
                         "Confidence": 99,
                         "Title": "[IAM.11] Role inline policies should follow least privilege principles",
-                        "Description": f"The role {role_arn} inline policy {policy_name} is not following least privilege principles.",
+                        "Description": f"The role {role_arn} inline policy {policy_name} is not following least privilege principles as it grants {policy_analysis['PrivilegeLevel']} privileges.",
                         "Remediation": {
                             "Recommendation": {
                                 "Text": "For information on IAM least privilege refer to the inline policy section of the AWS IAM User Guide",
@@ -1989,4 +1879,317 @@ def iam_role_policy_least_priv_check(cache: dict, awsAccountId: str, awsRegion:
                     }
                     yield finding
     except:
-        pass
\ No newline at end of file
+        pass
+
+@registry.register_check("iam")
+def user_password_age_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
+    """[IAM.12] IAM user passwords should be rotated every 90 days"""
+    try:
+        report = credentialReport.get(awsAccountId)
+    except Exception as e:
+        print(e)
+        return
+    passwordAgeOver90 = older_than(report, "password_last_changed", 90)
+    for users in select(report, report["password_enabled"], passwordAgeOver90=passwordAgeOver90):
+        userName = str(users["user"])
+        userArn = str(users["arn"])
+        # ISO Time
+        iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
+        if users["passwordAgeOver90"]:
+            finding = {
+                "SchemaVersion": "2018-10-08",
+                "Id": userArn + "/iam-user-password-age-check",
+                "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                "GeneratorId": userArn,
+                "AwsAccountId": awsAccountId,
+                "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
+                "FirstObservedAt": iso8601Time,
+                "CreatedAt": iso8601Time,
+                "UpdatedAt": iso8601Time,
+                "Severity": {"Label": "LOW"},
+                "Confidence": 99,
+                "Title": "[IAM.12] IAM user passwords should be rotated every 90 days",
+                "Description": "IAM user " + userName + " has not changed their password in over 90 days. Refer to the remediation section to remediate this behavior.",
+                "Remediation": {
+                    "Recommendation": {
+                        "Text": "For information on changing IAM user passwords refer to the Managing passwords for IAM users section of the AWS IAM User Guide",
+                        "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_passwords_admin-change-user.html",
+                    }
+                },
+                "ProductFields": {"Product Name": "ElectricEye"},
+                "Resources": [
+                    {
+                        "Type": "AwsIamUser",
+                        "Id": userArn,
+                        "Partition": awsPartition,
+                        "Region": awsRegion,
+                        "Details": {"Other": {"PrincipalName": userName}},
+                    }
+                ],
+                "Compliance": {
+                    "Status": "FAILED",
+                    "RelatedRequirements": [
+                        "NIST CSF PR.AC-1",
+                        "NIST SP 800-53 AC-1",
+                        "NIST SP 800-53 AC-2",
+                        "NIST SP 800-53 IA-1",
+                        "NIST SP 800-53 IA-2",
+                        "NIST SP 800-53 IA-3",
+                        "NIST SP 800-53 IA-4",
+                        "NIST SP 800-53 IA-5",
+                        "NIST SP 800-53 IA-6",
+                        "NIST SP 800-53 IA-7",
+                        "NIST SP 800-53 IA-8",
+                        "NIST SP 800-53 IA-9",
+                        "NIST SP 800-53 IA-10",
+                        "NIST SP 800-53 IA-11",
+                        "AICPA TSC CC6.1",
+                        "AICPA TSC CC6.2",
+                        "ISO 27001:2013 A.9.2.1",
+                        "ISO 27001:2013 A.9.2.2",
+                        "ISO 27001:2013 A.9.2.3",
+                        "ISO 27001:2013 A.9.2.4",
+                        "ISO 27001:2013 A.9.2.6",
+                        "ISO 27001:2013 A.9.3.1",
+                        "ISO 27001:2013 A.9.4.2",
+                        "ISO 27001:2013 A.9.4.3",
+                    ],
+                },
+                "Workflow": {"Status": "NEW"},
+                "RecordState": "ACTIVE",
+            }
+            yield finding
+        else:
+            finding = {
+                "SchemaVersion": "2018-10-08",
+                "Id": userArn + "/iam-user-password-age-check",
+                "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                "GeneratorId": userArn,
+                "AwsAccountId": awsAccountId,
+                "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
+                "FirstObservedAt": iso8601Time,
+                "CreatedAt": iso8601Time,
+                "UpdatedAt": iso8601Time,
+                "Severity": {"Label": "INFORMATIONAL"},
+                "Confidence": 99,
+                "Title": "[IAM.12] IAM user passwords should be rotated every 90 days",
+                "Description": "IAM user " + userName + " has changed their password in the last 90 days.",
+                "Remediation": {
+                    "Recommendation": {
+                        "Text": "For information on changing IAM user passwords refer to the Managing passwords for IAM users section of the AWS IAM User Guide",
+                        "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_passwords_admin-change-user.html",
+                    }
+                },
+                "ProductFields": {"Product Name": "ElectricEye"},
+                "Resources": [
+                    {
+                        "Type": "AwsIamUser",
+                        "Id": userArn,
+                        "Partition": awsPartition,
+                        "Region": awsRegion,
+                        "Details": {"Other": {"PrincipalName": userName}},
+                    }
+                ],
+                "Compliance": {
+                    "Status": "PASSED",
+                    "RelatedRequirements": [
+                        "NIST CSF PR.AC-1",
+                        "NIST SP 800-53 AC-1",
+                        "NIST SP 800-53 AC-2",
+                        "NIST SP 800-53 IA-1",
+                        "NIST SP 800-53 IA-2",
+                        "NIST SP 800-53 IA-3",
+                        "NIST SP 800-53 IA-4",
+                        "NIST SP 800-53 IA-5",
+                        "NIST SP 800-53 IA-6",
+                        "NIST SP 800-53 IA-7",
+                        "NIST SP 800-53 IA-8",
+                        "NIST SP 800-53 IA-9",
+                        "NIST SP 800-53 IA-10",
+                        "NIST SP 800-53 IA-11",
+                        "AICPA TSC CC6.1",
+                        "AICPA TSC CC6.2",
+                        "ISO 27001:2013 A.9.2.1",
+                        "ISO 27001:2013 A.9.2.2",
+                        "ISO 27001:2013 A.9.2.3",
+                        "ISO 27001:2013 A.9.2.4",
+                        "ISO 27001:2013 A.9.2.6",
+                        "ISO 27001:2013 A.9.3.1",
+                        "ISO 27001:2013 A.9.4.2",
+                        "ISO 27001:2013 A.9.4.3",
+                    ],
+                },
+                "Workflow": {"Status": "RESOLVED"},
+                "RecordState": "ARCHIVED",
+            }
+            yield finding
+
+@registry.register_check("iam")
+def user_unused_credentials_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
+    """[IAM.13] IAM user credentials unused for 45 days or more should be disabled"""
+    try:
+        report = credentialReport.get(awsAccountId)
+    except Exception as e:
+        print(e)
+        return
+    # a password or key which was never used counts from when the user or key was created
+    passwordUnused = pc.and_(
+        report["password_enabled"], unused_for(report, "password_last_used", "user_creation_time", 45)
+    )
+    accessKey1Unused = pc.and_(
+        report["access_key_1_active"], unused_for(report, "access_key_1_last_used_date", "access_key_1_last_rotated", 45)
+    )
+    accessKey2Unused = pc.and_(
+        report["access_key_2_active"], unused_for(report, "access_key_2_last_used_date", "access_key_2_last_rotated", 45)
+    )
+    hasCredentials = pc.or_(
+        report["password_enabled"], pc.or_(report["access_key_1_active"], report["access_key_2_active"])
+    )
+    for users in select(
+        report,
+        hasCredentials,
+        passwordUnused=passwordUnused,
+        accessKey1Unused=accessKey1Unused,
+        accessKey2Unused=accessKey2Unused,
+    ):
+        userName = str(users["user"])
+        userArn = str(users["arn"])
+        unusedCredentials = [
+            credential
+            for credential, unused in [
+                ("password", users["passwordUnused"]),
+                ("access key 1", users["accessKey1Unused"]),
+                ("access key 2", users["accessKey2Unused"]),
+            ]
+            if unused
+        ]
+        # ISO Time
+        iso8601Time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
+        if unusedCredentials:
+            finding = {
+                "SchemaVersion": "2018-10-08",
+                "Id": userArn + "/iam-user-unused-credentials-check",
+                "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                "GeneratorId": userArn,
+                "AwsAccountId": awsAccountId,
+                "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
+                "FirstObservedAt": iso8601Time,
+                "CreatedAt": iso8601Time,
+                "UpdatedAt": iso8601Time,
+                "Severity": {"Label": "MEDIUM"},
+                "Confidence": 99,
+                "Title": "[IAM.13] IAM user credentials unused for 45 days or more should be disabled",
+                "Description": "IAM user " + userName + " has credentials which have not been used in 45 days or more: " + ", ".join(unusedCredentials) + ". Refer to the remediation section to remediate this behavior.",
+                "Remediation": {
+                    "Recommendation": {
+                        "Text": "For information on finding and removing unused credentials refer to the Finding unused AWS credentials section of the AWS IAM User Guide",
+                        "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_finding-unused.html",
+                    }
+                },
+                "ProductFields": {"Product Name": "ElectricEye"},
+                "Resources": [
+                    {
+                        "Type": "AwsIamUser",
+                        "Id": userArn,
+                        "Partition": awsPartition,
+                        "Region": awsRegion,
+                        "Details": {"Other": {"PrincipalName": userName}},
+                    }
+                ],
+                "Compliance": {
+                    "Status": "FAILED",
+                    "RelatedRequirements": [
+                        "NIST CSF PR.AC-1",
+                        "NIST SP 800-53 AC-1",
+                        "NIST SP 800-53 AC-2",
+                        "NIST SP 800-53 IA-1",
+                        "NIST SP 800-53 IA-2",
+                        "NIST SP 800-53 IA-3",
+                        "NIST SP 800-53 IA-4",
+                        "NIST SP 800-53 IA-5",
+                        "NIST SP 800-53 IA-6",
+                        "NIST SP 800-53 IA-7",
+                        "NIST SP 800-53 IA-8",
+                        "NIST SP 800-53 IA-9",
+                        "NIST SP 800-53 IA-10",
+                        "NIST SP 800-53 IA-11",
+                        "AICPA TSC CC6.1",
+                        "AICPA TSC CC6.2",
+                        "ISO 27001:2013 A.9.2.1",
+                        "ISO 27001:2013 A.9.2.2",
+                        "ISO 27001:2013 A.9.2.3",
+                        "ISO 27001:2013 A.9.2.4",
+                        "ISO 27001:2013 A.9.2.6",
+                        "ISO 27001:2013 A.9.3.1",
+                        "ISO 27001:2013 A.9.4.2",
+                        "ISO 27001:2013 A.9.4.3",
+                    ],
+                },
+                "Workflow": {"Status": "NEW"},
+                "RecordState": "ACTIVE",
+            }
+            yield finding
+        else:
+            finding = {
+                "SchemaVersion": "2018-10-08",
+                "Id": userArn + "/iam-user-unused-credentials-check",
+                "ProductArn": f"arn:{awsPartition}:securityhub:{awsRegion}:{awsAccountId}:product/{awsAccountId}/default",
+                "GeneratorId": userArn,
+                "AwsAccountId": awsAccountId,
+                "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
+                "FirstObservedAt": iso8601Time,
+                "CreatedAt": iso8601Time,
+                "UpdatedAt": iso8601Time,
+                "Severity": {"Label": "INFORMATIONAL"},
+                "Confidence": 99,
+                "Title": "[IAM.13] IAM user credentials unused for 45 days or more should be disabled",
+                "Description": "IAM user " + userName + " has used all of their enabled credentials in the last 45 days.",
+                "Remediation": {
+                    "Recommendation": {
+                        "Text": "For information on finding and removing unused credentials refer to the Finding unused AWS credentials section of the AWS IAM User Guide",
+                        "Url": "https://docs.aws.amazon.com/IAM/latest/UserGuide/id_credentials_finding-unused.html",
+                    }
+                },
+                "ProductFields": {"Product Name": "ElectricEye"},
+                "Resources": [
+                    {
+                        "Type": "AwsIamUser",
+                        "Id": userArn,
+                        "Partition": awsPartition,
+                        "Region": awsRegion,
+                        "Details": {"Other": {"PrincipalName": userName}},
+                    }
+                ],
+                "Compliance": {
+                    "Status": "PASSED",
+                    "RelatedRequirements": [
+                        "NIST CSF PR.AC-1",
+                        "NIST SP 800-53 AC-1",
+                        "NIST SP 800-53 AC-2",
+                        "NIST SP 800-53 IA-1",
+                        "NIST SP 800-53 IA-2",
+                        "NIST SP 800-53 IA-3",
+                        "NIST SP 800-53 IA-4",
+                        "NIST SP 800-53 IA-5",
+                        "NIST SP 800-53 IA-6",
+                        "NIST SP 800-53 IA-7",
+                        "NIST SP 800-53 IA-8",
+                        "NIST SP 800-53 IA-9",
+                        "NIST SP 800-53 IA-10",
+                        "NIST SP 800-53 IA-11",
+                        "AICPA TSC CC6.1",
+                        "AICPA TSC CC6.2",
+                        "ISO 27001:2013 A.9.2.1",
+                        "ISO 27001:2013 A.9.2.2",
+                        "ISO 27001:2013 A.9.2.3",
+                        "ISO 27001:2013 A.9.2.4",
+                        "ISO 27001:2013 A.9.2.6",
+                        "ISO 27001:2013 A.9.3.1",
+                        "ISO 27001:2013 A.9.4.2",
+                        "ISO 27001:2013 A.9.4.3",
+                    ],
+                },
+                "Workflow": {"Status": "RESOLVED"},
+                "RecordState": "ARCHIVED",
+            }
+            yield finding
@@ -21,10 +21,13 @@
 import datetime
 import boto3
 from check_register import CheckRegister
+from distribution_collector import DistributionCollector, from_summary
 
 registry = CheckRegister()
 
 cloudfront = boto3.client("cloudfront")
+# get_distribution is only called once per distribution, and only for what the summaries lack
+distributionCollector = DistributionCollector(cloudfront)
 
 def paginate(cache):
     itemList = []
@@ -42,18 +45,28 @@ def paginate(cache):
         cache["items"] = itemList
         return cache["items"]
 
+def get_distributions(cache, details=False):
+    """Returns a dict of distribution Id to the distribution in the shape get_distribution returns. Only
+    ActiveTrustedSigners, Logging and DefaultRootObject are missing from list_distributions and need `details`"""
+    if details:
+        return distributionCollector.collect(paginate(cache))
+    return {dist["Id"]: from_summary(dist) for dist in paginate(cache)}
+
 @registry.register_check("cloudfront")
 def cloudfront_active_trusted_signers_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[CloudFront.1] Cloudfront Distributions with active Trusted Signers should use Key Pairs"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache, details=True)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["ActiveTrustedSigners"]["Enabled"]) == 'True':
             for i in distro["ActiveTrustedSigners"]["Items"]:
                 # this is a failing check
@@ -226,13 +239,16 @@ def cloudfront_origin_shield_check(cache: dict, awsAccountId: str, awsRegion: st
     """[CloudFront.2] Cloudfront Distributions Origins should have Origin Shield enabled"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if not distro["DistributionConfig"]["Origins"]["Items"]:
             continue
         else:
@@ -374,13 +390,16 @@ def cloudfront_default_viewer_cert_check(cache: dict, awsAccountId: str, awsRegi
     """[CloudFront.3] Cloudfront Distributions should not use the default Viewer certificate"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["ViewerCertificate"]["CloudFrontDefaultCertificate"]) == "True":
             # this is a failing check
             finding = {
@@ -501,13 +520,16 @@ def cloudfront_georestriction_check(cache: dict, awsAccountId: str, awsRegion: s
     """[CloudFront.4] Cloudfront Distributions should have a Georestriction configured"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         geoBlockType = str(distro["DistributionConfig"]["Restrictions"]["GeoRestriction"]["RestrictionType"])
         if geoBlockType == "none":
             # this is a failing check
@@ -630,13 +652,16 @@ def cloudfront_field_level_encryption_check(cache: dict, awsAccountId: str, awsR
     """[CloudFront.5] Cloudfront Distributions should implement Field-Level Encryption in default cache behavior"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["DefaultCacheBehavior"]["FieldLevelEncryptionId"]) == "":
             # this is a failing check
             finding = {
@@ -747,13 +772,16 @@ def cloudfront_waf_enabled_check(cache: dict, awsAccountId: str, awsRegion: str,
     """[CloudFront.6] Cloudfront Distributions should use a Web Application Firewall"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["WebACLId"]) == "":
             # this is a failing check
             finding = {
@@ -876,13 +904,16 @@ def cloudfront_default_viewer_tls12_check(cache: dict, awsAccountId: str, awsReg
     ]
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["ViewerCertificate"]["MinimumProtocolVersion"]) not in compliantMinimumProtocolVersions:
             # this is a failing check
             finding = {
@@ -1010,13 +1041,16 @@ def cloudfront_custom_origin_tls12_check(cache: dict, awsAccountId: str, awsRegi
     ]
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if not distro["DistributionConfig"]["Origins"]["Items"]:
             continue
         else:
@@ -1223,13 +1257,16 @@ def cloudfront_custom_origin_https_only_protcol_check(cache: dict, awsAccountId:
     """[CloudFront.9] Cloudfront Distributions with Custom Origins should enforce HTTPS-only protocol policies"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if not distro["DistributionConfig"]["Origins"]["Items"]:
             continue
         else:
@@ -1435,13 +1472,16 @@ def cloudfront_default_viewer_https_sni_check(cache: dict, awsAccountId: str, aw
     """[CloudFront.10] Cloudfront Distributions should enforce Server Name Indication (SNI) to serve HTTPS requests"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["ViewerCertificate"]["SSLSupportMethod"]) != "sni-only":
             # this is a failing check
             finding = {
@@ -1562,13 +1602,16 @@ def cloudfront_distro_logging_check(cache: dict, awsAccountId: str, awsRegion: s
     """[CloudFront.11] Cloudfront Distributions should have logging enabled"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache, details=True)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["Logging"]["Enabled"]) == "False":
             # this is a failing check
             finding = {
@@ -1687,13 +1730,16 @@ def cloudfront_distro_default_root_object_check(cache: dict, awsAccountId: str,
     """[CloudFront.12] Cloudfront Distributions should have a default root object configured"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache, details=True)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["DefaultRootObject"]) == "":
             # this is a failing check
             finding = {
@@ -1824,13 +1870,16 @@ def cloudfront_default_viewer_https_only_protcol_check(cache: dict, awsAccountId
     """[CloudFront.13] Cloudfront Distributions should enforce should enforce HTTPS-only for the default viewer protocol"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if str(distro["DistributionConfig"]["DefaultCacheBehavior"]["ViewerProtocolPolicy"]) != "https-only":
             # this is a failing check
             finding = {
@@ -1951,13 +2000,16 @@ def cloudfront_s3_origin_oai_check(cache: dict, awsAccountId: str, awsRegion: st
     """[CloudFront.14] Cloudfront Distributions with S3 Origins should have origin access identity enabled"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    distributions = get_distributions(cache)
     for dist in paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Get check specific metadata
-        distro = cloudfront.get_distribution(Id=distributionId)["Distribution"]
+        distro = distributions.get(distributionId)
+        if not distro:
+            continue
         if not distro["DistributionConfig"]["Origins"]["Items"]:
             continue
         else:
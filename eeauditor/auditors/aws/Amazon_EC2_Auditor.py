@@ -21,11 +21,13 @@
 import boto3
 import datetime
 from check_register import CheckRegister
+from image_resolver import ImageResolver
 from dateutil.parser import parse
 
 registry = CheckRegister()
 
 ec2 = boto3.client("ec2")
+imageResolver = ImageResolver(ec2)
 
 def paginate(cache):
     instanceList = []
@@ -41,6 +43,10 @@ def paginate(cache):
         cache["instances"] = instanceList
         return cache["instances"]
 
+def get_images(cache):
+    """Resolves the AMI of every instance at once, shared by every AMI-based Check"""
+    return imageResolver.resolve([i["ImageId"] for i in paginate(cache=cache)])
+
 @registry.register_check("ec2")
 def ec2_imdsv2_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[EC2.1] EC2 Instances should be configured to use instance metadata service V2 (IMDSv2)"""
@@ -792,6 +798,7 @@ def ec2_ami_age_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartiti
     """[EC2.5] EC2 Instances should use AMIs that are less than 3 months old"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    images = get_images(cache)
     for i in paginate(cache=cache):
         instanceId = str(i["InstanceId"])
         instanceArn = (f"arn:{awsPartition}:ec2:{awsRegion}:{awsAccountId}:instance/{instanceId}")
@@ -804,9 +811,12 @@ def ec2_ami_age_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartiti
         except KeyError:
             instanceLaunchedAt = str(i["LaunchTime"])
         # Check specific metadata
-        # Extract the creation date.  As there is only 1 ImageId, there will only be 1 entry. 
+        # Images which are deregistered or could not be looked up have no creation date to check
+        image = images.get(instanceImage)
+        if not image:
+            continue
         try:
-            dsc_image_date = ec2.describe_images(ImageIds=[instanceImage])["Images"][0]["CreationDate"]
+            dsc_image_date = image["CreationDate"]
             dt_creation_date = parse(dsc_image_date).replace(tzinfo=None)
             AmiAge = datetime.datetime.utcnow() - dt_creation_date
 
@@ -930,7 +940,7 @@ def ec2_ami_age_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartiti
                     "RecordState": "ARCHIVED"
                 }
                 yield finding
-        except IndexError or KeyError:
+        except KeyError:
             pass
 
 
@@ -939,6 +949,7 @@ def ec2_ami_status_check(cache: dict, awsAccountId: str, awsRegion: str, awsPart
     """[EC2.6] EC2 Instances should use AMIs that are currently registered"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    images = get_images(cache)
     for i in paginate(cache=cache):
         instanceId = str(i["InstanceId"])
         instanceArn = (f"arn:{awsPartition}:ec2:{awsRegion}:{awsAccountId}:instance/{instanceId}")
@@ -950,8 +961,11 @@ def ec2_ami_status_check(cache: dict, awsAccountId: str, awsRegion: str, awsPart
             instanceLaunchedAt = str(i["BlockDeviceMappings"][0]["Ebs"]["AttachTime"])
         except KeyError:
             instanceLaunchedAt = str(i["LaunchTime"])
+        if instanceImage not in images:
+            # the image could not be looked up at all, e.g. the request was throttled
+            continue
         try:
-            amiState = ec2.describe_images(ImageIds=[instanceImage])["Images"][0]["State"]
+            amiState = images[instanceImage]["State"]
             if (amiState == "invalid" or
                 amiState == "deregistered" or
                 amiState == "failed" or
@@ -1136,8 +1150,8 @@ def ec2_ami_status_check(cache: dict, awsAccountId: str, awsRegion: str, awsPart
                     "RecordState": "ACTIVE"
                 }
                 yield finding                    
-        except IndexError or KeyError:
-            #failing check, identical to the first finding block.  Depending on timeframe of the deregistration of AMI, describe_images API call may return a blank array
+        except (TypeError, KeyError):
+            #failing check, identical to the first finding block.  Depending on timeframe of the deregistration of AMI, describe_images API call may return a blank array, in which case the image resolves to None
             finding = {
                 "SchemaVersion": "2018-10-08",
                 "Id": instanceArn + "/ec2-ami-status-check",
@@ -377,7 +377,7 @@ def mwaa_dag_processing_logging_check(cache: dict, awsAccountId: str, awsRegion:
                 "FirstObservedAt": iso8601Time,
                 "CreatedAt": iso8601Time,
                 "UpdatedAt": iso8601Time,
-                "Severity": {"Label": "PASSED"},
+                "Severity": {"Label": "INFORMATIONAL"},
                 "Confidence": 99,
                 "Title": "[MWAA.3] Managed Apache Airflow Environments should have DAG Processing logs enabled",
                 "Description": "Managed Apache Airflow Environment " 
@@ -503,7 +503,7 @@ def mwaa_scheduler_logging_check(cache: dict, awsAccountId: str, awsRegion: str,
                 "FirstObservedAt": iso8601Time,
                 "CreatedAt": iso8601Time,
                 "UpdatedAt": iso8601Time,
-                "Severity": {"Label": "PASSED"},
+                "Severity": {"Label": "INFORMATIONAL"},
                 "Confidence": 99,
                 "Title": "[MWAA.4] Managed Apache Airflow Environments should have Scheduler logs enabled",
                 "Description": "Managed Apache Airflow Environment " 
@@ -629,7 +629,7 @@ def mwaa_task_logging_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
                 "FirstObservedAt": iso8601Time,
                 "CreatedAt": iso8601Time,
                 "UpdatedAt": iso8601Time,
-                "Severity": {"Label": "PASSED"},
+                "Severity": {"Label": "INFORMATIONAL"},
                 "Confidence": 99,
                 "Title": "[MWAA.5] Managed Apache Airflow Environments should have Task logs enabled",
                 "Description": "Managed Apache Airflow Environment " 
@@ -755,7 +755,7 @@ def mwaa_webserver_logging_check(cache: dict, awsAccountId: str, awsRegion: str,
                 "FirstObservedAt": iso8601Time,
                 "CreatedAt": iso8601Time,
                 "UpdatedAt": iso8601Time,
-                "Severity": {"Label": "PASSED"},
+                "Severity": {"Label": "INFORMATIONAL"},
                 "Confidence": 99,
                 "Title": "[MWAA.6] Managed Apache Airflow Environments should have Webserver logs enabled",
                 "Description": "Managed Apache Airflow Environment " 
@@ -881,7 +881,7 @@ def mwaa_worker_logging_check(cache: dict, awsAccountId: str, awsRegion: str, aw
                 "FirstObservedAt": iso8601Time,
                 "CreatedAt": iso8601Time,
                 "UpdatedAt": iso8601Time,
-                "Severity": {"Label": "PASSED"},
+                "Severity": {"Label": "INFORMATIONAL"},
                 "Confidence": 99,
                 "Title": "[MWAA.7] Managed Apache Airflow Environments should have Worker logs enabled",
                 "Description": "Managed Apache Airflow Environment " 
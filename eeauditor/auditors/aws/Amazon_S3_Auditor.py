@@ -21,11 +21,14 @@
 import boto3
 import datetime
 from check_register import CheckRegister
+from bucket_config import BucketConfigCollector
 
 registry = CheckRegister()
 # import boto3 clients
 s3 = boto3.client("s3")
 s3control = boto3.client("s3control")
+# every bucket configuration is read once, concurrently and from the bucket's own Region
+bucketConfigCollector = BucketConfigCollector(s3)
 # loop through s3 buckets
 def list_buckets(cache):
     response = cache.get("list_buckets")
@@ -34,10 +37,14 @@ def list_buckets(cache):
     cache["list_buckets"] = s3.list_buckets()
     return cache["list_buckets"]
 
+def get_bucket_configs(cache):
+    return bucketConfigCollector.collect([str(bucket["Name"]) for bucket in list_buckets(cache=cache)["Buckets"]])
+
 @registry.register_check("s3")
 def bucket_encryption_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[S3.1] S3 Buckets should be encrypted"""
     bucket = list_buckets(cache=cache)
+    bucketConfigs = get_bucket_configs(cache)
     myS3Buckets = bucket["Buckets"]
     iso8601Time = (
         datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
@@ -46,7 +53,7 @@ def bucket_encryption_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
         bucketName = str(buckets["Name"])
         s3Arn = f"arn:{awsPartition}:s3:::{bucketName}"
         try:
-            response = s3.get_bucket_encryption(Bucket=bucketName)
+            response = bucketConfigs[bucketName].get("get_bucket_encryption")
             for rules in response["ServerSideEncryptionConfiguration"]["Rules"]:
                 sseType = str(
                     rules["ApplyServerSideEncryptionByDefault"]["SSEAlgorithm"]
@@ -164,6 +171,7 @@ def bucket_encryption_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
 def bucket_lifecycle_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[S3.2] S3 Buckets should implement lifecycle policies for data archival and recovery operations"""
     bucket = list_buckets(cache=cache)
+    bucketConfigs = get_bucket_configs(cache)
     myS3Buckets = bucket["Buckets"]
     for buckets in myS3Buckets:
         bucketName = str(buckets["Name"])
@@ -172,7 +180,7 @@ def bucket_lifecycle_check(cache: dict, awsAccountId: str, awsRegion: str, awsPa
             datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
         )
         try:
-            s3.get_bucket_lifecycle_configuration(Bucket=bucketName)
+            bucketConfigs[bucketName].get("get_bucket_lifecycle_configuration")
             # this is a passing check
             finding = {
                 "SchemaVersion": "2018-10-08",
@@ -294,6 +302,7 @@ def bucket_lifecycle_check(cache: dict, awsAccountId: str, awsRegion: str, awsPa
 def bucket_versioning_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[S3.3] S3 Buckets should have versioning enabled"""
     bucket = list_buckets(cache=cache)
+    bucketConfigs = get_bucket_configs(cache)
     myS3Buckets = bucket["Buckets"]
     for buckets in myS3Buckets:
         bucketName = str(buckets["Name"])
@@ -302,7 +311,7 @@ def bucket_versioning_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
             datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
         )
         try:
-            response = s3.get_bucket_versioning(Bucket=bucketName)
+            response = bucketConfigs[bucketName].get("get_bucket_versioning")
             versioningCheck = str(response["Status"])
             print(versioningCheck)
             finding = {
@@ -422,6 +431,7 @@ def bucket_versioning_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
 def bucket_policy_allows_public_access_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[S3.4] S3 Bucket Policies should not allow public access to the bucket"""
     bucket = list_buckets(cache=cache)
+    bucketConfigs = get_bucket_configs(cache)
     myS3Buckets = bucket["Buckets"]
     for buckets in myS3Buckets:
         bucketName = str(buckets["Name"])
@@ -430,9 +440,9 @@ def bucket_policy_allows_public_access_check(cache: dict, awsAccountId: str, aws
             datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
         )
         try:
-            response = s3.get_bucket_policy(Bucket=bucketName)
+            response = bucketConfigs[bucketName].get("get_bucket_policy")
             try:
-                response = s3.get_bucket_policy_status(Bucket=bucketName)
+                response = bucketConfigs[bucketName].get("get_bucket_policy_status")
                 publicBucketPolicyCheck = str(response["PolicyStatus"]["IsPublic"])
                 if publicBucketPolicyCheck != "False":
                     finding = {
@@ -556,6 +566,7 @@ def bucket_policy_allows_public_access_check(cache: dict, awsAccountId: str, aws
 def bucket_policy_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[S3.5] S3 Buckets should have a bucket policy configured"""
     bucket = list_buckets(cache=cache)
+    bucketConfigs = get_bucket_configs(cache)
     myS3Buckets = bucket["Buckets"]
     for buckets in myS3Buckets:
         bucketName = str(buckets["Name"])
@@ -564,7 +575,7 @@ def bucket_policy_check(cache: dict, awsAccountId: str, awsRegion: str, awsParti
             datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
         )
         try:
-            s3.get_bucket_policy(Bucket=bucketName)
+            bucketConfigs[bucketName].get("get_bucket_policy")
             # print("This bucket has a policy but we wont be printing that in the logs lol")
             # this is a passing check
             finding = {
@@ -687,6 +698,7 @@ def bucket_policy_check(cache: dict, awsAccountId: str, awsRegion: str, awsParti
 def bucket_access_logging_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[S3.6] S3 Buckets should have server access logging enabled"""
     bucket = list_buckets(cache=cache)
+    bucketConfigs = get_bucket_configs(cache)
     myS3Buckets = bucket["Buckets"]
     for buckets in myS3Buckets:
         bucketName = str(buckets["Name"])
@@ -695,7 +707,7 @@ def bucket_access_logging_check(cache: dict, awsAccountId: str, awsRegion: str,
             datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
         )
         try:
-            s3.get_bucket_logging(Bucket=bucketName)["LoggingEnabled"]
+            bucketConfigs[bucketName].get("get_bucket_logging")["LoggingEnabled"]
             # this is a passing check
             finding = {
                 "SchemaVersion": "2018-10-08",
@@ -23,10 +23,12 @@ from dateutil import parser
 import boto3
 import json
 from check_register import CheckRegister
+from metric_batcher import MetricBatcher
 
 registry = CheckRegister()
 sqs = boto3.client("sqs")
 cloudwatch = boto3.client("cloudwatch")
+metricBatcher = MetricBatcher(cloudwatch)
 
 def list_queues(cache):
     response = cache.get("list_queues")
@@ -41,6 +43,23 @@ def sqs_old_message_check(cache: dict, awsAccountId: str, awsRegion: str, awsPar
     response = list_queues(cache)
     iso8601Time = datetime.datetime.now(datetime.timezone.utc).isoformat()
     if 'QueueUrls' in response:
+        # the age of the oldest message of every queue is fetched in batches of 500 up front
+        oldestMessageAges = metricBatcher.get_series(
+            {
+                queueUrl.rsplit("/", 1)[-1]: {
+                    "Metric": {
+                        "Namespace": "AWS/SQS",
+                        "MetricName": "ApproximateAgeOfOldestMessage",
+                        "Dimensions": [{"Name": "QueueName", "Value": queueUrl.rsplit("/", 1)[-1]}],
+                    },
+                    "Period": 3600,
+                    "Stat": "Maximum",
+                    "Unit": "Seconds",
+                }
+                for queueUrl in response["QueueUrls"]
+            },
+            datetime.timedelta(days=1),
+        )
         for queueUrl in response["QueueUrls"]:
             queueName = queueUrl.rsplit("/", 1)[-1]
             attributes = sqs.get_queue_attributes(
@@ -48,35 +67,14 @@ def sqs_old_message_check(cache: dict, awsAccountId: str, awsRegion: str, awsPar
             )
             messageRetention = attributes["Attributes"]["MessageRetentionPeriod"]
             queueArn = attributes["Attributes"]["QueueArn"]
-            metricResponse = cloudwatch.get_metric_data(
-                MetricDataQueries=[
-                    {
-                        "Id": "m1",
-                        "MetricStat": {
-                            "Metric": {
-                                "Namespace": "AWS/SQS",
-                                "MetricName": "ApproximateAgeOfOldestMessage",
-                                "Dimensions": [{"Name": "QueueName", "Value": queueName}],
-                            },
-                            "Period": 3600,
-                            "Stat": "Maximum",
-                            "Unit": "Seconds",
-                        },
-                    },
-                ],
-                StartTime=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1),
-                EndTime=datetime.datetime.now(datetime.timezone.utc),
-            )
-            metrics = metricResponse["MetricDataResults"]
             counter = 0
             fail = False
-            for metric in metrics:
-                for value in metric["Values"]:
-                    if value > int(messageRetention) * 0.8:
-                        counter += 1
-                    if counter > 2:
-                        fail = True
-                        break
+            for value in oldestMessageAges[queueName]["Values"]:
+                if value > int(messageRetention) * 0.8:
+                    counter += 1
+                if counter > 2:
+                    fail = True
+                    break
             if not fail:
                 finding = {
                     "SchemaVersion": "2018-10-08",
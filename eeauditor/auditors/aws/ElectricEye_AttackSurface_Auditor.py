@@ -19,9 +19,9 @@
 #under the License.
 
 import boto3
-import nmap3
 import datetime
 from check_register import CheckRegister
+from port_scanner import PortScanner
 from dateutil.parser import parse
 
 registry = CheckRegister()
@@ -32,8 +32,9 @@ elb = boto3.client("elb")
 cloudfront = boto3.client("cloudfront")
 route53 = boto3.client("route53")
 
-# Instantiate a NMAP scanner for TCP scans to define ports
-nmap = nmap3.NmapScanTechniques()
+# Instantiate a NMAP scanner for TCP scans, shared by every Check so each IP is only scanned once. The ports,
+# and the file and TTL of the per IP result cache, are set with the ATTACK_SURFACE_* environment variables
+portScanner = PortScanner.from_environment()
 
 def ec2_paginate(cache):
     instanceList = []
@@ -97,26 +98,20 @@ def get_public_hosted_zones(cache):
         cache["get_hosted_zones"] = zones
         return cache["get_hosted_zones"]
 
-# This function performs the actual NMAP Scan
-def scan_host(host_ip, host_name, asset_type):
-    try:
-        results = nmap.nmap_tcp_scan(
-            host_ip,
-            # FTP, SSH, TelNet, SMTP, HTTP, POP3, NetBIOS, SMB, RDP, MSSQL, MySQL/MariaDB, NFS, Docker, Oracle, PostgreSQL, 
-            # Kibana, VMWare, Proxy, Splunk, K8s, Redis, Kafka, Mongo, Rabbit/AmazonMQ, SparkUI
-            args="-Pn -p 21,22,23,25,80,110,139,445,3389,1433,3306,2049,2375,1521,5432,5601,8182,8080,8089,10250,6379,9092,27017,5672,4040"
-        )
-
-        print(f"Scanning {asset_type} {host_name} on {host_ip}")
-        return results
-    except KeyError:
-        results = None
+# This function performs the actual NMAP Scan of every target of a Check at once, returning a dict of
+# target to the scan results of its IP or None if it could not be resolved or scanned
+def scan_hosts(hosts, asset_type):
+    return portScanner.scan(hosts, asset_type)
 
 @registry.register_check("ec2")
 def ec2_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
     """[AttackSurface.EC2.{checkIdNumber}] EC2 Instances should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Scan every public Instance before creating any findings
+    scanResults = scan_hosts(
+        [i["PublicIpAddress"] for i in ec2_paginate(cache=cache) if i.get("PublicIpAddress")], "EC2 Instance"
+    )
     # Paginate the iterator object from Cache
     for i in ec2_paginate(cache=cache):
         instanceId = str(i["InstanceId"])
@@ -137,7 +132,7 @@ def ec2_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, awsRe
         except KeyError:
             continue
         else:
-            scanner = scan_host(hostIp, instanceId, "EC2 Instance")
+            scanner = scanResults.get(hostIp)
             # NoneType returned on KeyError due to Nmap errors
             if scanner == None:
                 continue
@@ -306,6 +301,14 @@ def elbv2_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, aws
     """[AttackSurface.ELBv2.{checkIdNumber}] Application Load Balancers should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Scan every public ALB before creating any findings
+    scanResults = scan_hosts(
+        [
+            str(lb["DNSName"]) for lb in describe_load_balancers(cache)["LoadBalancers"]
+            if str(lb["Scheme"]) == 'internet-facing' and str(lb["Type"]) == 'application'
+        ],
+        "Application load balancer"
+    )
     # Loop ELBs and select the public ALBs
     for lb in describe_load_balancers(cache)["LoadBalancers"]:
         elbv2Arn = str(lb["LoadBalancerArn"])
@@ -316,7 +319,7 @@ def elbv2_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, aws
         elbv2VpcId = str(lb["VpcId"])
         elbv2IpAddressType = str(lb["IpAddressType"])
         if (elbv2Scheme == 'internet-facing' and elbv2LbType == 'application'):
-            scanner = scan_host(elbv2DnsName, elbv2Name, "Application load balancer")
+            scanner = scanResults.get(elbv2DnsName)
             # NoneType returned on KeyError due to Nmap errors
             if scanner == None:
                 continue
@@ -490,6 +493,14 @@ def elb_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, awsRe
     """[AttackSurface.ELB.{checkIdNumber}] Classic Load Balancers should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Scan every public CLB before creating any findings
+    scanResults = scan_hosts(
+        [
+            str(lb["DNSName"]) for lb in describe_clbs(cache)["LoadBalancerDescriptions"]
+            if str(lb["Scheme"]) == 'internet-facing'
+        ],
+        "Classic load balancer"
+    )
     for lb in describe_clbs(cache)["LoadBalancerDescriptions"]:
         clbName = str(lb["LoadBalancerName"])
         clbArn = f"arn:{awsPartition}:elasticloadbalancing:{awsRegion}:{awsAccountId}:loadbalancer/{clbName}"
@@ -500,7 +511,7 @@ def elb_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, awsRe
         lbVpc = lb["VPCId"]
         clbScheme = str(lb["Scheme"])
         if clbScheme == 'internet-facing':
-            scanner = scan_host(dnsName, clbName)
+            scanner = scanResults.get(dnsName)
             # NoneType returned on KeyError due to Nmap errors
             if scanner == None:
                 continue
@@ -678,14 +689,16 @@ def eip_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str, awsRe
     """[AttackSurface.EIP.{checkIdNumber}] Elastic IPs should not advertise publicly reachable {serviceName} services"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
-    # Gather all EIPs
-    for x in ec2.describe_addresses()["Addresses"]:
+    # Gather all EIPs and scan them before creating any findings
+    addresses = ec2.describe_addresses()["Addresses"]
+    scanResults = scan_hosts([x["PublicIp"] for x in addresses], "Elastic IP")
+    for x in addresses:
         publicIp = x["PublicIp"]
         allocationId = x["AllocationId"]
         eipArn = f"arn:{awsPartition}:ec2:{awsRegion}:{awsAccountId}:eip-allocation/{allocationId}"
         privateIpAddress = x["PrivateIpAddress"]
         # Logic time
-        scanner = scan_host(publicIp, allocationId, "Elastic IP")
+        scanner = scanResults.get(publicIp)
         # NoneType returned on KeyError due to Nmap errors
         if scanner == None:
             continue
@@ -850,13 +863,15 @@ def cloudfront_attack_surface_open_tcp_port_check(cache: dict, awsAccountId: str
     """[AttackSurface.Cloudfront.{checkIdNumber}] Cloudfront Distributions should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Scan every Distribution before creating any findings
+    scanResults = scan_hosts([dist["DomainName"] for dist in cloudfront_paginate(cache)], "CloudFront Distribution")
     for dist in cloudfront_paginate(cache):
         distributionId = dist["Id"]
         distributionArn = dist["ARN"]
         domainName = dist["DomainName"]
         distStatus = dist["Status"]
         # Logic time
-        scanner = scan_host(domainName, distributionId, "CloudFront Distribution")
+        scanner = scanResults.get(domainName)
         # NoneType returned on KeyError due to Nmap errors
         if scanner == None:
             continue
@@ -1023,19 +1038,28 @@ def route53_public_hz_attack_surface_open_tcp_port_check(cache: dict, awsAccount
     """[AttackSurface.Route53.{checkIdNumber}] Route53 Public Hosted Zones A Records should not be publicly reachable on {serviceName}"""
     # ISO Time
     iso8601Time = (datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat())
+    # Get the A Records of every Zone and scan them before creating any findings
+    recordSets = {
+        zone["Id"]: route53.list_resource_record_sets(HostedZoneId=zone["Id"])["ResourceRecordSets"]
+        for zone in get_public_hosted_zones(cache=cache)
+    }
+    scanResults = scan_hosts(
+        [str(record["Name"]) for records in recordSets.values() for record in records if str(record["Type"]) == "A"],
+        "Route53 Public Hosted Zone A Record"
+    )
     for zone in get_public_hosted_zones(cache=cache):
         hzId = zone["Id"]
         hzName = zone["Name"]
         hzArn = f"arn:aws:route53:::hostedzone/{hzName}"
         # Get the A Records
-        for record in route53.list_resource_record_sets(HostedZoneId=hzId)["ResourceRecordSets"]:
+        for record in recordSets[hzId]:
             # skip non "A" Records - "A" will also pick up on Alias records to LBs, etc.
             if str(record["Type"]) != "A":
                 continue
             else:
                 resourceRecord = str(record["Name"])
                 # Logic time
-                scanner = scan_host(resourceRecord, hzName, "Route53 Public Hosted Zone A Record")
+                scanner = scanResults.get(resourceRecord)
                 # NoneType returned on KeyError due to Nmap errors
                 if scanner == None:
                     continue
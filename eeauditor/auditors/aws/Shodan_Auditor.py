@@ -20,10 +20,9 @@
 
 import boto3
 import os
-import requests
-import socket
 import datetime
 from check_register import CheckRegister
+from shodan_client import ShodanClient
 
 registry = CheckRegister()
 # import boto3 clients
@@ -49,8 +48,9 @@ try:
 except KeyError:
     raise
 
-# Shodan information for Requests
-shodanUrl = "https://api.shodan.io/shodan/host/"
+# Shared by every Check so each IP is only looked up once, the cache file and TTL and the rate limit are set with
+# the SHODAN_* environment variables
+shodan = ShodanClient.from_environment(shodanApiKey)
 
 @registry.register_check("shodan")
 def public_ec2_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsPartition: str) -> dict:
@@ -58,6 +58,12 @@ def public_ec2_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
     # ISO Time
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     response = ec2.describe_instances(DryRun=False, MaxResults=500)
+    lookups = shodan.lookup_many(
+        [
+            str(inst["PublicIpAddress"]) for res in response["Reservations"] for inst in res["Instances"]
+            if "PublicIpAddress" in inst
+        ]
+    )
     for res in response["Reservations"]:
         for inst in res["Instances"]:
             ec2Type = str(inst["InstanceType"])
@@ -68,9 +74,8 @@ def public_ec2_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
             ec2VpcId = str(inst["VpcId"])
             ec2SubnetId = str(inst["SubnetId"])
             ec2PublicIp = str(inst["PublicIpAddress"])
-            # use requests Library to check the Shodan index for your host
-            r = requests.get(url=shodanUrl + ec2PublicIp + "?key=" + shodanApiKey)
-            data = r.json()
+            # check the Shodan index for your host
+            data = lookups[ec2PublicIp]
             shodanOutput = str(data)
             if shodanOutput == "{'error': 'No information available for that IP.'}":
                 # this is a passing check
@@ -207,6 +212,12 @@ def public_alb_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
     # ISO Time
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     response = elbv2.describe_load_balancers()
+    lookups = shodan.lookup_many(
+        [
+            shodan.resolve(str(lbs["DNSName"])) for lbs in response["LoadBalancers"]
+            if str(lbs["Scheme"]) == "internet-facing" and str(lbs["Type"]) == "application"
+        ]
+    )
     for lbs in response["LoadBalancers"]:
         elbv2Scheme = str(lbs["Scheme"])
         elbv2Type = str(lbs["Type"])
@@ -216,10 +227,9 @@ def public_alb_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
         elbv2Dns = str(lbs["DNSName"])
         if elbv2Scheme == "internet-facing" and elbv2Type == "application":
             # use Socket to do a DNS lookup and retrieve the IP address
-            elbv2Ip = socket.gethostbyname(elbv2Dns)
-            # use requests Library to check the Shodan index for your host
-            r = requests.get(url=shodanUrl + elbv2Ip + "?key=" + shodanApiKey)
-            data = r.json()
+            elbv2Ip = shodan.resolve(elbv2Dns)
+            # check the Shodan index for your host
+            data = lookups[elbv2Ip]
             shodanOutput = str(data)
             if shodanOutput == "{'error': 'No information available for that IP.'}":
                 # this is a passing check
@@ -356,6 +366,12 @@ def public_rds_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
     # ISO Time
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     response = rds.describe_db_instances()
+    lookups = shodan.lookup_many(
+        [
+            shodan.resolve(str(rdsdb["Endpoint"]["Address"])) for rdsdb in response["DBInstances"]
+            if str(rdsdb["PubliclyAccessible"]) == "True"
+        ]
+    )
     for rdsdb in response["DBInstances"]:
         rdsInstanceId = str(rdsdb["DBInstanceIdentifier"])
         rdsInstanceArn = str(rdsdb["DBInstanceArn"])
@@ -367,10 +383,9 @@ def public_rds_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
         publicCheck = str(rdsdb["PubliclyAccessible"])
         if publicCheck == "True":
             # use Socket to do a DNS lookup and retrieve the IP address
-            rdsIp = socket.gethostbyname(rdsDns)
-            # use requests Library to check the Shodan index for your host
-            r = requests.get(url=shodanUrl + rdsIp + "?key=" + shodanApiKey)
-            data = r.json()
+            rdsIp = shodan.resolve(rdsDns)
+            # check the Shodan index for your host
+            data = lookups[rdsIp]
             shodanOutput = str(data)
             if shodanOutput == "{'error': 'No information available for that IP.'}":
                 # this is a passing check
@@ -511,9 +526,19 @@ def public_es_domain_shodan_check(cache: dict, awsAccountId: str, awsRegion: str
     # ISO Time
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     response = elasticsearch.list_domain_names()
+    domainDescriptions = {
+        str(domain["DomainName"]): elasticsearch.describe_elasticsearch_domain(DomainName=str(domain["DomainName"]))
+        for domain in response["DomainNames"]
+    }
+    lookups = shodan.lookup_many(
+        [
+            shodan.resolve(str(description["DomainStatus"]["Endpoint"])) for description in domainDescriptions.values()
+            if "VPCOptions" not in description["DomainStatus"]
+        ]
+    )
     for domain in response["DomainNames"]:
         esDomain = str(domain["DomainName"])
-        response = elasticsearch.describe_elasticsearch_domain(DomainName=esDomain)
+        response = domainDescriptions[esDomain]
         esDomainId = str(response["DomainStatus"]["DomainId"])
         esDomainName = str(response["DomainStatus"]["DomainName"])
         esDomainArn = str(response["DomainStatus"]["ARN"])
@@ -526,10 +551,9 @@ def public_es_domain_shodan_check(cache: dict, awsAccountId: str, awsRegion: str
         except Exception as e:
             if str(e) == "'VPCOptions'":
                 # use Socket to do a DNS lookup and retrieve the IP address
-                esDomainIp = socket.gethostbyname(esDomainEndpoint)
-                # use requests Library to check the Shodan index for your host
-                r = requests.get(url=shodanUrl + esDomainIp + "?key=" + shodanApiKey)
-                data = r.json()
+                esDomainIp = shodan.resolve(esDomainEndpoint)
+                # check the Shodan index for your host
+                data = lookups[esDomainIp]
                 shodanOutput = str(data)
                 if shodanOutput == "{'error': 'No information available for that IP.'}":
                     # this is a passing check
@@ -674,6 +698,12 @@ def public_clb_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
     # ISO Time
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     response = elb.describe_load_balancers()
+    lookups = shodan.lookup_many(
+        [
+            shodan.resolve(str(clbs["DNSName"])) for clbs in response["LoadBalancerDescriptions"]
+            if str(clbs["Scheme"]) == "internet-facing"
+        ]
+    )
     for clbs in response["LoadBalancerDescriptions"]:
         clbName = str(clbs["LoadBalancerName"])
         clbArn = f"arn:{awsPartition}:elasticloadbalancing:{awsRegion}:{awsAccountId}:loadbalancer/{clbName}"
@@ -681,10 +711,9 @@ def public_clb_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
         clbScheme = str(clbs["Scheme"])
         if clbScheme == "internet-facing":
             # use Socket to do a DNS lookup and retrieve the IP address
-            clbIp = socket.gethostbyname(clbDnsName)
-            # use requests Library to check the Shodan index for your host
-            r = requests.get(url=shodanUrl + clbIp + "?key=" + shodanApiKey)
-            data = r.json()
+            clbIp = shodan.resolve(clbDnsName)
+            # check the Shodan index for your host
+            data = lookups[clbIp]
             shodanOutput = str(data)
             if shodanOutput == "{'error': 'No information available for that IP.'}":
                 # this is a passing check
@@ -815,15 +844,20 @@ def public_dms_replication_instance_shodan_check(cache: dict, awsAccountId: str,
     # ISO Time
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     response = dms.describe_replication_instances()
+    lookups = shodan.lookup_many(
+        [
+            str(repinstances["ReplicationInstancePublicIpAddress"]) for repinstances in response["ReplicationInstances"]
+            if str(repinstances["PubliclyAccessible"]) == "True"
+        ]
+    )
     for repinstances in response["ReplicationInstances"]:
         dmsInstanceId = str(repinstances["ReplicationInstanceIdentifier"])
         dmsInstanceArn = str(repinstances["ReplicationInstanceArn"])
         publicAccessCheck = str(repinstances["PubliclyAccessible"])
         if publicAccessCheck == "True":
             dmsPublicIp = str(repinstances["ReplicationInstancePublicIpAddress"])
-            # use requests Library to check the Shodan index for your host
-            r = requests.get(url=shodanUrl + dmsPublicIp + "?key=" + shodanApiKey)
-            data = r.json()
+            # check the Shodan index for your host
+            data = lookups[dmsPublicIp]
             shodanOutput = str(data)
             if shodanOutput == "{'error': 'No information available for that IP.'}":
                 # this is a passing check
@@ -953,9 +987,18 @@ def public_amazon_mq_broker_shodan_check(cache: dict, awsAccountId: str, awsRegi
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     response = amzmq.list_brokers(MaxResults=100)
     myBrokers = response["BrokerSummaries"]
+    brokerDescriptions = {
+        str(brokers["BrokerName"]): amzmq.describe_broker(BrokerId=str(brokers["BrokerName"])) for brokers in myBrokers
+    }
+    lookups = shodan.lookup_many(
+        [
+            str(instance["IpAddress"]) for description in brokerDescriptions.values()
+            if str(description["PubliclyAccessible"]) == "True" for instance in description["BrokerInstances"]
+        ]
+    )
     for brokers in myBrokers:
         brokerName = str(brokers["BrokerName"])
-        response = amzmq.describe_broker(BrokerId=brokerName)
+        response = brokerDescriptions[brokerName]
         brokerArn = str(response["BrokerArn"])
         brokerId = str(response["BrokerId"])
         publicAccessCheck = str(response["PubliclyAccessible"])
@@ -963,8 +1006,7 @@ def public_amazon_mq_broker_shodan_check(cache: dict, awsAccountId: str, awsRegi
             mqInstances = response["BrokerInstances"]
             for instance in mqInstances:
                 mqBrokerIpv4 = str(instance["IpAddress"])
-                r = requests.get(url=shodanUrl + mqBrokerIpv4 + "?key=" + shodanApiKey)
-                data = r.json()
+                data = lookups[mqBrokerIpv4]
                 shodanOutput = str(data)
                 iso8601time = (
                     datetime.datetime.utcnow()
@@ -1097,16 +1139,20 @@ def cloudfront_shodan_check(cache: dict, awsAccountId: str, awsRegion: str, awsP
     # ISO Time
     iso8601time = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
     paginator = cloudfront.get_paginator("list_distributions")
-    iterator = paginator.paginate()
+    iterator = list(paginator.paginate())
+    lookups = shodan.lookup_many(
+        [
+            shodan.resolve(str(cfront["DomainName"])) for page in iterator for cfront in page["DistributionList"]["Items"]
+        ]
+    )
     for page in iterator:
         for cfront in page["DistributionList"]["Items"]:
             domainName = str(cfront["DomainName"])
             cfArn = str(cfront["ARN"])
             cfId = str(cfront["Id"])
-            cfDomainIp = socket.gethostbyname(domainName)
-            # use requests Library to check the Shodan index for your host
-            r = requests.get(url=shodanUrl + cfDomainIp + "?key=" + shodanApiKey)
-            data = r.json()
+            cfDomainIp = shodan.resolve(domainName)
+            # check the Shodan index for your host
+            data = lookups[cfDomainIp]
             shodanOutput = str(data)
             if shodanOutput == "{'error': 'No information available for that IP.'}":
                 # this is a passing check
@@ -1238,16 +1284,18 @@ def global_accelerator_shodan_check(cache: dict, awsAccountId: str, awsRegion: s
     session = boto3.Session(region_name="us-west-2")
     gax = session.client("globalaccelerator")
     paginator = gax.get_paginator("list_accelerators")
-    iterator = paginator.paginate()
+    iterator = list(paginator.paginate())
+    lookups = shodan.lookup_many(
+        [shodan.resolve(str(ga["DnsName"])) for page in iterator for ga in page["Accelerators"]]
+    )
     for page in iterator:
         for ga in page["Accelerators"]:
             gaxArn = str(ga["AcceleratorArn"])
             gaxName = str(ga["Name"])
             gaxDns = str(ga["DnsName"])
-            gaxDomainIp = socket.gethostbyname(gaxDns)
-            # use requests Library to check the Shodan index for your host
-            r = requests.get(url=shodanUrl + gaxDomainIp + "?key=" + shodanApiKey)
-            data = r.json()
+            gaxDomainIp = shodan.resolve(gaxDns)
+            # check the Shodan index for your host
+            data = lookups[gaxDomainIp]
             shodanOutput = str(data)
             if shodanOutput == "{'error': 'No information available for that IP.'}":
                 # this is a passing check
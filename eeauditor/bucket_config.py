@@ -0,0 +1,108 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import boto3
+
+DEFAULT_MAX_WORKERS = 32
+# Every per-bucket configuration the S3 Checks evaluate
+BUCKET_CONFIG_OPERATIONS = [
+    "get_bucket_encryption",
+    "get_bucket_lifecycle_configuration",
+    "get_bucket_versioning",
+    "get_bucket_policy",
+    "get_bucket_policy_status",
+    "get_bucket_logging",
+]
+
+def bucket_region(locationConstraint):
+    """GetBucketLocation returns no constraint for us-east-1 and the legacy `EU` for eu-west-1"""
+    if not locationConstraint:
+        return "us-east-1"
+    if locationConstraint == "EU":
+        return "eu-west-1"
+    return locationConstraint
+
+class BucketConfig(object):
+    """The configuration of one bucket: the response of each read without its metadata, or the error it raised"""
+
+    __slots__ = ["name", "region", "responses", "errors"]
+
+    def __init__(self, name: str, region: str):
+        self.name = name
+        self.region = region
+        self.responses = {}
+        self.errors = {}
+
+    def get(self, operation: str):
+        """Returns the response of the operation, or raises the same error calling it would have"""
+        if operation in self.errors:
+            raise self.errors[operation]
+        return self.responses[operation]
+
+class BucketConfigCollector(object):
+    """Resolves the Region of every bucket once, then reads all of their configurations concurrently through
+    a client in the bucket's own Region so no read pays for a cross-Region redirect. Records are kept for the
+    run so every S3 Check evaluates the same reads"""
+
+    def __init__(self, client, operations: list = BUCKET_CONFIG_OPERATIONS, maxWorkers: int = DEFAULT_MAX_WORKERS):
+        self.client = client
+        self.operations = operations
+        self.maxWorkers = maxWorkers
+        self.clients = {client.meta.region_name: client}
+        self.records = {}
+        self.lock = threading.Lock()
+
+    def client_for(self, region: str):
+        with self.lock:
+            if region not in self.clients:
+                self.clients[region] = boto3.client("s3", region_name=region)
+            return self.clients[region]
+
+    def locate(self, bucketName: str):
+        try:
+            region = bucket_region(self.client.get_bucket_location(Bucket=bucketName).get("LocationConstraint"))
+        except Exception as e:
+            # reads through the default client are redirected, only slower
+            print(f"Could not get the Region of bucket {bucketName}: {e}")
+            region = self.client.meta.region_name
+        return BucketConfig(bucketName, region)
+
+    def read(self, record: BucketConfig, operation: str):
+        try:
+            response = getattr(self.client_for(record.region), operation)(Bucket=record.name)
+            response.pop("ResponseMetadata", None)
+            record.responses[operation] = response
+        except Exception as e:
+            record.errors[operation] = e.with_traceback(None)
+
+    def collect(self, bucketNames: list):
+        """Returns a dict of bucket name to its BucketConfig, reading buckets which were not collected yet"""
+        pending = [bucketName for bucketName in bucketNames if bucketName not in self.records]
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+                records = list(executor.map(self.locate, pending))
+                reads = [(record, operation) for record in records for operation in self.operations]
+                list(executor.map(lambda read: self.read(*read), reads))
+            self.records.update((record.name, record) for record in records)
+        return {bucketName: self.records[bucketName] for bucketName in bucketNames}
+
+    def clear(self):
+        self.records = {}
@@ -21,6 +21,7 @@ from functools import wraps
 
 class CheckRegister(object):
     checks = {}
+    prefetchers = {}
 
     def register_check(self, service_name):
         """Decorator registers event handlers
@@ -44,6 +45,20 @@ class CheckRegister(object):
 
         return decorator_register
 
+    def register_prefetch(self, service_name):
+        """Decorator registers functions which start slow, asynchronous work the
+        Checks of a service depend on (e.g. generating a report) before any Check runs
+
+        Args:
+            service_name: The service the Checks depending on the work are registered under.
+        """
+
+        def decorator_register(func):
+            self.prefetchers.setdefault(service_name, []).append(func)
+            return func
+
+        return decorator_register
+
 
 def accumulate_paged_results(page_iterator, key):
     results = {key: []}
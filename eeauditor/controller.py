@@ -21,31 +21,58 @@
 import sys
 import boto3
 import click
-from insights import create_sechub_insights
-from eeauditor import EEAuditor
-from processor.main import get_providers, process_findings
+from processor.main import DEDUPE_POLICIES, get_providers, process_findings, replay_findings
 
 
 def print_checks():
+    # imported here as EEAuditor creates AWS clients on import, which --list-options does not need
+    from eeauditor import EEAuditor
+
     app = EEAuditor(name="AWS Auditor")
 
     app.load_plugins()
     
     app.print_checks_md()
 
-def run_auditor(auditor_name=None, check_name=None, delay=0, outputs=None, output_file=""):
+def run_auditor(auditor_name=None, check_name=None, delay=0, outputs=None, output_file="", dedupe_policy="last", outbox_file="", rules_file="", enrich_tags=False, tag_scope=None, config_aggregator="", prune_empty_services=False):
     if not outputs:
         # default to AWS SecHub even if somehow Click destination is stripped
         outputs = ["sechub"]
 
+    from eeauditor import EEAuditor
+
     app = EEAuditor(name="AWS Auditor")
 
     app.load_plugins(plugin_name=auditor_name)
 
-    findings = list(app.run_checks(requested_check_name=check_name, delay=delay))
+    tagIndex = None
+    if enrich_tags or tag_scope:
+        from tag_enrichment import TagIndex, parse_tag_scope
+
+        tagIndex = TagIndex(parse_tag_scope(tag_scope), enrich_tags).load()
+
+    inventory = None
+    if config_aggregator:
+        from inventory import ConfigInventory
+
+        inventory = ConfigInventory(config_aggregator, [app.awsAccountId], [app.awsRegion]).load()
+
+    discovery = None
+    if prune_empty_services:
+        from discovery import ResourceDiscovery
+
+        discovery = ResourceDiscovery([app.awsRegion]).load()
+        discovery.print_report()
+
+    findings = list(
+        app.run_checks(
+            requested_check_name=check_name, delay=delay, tag_index=tagIndex, inventory=inventory, discovery=discovery
+        )
+    )
+    app.print_coverage_gaps()
 
     # This function writes the findings to Security Hub, or otherwise
-    process_findings(findings=findings, outputs=outputs, output_file=output_file)
+    process_findings(findings=findings, outputs=outputs, dedupe_policy=dedupe_policy, outbox_file=outbox_file, rules_file=rules_file, output_file=output_file)
 
     print("Done running Checks")
 
@@ -93,6 +120,56 @@ def run_auditor(auditor_name=None, check_name=None, delay=0, outputs=None, outpu
     show_default=True, 
     help="Name of the file for output, if using anything other than SecHub or Dops"
 )
+# Dedupe Policy
+@click.option(
+    "--dedupe-policy",
+    type=click.Choice(DEDUPE_POLICIES),
+    default="last",
+    show_default=True,
+    help="Which version of a finding to keep when multiple findings share the same Id, `last` keeps the most recent version"
+)
+# Outbox
+@click.option(
+    "--outbox-file",
+    default="",
+    help="Path to a local SQLite outbox, findings are written to it before any output so failed outputs can be replayed. Defaults to no outbox"
+)
+# Replay Outbox
+@click.option(
+    "--replay-outbox",
+    is_flag=True,
+    help="Deliver findings left in the --outbox-file by failed outputs without re-running any Checks"
+)
+# Rules File
+@click.option(
+    "--rules-file",
+    default="",
+    help="Path to a JSON file of suppression and routing rules which decide the findings each output receives. Defaults to no rules"
+)
+# Tag Enrichment
+@click.option(
+    "--enrich-tags",
+    is_flag=True,
+    help="Attach the tags of every resource to Resources[].Tags using a bulk Resource Groups Tagging API lookup"
+)
+# Tag Scope
+@click.option(
+    "--tag-scope",
+    multiple=True,
+    help="Only report on resources with this tag, as Key=Value or just Key. Values of the same Key are OR'd and different Keys are AND'd"
+)
+# AWS Config Inventory
+@click.option(
+    "--config-aggregator",
+    default="",
+    help="Name of an AWS Config aggregator to pull resources from with advanced queries instead of per-service describe calls. Defaults to no aggregator"
+)
+# Resource Discovery
+@click.option(
+    "--prune-empty-services",
+    is_flag=True,
+    help="Count resources with AWS Resource Explorer, or a cheap list call per service, and skip Auditors which have nothing to scan"
+)
 # List Output Options
 @click.option(
     "--list-options",
@@ -119,6 +196,14 @@ def main(
     delay,
     outputs,
     output_file,
+    dedupe_policy,
+    outbox_file,
+    replay_outbox,
+    rules_file,
+    enrich_tags,
+    tag_scope,
+    config_aggregator,
+    prune_empty_services,
     list_options,
     list_checks,
     create_insights,
@@ -135,15 +220,31 @@ def main(
         boto3.setup_default_session(profile_name=profile_name)
 
     if create_insights:
+        from insights import create_sechub_insights
+
         create_sechub_insights()
         sys.exit(2)
 
+    if replay_outbox:
+        if not outbox_file:
+            print("--replay-outbox requires the --outbox-file to replay from")
+            sys.exit(2)
+        replay_findings(outbox_file=outbox_file, rules_file=rules_file)
+        return
+
     run_auditor(
         auditor_name=auditor_name,
         check_name=check_name,
         delay=delay,
         outputs=outputs,
         output_file=output_file,
+        dedupe_policy=dedupe_policy,
+        outbox_file=outbox_file,
+        rules_file=rules_file,
+        enrich_tags=enrich_tags,
+        tag_scope=tag_scope,
+        config_aggregator=config_aggregator,
+        prune_empty_services=prune_empty_services,
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import datetime
+import threading
+import time
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
+
+DEFAULT_POLL_INTERVAL = 2
+DEFAULT_TIMEOUT = 300
+# the row of the root user, the IAM Checks only evaluate IAM users
+ROOT_ACCOUNT = "<root_account>"
+BOOLEAN_SUFFIXES = ("_enabled", "_active")
+TIMESTAMP_SUFFIXES = ("_time", "_last_used", "_last_changed", "_next_rotation", "_last_rotated", "_last_used_date")
+
+def parse_report(content: bytes):
+    """Parses the credential report CSV into a columnar table. `true`/`false` columns become booleans and
+    timestamp columns become UTC timestamps, with `N/A`, `no_information` and `not_supported` becoming nulls"""
+    columnNames = content.split(b"\n", 1)[0].decode().strip().split(",")
+    table = csv.read_csv(
+        pa.BufferReader(content),
+        convert_options=csv.ConvertOptions(column_types={name: pa.string() for name in columnNames})
+    )
+    columns = {}
+    for name in table.column_names:
+        column = table[name]
+        if name.endswith(BOOLEAN_SUFFIXES):
+            column = pc.equal(column, "true")
+        elif name.endswith(TIMESTAMP_SUFFIXES):
+            # timestamps are ISO 8601 in UTC, e.g. 2021-05-09T01:25:01+00:00
+            column = pc.strptime(
+                pc.utf8_slice_codeunits(column, 0, 19), format="%Y-%m-%dT%H:%M:%S", unit="s", error_is_null=True
+            )
+        columns[name] = column
+    return pa.table(columns)
+
+def older_than(table, column: str, days: int, now: datetime.datetime = None):
+    """Boolean mask of the rows whose timestamp in `column` is more than `days` old, rows without one are False"""
+    now = now or datetime.datetime.utcnow()
+    cutoff = pa.scalar(now - datetime.timedelta(days=days), type=pa.timestamp("s"))
+    return pc.fill_null(pc.less(table[column], cutoff), False)
+
+def unused_for(table, lastUsed: str, since: str, days: int, now: datetime.datetime = None):
+    """Boolean mask of the rows whose credential was last used more than `days` ago, or was never used
+    and has existed since the timestamp in `since` for more than `days`"""
+    neverUsed = pc.and_(pc.is_null(table[lastUsed]), older_than(table, since, days, now))
+    return pc.or_(older_than(table, lastUsed, days, now), neverUsed)
+
+def select(table, mask, **flags):
+    """Rows of the table where `mask` is True as dicts, with every flag column added under its keyword"""
+    for name, flag in flags.items():
+        table = table.append_column(name, flag)
+    return table.filter(mask).to_pylist()
+
+class CredentialReport(object):
+    """The IAM credential report of an account, generated in the background as soon as it is started so
+    it overlaps with the Checks of other Auditors, then parsed once into a columnar table which the IAM
+    Checks evaluate with vectorized predicates instead of listing keys and MFA devices of every user"""
+
+    def __init__(self, client, pollInterval: float = DEFAULT_POLL_INTERVAL, timeout: float = DEFAULT_TIMEOUT):
+        self.client = client
+        self.pollInterval = pollInterval
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.accountId = None
+        self.thread = None
+        self.table = None
+        self.error = None
+
+    def start(self, awsAccountId: str):
+        """Starts generating the report of the account unless it already is, does not block"""
+        with self.lock:
+            if self.thread and self.accountId == awsAccountId:
+                return
+            self.clear()
+            self.accountId = awsAccountId
+            self.thread = threading.Thread(target=self.generate, daemon=True)
+            self.thread.start()
+
+    def generate(self):
+        try:
+            deadline = time.monotonic() + self.timeout
+            # GenerateCredentialReport is idempotent and returns COMPLETE once a report less than 4 hours old exists
+            while self.client.generate_credential_report()["State"] != "COMPLETE":
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Credential report was not generated within {self.timeout} seconds")
+                time.sleep(self.pollInterval)
+            table = parse_report(self.client.get_credential_report()["Content"])
+            self.table = table.filter(pc.not_equal(table["user"], ROOT_ACCOUNT))
+            print(f"Loaded IAM credential report of {self.table.num_rows} users")
+        except Exception as e:
+            self.error = e
+
+    def get(self, awsAccountId: str):
+        """Waits for the report of the account, starting it if it was not prefetched, and returns its users"""
+        self.start(awsAccountId)
+        self.thread.join()
+        if self.error:
+            raise self.error
+        return self.table
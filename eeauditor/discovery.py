@@ -0,0 +1,119 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+
+resourceExplorer = boto3.client("resource-explorer-2")
+
+# Services whose Checks only ever report on resources they list, so a Region with none of them has nothing to
+# report. Services with any account-level Check (e.g. "GuardDuty should be enabled") must never be pruned.
+# Each maps to its Resource Explorer resource types and a cheap probe of (client, operation, kwargs, result key)
+DISCOVERY_SERVICES = {
+    "cloud9": (["cloud9:environment"], ("cloud9", "list_environments", {"maxResults": 1}, "environmentIds")),
+    "dynamodb": (["dynamodb:table"], ("dynamodb", "list_tables", {"Limit": 1}, "TableNames")),
+    "efs": (["elasticfilesystem:file-system"], ("efs", "describe_file_systems", {"MaxItems": 1}, "FileSystems")),
+    "eks": (["eks:cluster"], ("eks", "list_clusters", {"maxResults": 1}, "clusters")),
+    "elasticache": (
+        ["elasticache:cluster"], ("elasticache", "describe_cache_clusters", {"MaxRecords": 20}, "CacheClusters")
+    ),
+    "es": (["es:domain"], ("es", "list_domain_names", {}, "DomainNames")),
+    "firehose": (
+        ["firehose:deliverystream"], ("firehose", "list_delivery_streams", {"Limit": 1}, "DeliveryStreamNames")
+    ),
+    "kafka": (["kafka:cluster"], ("kafka", "list_clusters", {"MaxResults": 1}, "ClusterInfoList")),
+    "kinesis": (["kinesis:stream"], ("kinesis", "list_streams", {"Limit": 1}, "StreamNames")),
+    "mq": (["mq:broker"], ("mq", "list_brokers", {"MaxResults": 1}, "BrokerSummaries")),
+    "qldb": (["qldb:ledger"], ("qldb", "list_ledgers", {"MaxResults": 1}, "Ledgers")),
+    "redshift": (["redshift:cluster"], ("redshift", "describe_clusters", {"MaxRecords": 20}, "Clusters")),
+    "sqs": (["sqs:queue"], ("sqs", "list_queues", {"MaxResults": 1}, "QueueUrls")),
+}
+MAX_PROBE_WORKERS = 8
+
+class ResourceDiscovery(object):
+    """Counts the resources of each (Region, service) before any Check runs, from a Resource Explorer index
+    when one can see the Region or from a cheap list call per service otherwise, so empty services are skipped"""
+
+    def __init__(self, regions: list):
+        self.regions = regions
+        # (region, service) -> resource count, None when it could not be determined
+        self.counts = {}
+        self.sources = {}
+
+    def load(self):
+        indexRegions = self.index_regions()
+        probes = []
+        for region in self.regions:
+            if region in indexRegions:
+                for service in DISCOVERY_SERVICES:
+                    self.counts[(region, service)] = self.search_count(region, service)
+                    self.sources[(region, service)] = "Resource Explorer"
+            else:
+                probes.extend((region, service) for service in DISCOVERY_SERVICES)
+        # probes are independent calls to different endpoints, so they are made concurrently
+        with ThreadPoolExecutor(max_workers=MAX_PROBE_WORKERS) as executor:
+            for key, count in zip(probes, executor.map(lambda key: self.probe_count(*key), probes)):
+                self.counts[key] = count
+                self.sources[key] = "probe"
+        return self
+
+    def index_regions(self):
+        """Regions the Resource Explorer index in the current Region can answer for"""
+        try:
+            index = resourceExplorer.get_index()
+        except Exception as e:
+            print(f"No Resource Explorer index available, probing each service instead: {e}")
+            return set()
+        if index.get("State") != "ACTIVE":
+            return set()
+        if index.get("Type") == "AGGREGATOR":
+            return set(self.regions)
+        return {resourceExplorer.meta.region_name}
+
+    def search_count(self, region: str, service: str):
+        resourceTypes, _ = DISCOVERY_SERVICES[service]
+        # filters with the same prefix are OR'd, different prefixes are AND'd
+        queryString = " ".join([f"resourcetype:{t}" for t in resourceTypes] + [f"region:{region}"])
+        try:
+            return resourceExplorer.search(QueryString=queryString, MaxResults=1)["Count"]["TotalResources"]
+        except Exception as e:
+            print(f"Resource Explorer search for {service} in {region} failed with exception {e}")
+            return None
+
+    def probe_count(self, region: str, service: str):
+        _, (clientName, operation, kwargs, key) = DISCOVERY_SERVICES[service]
+        try:
+            response = getattr(boto3.client(clientName, region_name=region), operation)(**kwargs)
+        except Exception as e:
+            print(f"Probe for {service} in {region} failed with exception {e}")
+            return None
+        return len(response.get(key, []))
+
+    def is_empty(self, region: str, service: str):
+        """Only services which were counted and found to have no resources are empty"""
+        return self.counts.get((region, service)) == 0
+
+    def print_report(self):
+        pruned = sorted(key for key, count in self.counts.items() if count == 0)
+        unknown = sorted(key for key, count in self.counts.items() if count is None)
+        print(f"Resource discovery pruned {len(pruned)} of {len(self.counts)} (Region, service) pairs with no resources")
+        for region, service in pruned:
+            print(f"    Skipping {service} in {region} ({self.sources[(region, service)]})")
+        for region, service in unknown:
+            print(f"    Could not count {service} in {region}, its Checks will still run")
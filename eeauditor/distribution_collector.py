@@ -0,0 +1,78 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import botocore
+
+DEFAULT_MAX_WORKERS = 8
+# Fields of a list_distributions summary which get_distribution returns next to the DistributionConfig rather
+# than in it - every other field of a summary is the same as in the DistributionConfig
+DISTRIBUTION_FIELDS = ["Id", "ARN", "Status", "LastModifiedTime", "DomainName", "AliasICPRecordals"]
+
+def from_summary(summary: dict):
+    """Builds a distribution in the shape get_distribution returns from a list_distributions summary. Summaries
+    have everything but ActiveTrustedSigners, ActiveTrustedKeyGroups, InProgressInvalidationBatches and the
+    Logging, DefaultRootObject, CallerReference and ContinuousDeploymentPolicyId of the config"""
+    distribution = {"DistributionConfig": {}}
+    for key, value in summary.items():
+        if key in DISTRIBUTION_FIELDS:
+            distribution[key] = value
+        else:
+            distribution["DistributionConfig"][key] = value
+    return distribution
+
+class DistributionCollector(object):
+    """Full CloudFront distribution details fetched once per distribution with bounded concurrency and kept
+    until the distribution is modified, so every Check which needs more than the summary shares one lookup"""
+
+    def __init__(self, client, maxWorkers: int = DEFAULT_MAX_WORKERS):
+        self.client = client
+        self.maxWorkers = maxWorkers
+        # (Id, LastModifiedTime) -> Distribution
+        self.distributions = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, distributionId: str):
+        try:
+            return self.client.get_distribution(Id=distributionId)["Distribution"]
+        except botocore.exceptions.ClientError as e:
+            # deleted since it was listed
+            if e.response["Error"]["Code"] == "NoSuchDistribution":
+                return None
+            raise e
+
+    def collect(self, summaries: list):
+        """Returns a dict of distribution Id to the get_distribution details of every listed distribution"""
+        keys = {summary["Id"]: (summary["Id"], str(summary.get("LastModifiedTime"))) for summary in summaries}
+        with self.lock:
+            pending = [key for key in keys.values() if key not in self.distributions]
+            if pending:
+                with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+                    details = executor.map(self.fetch, [distributionId for distributionId, _ in pending])
+                    self.distributions.update(zip(pending, details))
+            return {
+                distributionId: self.distributions[key]
+                for distributionId, key in keys.items()
+                if self.distributions[key] is not None
+            }
+
+    def clear(self):
+        with self.lock:
+            self.distributions = {}
@@ -22,6 +22,7 @@ import inspect
 import os
 from time import sleep
 import boto3
+import botocore
 from check_register import CheckRegister, accumulate_paged_results
 from pluginbase import PluginBase
 
@@ -30,6 +31,21 @@ get_path = partial(os.path.join, here)
 ssm = boto3.client("ssm")
 sts = boto3.client("sts")
 
+# Error codes which mean the principal was denied an operation for the rest of this run
+ACCESS_DENIED_CODES = [
+    "AccessDenied",
+    "AccessDeniedException",
+    "AuthorizationError",
+    "AuthorizationErrorException",
+    "OptInRequired",
+    "SubscriptionRequiredException",
+    "UnauthorizedOperation",
+]
+# Error codes which mean the whole service is unavailable to the account, no matter which operation returned them.
+# Every other denial may be about a single resource (e.g. ListAccessKeys for one user, or GetKeyPolicy on one key)
+# so it only affects the Check which made the call
+SERVICE_DENIED_CODES = ["OptInRequired", "SubscriptionRequiredException"]
+
 class EEAuditor(object):
     """ElectricEye controller
 
@@ -44,6 +60,10 @@ class EEAuditor(object):
         # each check must be decorated with the @registry.register_check("cache_name")
         # to be discovered during plugin loading.
         self.registry = CheckRegister()
+        # service -> (operation, error code, skipped Checks) for services denied during run_checks
+        self.deniedServices = {}
+        # (service, operation) -> (error code, denied Checks) for resource level denials during run_checks
+        self.deniedOperations = {}
         # vendor specific credentials dictionary
         self.awsAccountId = sts.get_caller_identity()["Account"]
         # pull Region from STS Meta - we can use this to cheese which partition we are in
@@ -116,7 +136,7 @@ class EEAuditor(object):
         return values
 
     # called from eeauditor/controller.py run_auditor()
-    def run_checks(self, requested_check_name=None, delay=0):
+    def run_checks(self, requested_check_name=None, delay=0, tag_index=None, inventory=None, discovery=None):
         # Gather STS information
         details = sts.get_caller_identity()
         awsAccount = str(details["Account"])
@@ -124,15 +144,38 @@ class EEAuditor(object):
         # Print some very basic orientation data
         print(f"Running ElectricEye in AWS Region {self.awsRegion}.\n Located in Partition {self.awsPartition}.\n Profile AWS Account is {awsAccount}.\n Profile current IAM principal ARN is {awsArn}")
 
+        # kick off asynchronous work such as report generation so it overlaps with the Checks that run first
+        for service_name, prefetchers in self.registry.prefetchers.items():
+            if discovery and discovery.is_empty(self.awsRegion, service_name):
+                continue
+            checks = self.registry.checks.get(service_name, {})
+            if not checks or requested_check_name and requested_check_name not in checks:
+                continue
+            for prefetch in prefetchers:
+                try:
+                    prefetch(awsAccountId=self.awsAccountId, awsRegion=self.awsRegion, awsPartition=self.awsPartition)
+                except Exception as e:
+                    print(f"Failed to prefetch {prefetch.__name__} for {service_name} with exception {e}")
+
         for service_name, check_list in self.registry.checks.items():
+            # skip services which discovery found no resources for
+            if discovery and discovery.is_empty(self.awsRegion, service_name):
+                continue
             # only check regions if in AWS Commerical Partition
             if self.awsPartition == "aws":
                 if self.awsRegion not in self.get_regions(service_name):
                     next
 
             for check_name, check in check_list.items():
-                # clearing cache for each control whithin a auditor
+                # once a service has denied us, every other Check of it would fail the same way
+                if service_name in self.deniedServices:
+                    if not requested_check_name or requested_check_name == check_name:
+                        self.deniedServices[service_name][2].append(check_name)
+                    continue
+                # clearing cache for each control whithin a auditor, prefilled from the inventory if one was loaded
                 auditor_cache = {}
+                if inventory:
+                    auditor_cache = inventory.seed(check.__module__.rpartition(".")[2], self.awsAccountId, self.awsRegion)
                 # if a specific check is requested, only run that one check
                 if (
                     not requested_check_name
@@ -147,12 +190,41 @@ class EEAuditor(object):
                             awsRegion=self.awsRegion,
                             awsPartition=self.awsPartition,
                         ):
+                            # findings are scoped and enriched from the bulk tag index as they are emitted
+                            if tag_index:
+                                if not tag_index.in_scope(finding):
+                                    continue
+                                if tag_index.enrichTags:
+                                    tag_index.enrich(finding)
                             yield finding
+                    except botocore.exceptions.ClientError as e:
+                        errorCode = e.response.get("Error", {}).get("Code")
+                        if errorCode in SERVICE_DENIED_CODES:
+                            print(f"Check {check_name} was denied {e.operation_name} with {errorCode}, skipping the rest of {service_name}")
+                            self.deniedServices[service_name] = (e.operation_name, errorCode, [])
+                        elif errorCode in ACCESS_DENIED_CODES:
+                            print(f"Check {check_name} was denied {e.operation_name} with {errorCode}, continuing with the rest of {service_name}")
+                            self.deniedOperations.setdefault((service_name, e.operation_name), (errorCode, []))[1].append(check_name)
+                        else:
+                            print(f"Failed to execute check {check_name} with exception {e}")
                     except Exception as e:
                         print(f"Failed to execute check {check_name} with exception {e}")
             # optional sleep if specified - hardcode to 0 seconds
             sleep(delay)
 
+    # called from eeauditor/controller.py run_auditor()
+    def print_coverage_gaps(self):
+        if not self.deniedServices and not self.deniedOperations:
+            return
+        if self.deniedServices:
+            print(f"Coverage gap - {len(self.deniedServices)} services were denied and not fully audited:")
+        for service_name, (operation, errorCode, skipped) in self.deniedServices.items():
+            print(f"    {service_name}: {operation} returned {errorCode}, skipped {len(skipped)} Checks {skipped}")
+        if self.deniedOperations:
+            print(f"Coverage gap - {len(self.deniedOperations)} operations were denied for some resources:")
+        for (service_name, operation), (errorCode, checks) in self.deniedOperations.items():
+            print(f"    {service_name}: {operation} returned {errorCode} in Checks {checks}")
+
     # called from eeauditor/controller.py print_checks()
     def print_checks_md(self):
         table = []
@@ -0,0 +1,82 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import threading
+
+# The inventory only needs customer managed policies, AWS managed policies are attached by ARN and never audited
+AUTHORIZATION_DETAILS_FILTER = ["User", "Group", "Role", "LocalManagedPolicy"]
+
+def policy_document(document):
+    """Policy documents are URL encoded JSON strings unless botocore already decoded them"""
+    if isinstance(document, str):
+        return json.loads(document)
+    return document
+
+class IamInventory(object):
+    """Users, groups, roles and customer managed policies of an account pulled in one paginated
+    get_account_authorization_details sweep, indexed by name and ARN so every IAM check reads from
+    the same snapshot instead of listing and describing each principal and policy itself"""
+
+    def __init__(self, client):
+        self.client = client
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.accountId = None
+        self.users = []
+        self.groups = []
+        self.roles = []
+        self.policies = []
+        self.usersByName = {}
+        self.groupsByName = {}
+        self.rolesByName = {}
+        self.policiesByArn = {}
+        # policy ARN -> document of its default version
+        self.defaultVersions = {}
+
+    def get(self, awsAccountId: str):
+        """Returns the inventory for the account, sweeping it on first use"""
+        with self.lock:
+            if self.accountId != awsAccountId:
+                self.clear()
+                self.load()
+                self.accountId = awsAccountId
+        return self
+
+    def load(self):
+        paginator = self.client.get_paginator("get_account_authorization_details")
+        for page in paginator.paginate(Filter=AUTHORIZATION_DETAILS_FILTER):
+            self.users.extend(page.get("UserDetailList", []))
+            self.groups.extend(page.get("GroupDetailList", []))
+            self.roles.extend(page.get("RoleDetailList", []))
+            self.policies.extend(page.get("Policies", []))
+        self.usersByName = {user["UserName"]: user for user in self.users}
+        self.groupsByName = {group["GroupName"]: group for group in self.groups}
+        self.rolesByName = {role["RoleName"]: role for role in self.roles}
+        self.policiesByArn = {policy["Arn"]: policy for policy in self.policies}
+        for policy in self.policies:
+            for version in policy.get("PolicyVersionList", []):
+                if version.get("IsDefaultVersion"):
+                    self.defaultVersions[policy["Arn"]] = policy_document(version["Document"])
+        print(
+            f"Loaded IAM inventory of {len(self.users)} users, {len(self.groups)} groups, "
+            f"{len(self.roles)} roles and {len(self.policies)} customer managed policies"
+        )
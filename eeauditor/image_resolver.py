@@ -0,0 +1,73 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import threading
+from botocore.exceptions import ClientError
+
+# DescribeImages has no documented limit on ImageIds, this keeps every request well within the request size limit
+MAX_IMAGE_IDS_PER_REQUEST = 200
+# Errors which fail the whole request when any one of its images does not exist or cannot be seen by the account
+MISSING_IMAGE_ERRORS = ["InvalidAMIID.NotFound", "InvalidAMIID.Malformed", "InvalidAMIID.Unavailable"]
+
+class ImageResolver(object):
+    """Looks up the metadata of the AMIs of many instances with as few DescribeImages requests as possible:
+    unique ImageIds are described in batches and every result is kept for the run, so any Check which needs
+    an AMI shares the same lookup. Images which are deregistered or no longer shared with the account resolve
+    to None"""
+
+    def __init__(self, client, batchSize: int = MAX_IMAGE_IDS_PER_REQUEST):
+        self.client = client
+        self.batchSize = batchSize
+        # ImageId -> image, or None when the image does not exist anymore
+        self.images = {}
+        self.lock = threading.Lock()
+
+    def describe(self, imageIds: list):
+        try:
+            images = self.client.describe_images(ImageIds=imageIds)["Images"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in MISSING_IMAGE_ERRORS:
+                # left unresolved so the Checks neither pass nor fail instances they know nothing about
+                print(f"Could not describe images {imageIds}: {e}")
+                return
+            if len(imageIds) == 1:
+                self.images[imageIds[0]] = None
+                return
+            # split the batch until the missing images are isolated, the rest are still described in bulk
+            middle = len(imageIds) // 2
+            self.describe(imageIds[:middle])
+            self.describe(imageIds[middle:])
+            return
+        found = {image["ImageId"]: image for image in images}
+        for imageId in imageIds:
+            # recently deregistered images are simply left out of the response
+            self.images[imageId] = found.get(imageId)
+
+    def resolve(self, imageIds: list) -> dict:
+        """Returns a dict of ImageId to its image (or None if it no longer exists), describing the images
+        which were not resolved yet. ImageIds which could not be looked up at all are left out"""
+        with self.lock:
+            pending = [imageId for imageId in dict.fromkeys(imageIds) if imageId not in self.images]
+            for i in range(0, len(pending), self.batchSize):
+                self.describe(pending[i:i + self.batchSize])
+            return {imageId: self.images[imageId] for imageId in imageIds if imageId in self.images}
+
+    def clear(self):
+        with self.lock:
+            self.images = {}
@@ -0,0 +1,170 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import boto3
+
+config = boto3.client("config")
+
+# Resource types listed by global calls (e.g. ListBuckets returns the buckets of every Region), these are
+# handed to a scan of any Region from the items of every Region of the account
+GLOBAL_RESOURCE_TYPES = ["AWS::S3::Bucket"]
+# Engines which are reported by the RDS API but audited by the DocumentDB and Neptune Auditors instead
+NON_RDS_ENGINES = ["docdb", "neptune"]
+
+def pascal_case(value):
+    """AWS Config returns configuration items with camelCase keys, the describe APIs the Auditors were written
+    against use PascalCase - e.g. `dBInstanceIdentifier` becomes `DBInstanceIdentifier`"""
+    if isinstance(value, dict):
+        return {key[:1].upper() + key[1:]: pascal_case(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [pascal_case(item) for item in value]
+    return value
+
+def security_group(item: dict):
+    """Config lists IPv4 CIDRs as plain strings under `ipRanges` and as objects under `ipv4Ranges`,
+    describe_security_groups only has the objects under `IpRanges`"""
+    securityGroup = pascal_case(item["configuration"])
+    for permissions in ("IpPermissions", "IpPermissionsEgress"):
+        for permission in securityGroup.get(permissions, []):
+            permission["IpRanges"] = permission.pop("Ipv4Ranges", [])
+    return securityGroup
+
+def instances(states: set):
+    def select(items: dict):
+        instanceList = [pascal_case(item["configuration"]) for item in items.get("AWS::EC2::Instance", [])]
+        return [instance for instance in instanceList if instance.get("State", {}).get("Name") in states]
+    return select
+
+def describe_security_groups(items: dict):
+    return {"SecurityGroups": [security_group(item) for item in items.get("AWS::EC2::SecurityGroup", [])]}
+
+def describe_db_instances(items: dict):
+    dbInstances = [pascal_case(item["configuration"]) for item in items.get("AWS::RDS::DBInstance", [])]
+    return [dbinstance for dbinstance in dbInstances if dbinstance.get("Engine") not in NON_RDS_ENGINES]
+
+def list_buckets(items: dict):
+    return {
+        "Buckets": [
+            {"Name": item["resourceName"], "CreationDate": item.get("resourceCreationTime")}
+            for item in items.get("AWS::S3::Bucket", [])
+        ]
+    }
+
+# Auditor to the cache keys it reads, the Config resource types they are built from, and how to build them
+# in the same shape as the describe call the Auditor would otherwise make
+AUDITOR_CACHE_KEYS = {
+    "Amazon_EC2_Auditor": {"instances": (["AWS::EC2::Instance"], instances({"running", "stopped"}))},
+    "Amazon_EC2_SSM_Auditor": {"instances": (["AWS::EC2::Instance"], instances({"running"}))},
+    "ElectricEye_AttackSurface_Auditor": {"instances": (["AWS::EC2::Instance"], instances({"running"}))},
+    "Amazon_EC2_Security_Group_Auditor": {
+        "describe_security_groups": (["AWS::EC2::SecurityGroup"], describe_security_groups)
+    },
+    "Amazon_RDS_Auditor": {"describe_db_instances": (["AWS::RDS::DBInstance"], describe_db_instances)},
+    "Amazon_S3_Auditor": {"list_buckets": (["AWS::S3::Bucket"], list_buckets)},
+}
+
+class ConfigInventory(object):
+    """Resource inventory pulled from an AWS Config aggregator with advanced queries. Every resource type
+    is fetched for every account and Region in a single paginated query, then handed to the Auditors
+    through the same cache keys they fill from the describe APIs"""
+
+    def __init__(self, aggregatorName: str, accountIds: list = None, regions: list = None):
+        self.aggregatorName = aggregatorName
+        self.accountIds = accountIds
+        self.regions = regions
+        # (accountId, region) -> resource type -> configuration items
+        self.items = {}
+        # (accountId, region, auditor) -> cache, built on first use
+        self.caches = {}
+
+    def expression(self, resourceTypes: list, regions: list = None):
+        conditions = ["resourceType IN ({})".format(", ".join(f"'{t}'" for t in resourceTypes))]
+        if self.accountIds:
+            conditions.append("accountId IN ({})".format(", ".join(f"'{a}'" for a in self.accountIds)))
+        if regions:
+            conditions.append("awsRegion IN ({})".format(", ".join(f"'{r}'" for r in regions)))
+        return (
+            "SELECT accountId, awsRegion, resourceType, resourceName, resourceCreationTime, configuration WHERE "
+            + " AND ".join(conditions)
+        )
+
+    def expressions(self):
+        """Regional resource types are only queried in the Regions being scanned, global resource types are
+        queried in every Region as a scan of any Region lists them all"""
+        resourceTypes = sorted(
+            {t for cacheKeys in AUDITOR_CACHE_KEYS.values() for types, _ in cacheKeys.values() for t in types}
+        )
+        if not self.regions:
+            return [self.expression(resourceTypes)]
+        regionalTypes = [t for t in resourceTypes if t not in GLOBAL_RESOURCE_TYPES]
+        globalTypes = [t for t in resourceTypes if t in GLOBAL_RESOURCE_TYPES]
+        return [self.expression(regionalTypes, self.regions), self.expression(globalTypes)]
+
+    def load(self):
+        paginator = config.get_paginator("select_aggregate_resource_config")
+        count = 0
+        for expression in self.expressions():
+            for page in paginator.paginate(
+                Expression=expression,
+                ConfigurationAggregatorName=self.aggregatorName,
+                PaginationConfig={"PageSize": 100},
+            ):
+                for result in page["Results"]:
+                    item = json.loads(result)
+                    # configuration is returned as a nested JSON string for some resource types
+                    if isinstance(item.get("configuration"), str):
+                        item["configuration"] = json.loads(item["configuration"])
+                    key = (item["accountId"], item["awsRegion"])
+                    self.items.setdefault(key, {}).setdefault(item["resourceType"], []).append(item)
+                    count += 1
+        print(f"Loaded {count} resources from AWS Config aggregator {self.aggregatorName}")
+        return self
+
+    def seed(self, auditorName: str, awsAccountId: str, awsRegion: str):
+        """Returns a new cache for a Check of the Auditor, prefilled from the inventory"""
+        cacheKeys = AUDITOR_CACHE_KEYS.get(auditorName)
+        if not cacheKeys:
+            return {}
+        key = (awsAccountId, awsRegion, auditorName)
+        if key not in self.caches:
+            items = self.region_items(awsAccountId, awsRegion)
+            # a cache key is only seeded when the aggregator has its resource types for the account and Region,
+            # otherwise the Auditor makes its own call instead of reporting that there are no resources
+            self.caches[key] = {
+                cacheKey: build(items)
+                for cacheKey, (resourceTypes, build) in cacheKeys.items()
+                if any(resourceType in items for resourceType in resourceTypes)
+            }
+        return dict(self.caches[key])
+
+    def region_items(self, awsAccountId: str, awsRegion: str):
+        """Returns the items of the account and Region, with the items of global resource types from every Region"""
+        items = {
+            resourceType: typeItems
+            for resourceType, typeItems in self.items.get((awsAccountId, awsRegion), {}).items()
+            if resourceType not in GLOBAL_RESOURCE_TYPES
+        }
+        for (accountId, _), regionItems in sorted(self.items.items()):
+            if accountId != awsAccountId:
+                continue
+            for resourceType in GLOBAL_RESOURCE_TYPES:
+                if resourceType in regionItems:
+                    items.setdefault(resourceType, []).extend(regionItems[resourceType])
+        return items
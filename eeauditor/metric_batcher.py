@@ -0,0 +1,80 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import datetime
+import json
+import threading
+
+# GetMetricData accepts up to 500 queries per request
+MAX_QUERIES_PER_REQUEST = 500
+
+class MetricBatcher(object):
+    """Fetches the CloudWatch metric series of many resources with as few GetMetricData requests as possible:
+    queries are packed 500 to a request, every page of a request is followed, and each series is kept for
+    the run so a metric several Checks ask for is only fetched once"""
+
+    def __init__(self, client):
+        self.client = client
+        # every lookback ends when the first series is fetched, so the same query always covers the same window
+        self.endTime = None
+        # (metric stat, lookback) -> {"Timestamps": [...], "Values": [...]}
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def clear(self):
+        with self.lock:
+            self.endTime = None
+            self.series = {}
+
+    def get_series(self, metricStats: dict, lookback: datetime.timedelta):
+        """Takes a dict of key to a MetricStat (e.g. one per function name) and returns a dict of key to the
+        timestamps and values of its series over the lookback, newest first as CloudWatch returns them"""
+        with self.lock:
+            if not self.endTime:
+                self.endTime = datetime.datetime.now(datetime.timezone.utc)
+            cacheKeys = {
+                key: (json.dumps(metricStat, sort_keys=True), lookback.total_seconds())
+                for key, metricStat in metricStats.items()
+            }
+            pending = {}
+            for key, cacheKey in cacheKeys.items():
+                if cacheKey not in self.series:
+                    pending[cacheKey] = metricStats[key]
+            pendingKeys = list(pending)
+            for i in range(0, len(pendingKeys), MAX_QUERIES_PER_REQUEST):
+                self.fetch(pendingKeys[i:i + MAX_QUERIES_PER_REQUEST], pending, lookback)
+            return {key: self.series[cacheKey] for key, cacheKey in cacheKeys.items()}
+
+    def fetch(self, cacheKeys: list, metricStats: dict, lookback: datetime.timedelta):
+        # query Ids only have to be unique within a request
+        queryIds = {f"m{index}": cacheKey for index, cacheKey in enumerate(cacheKeys, start=1)}
+        for cacheKey in cacheKeys:
+            self.series[cacheKey] = {"Timestamps": [], "Values": []}
+        paginator = self.client.get_paginator("get_metric_data")
+        for page in paginator.paginate(
+            MetricDataQueries=[
+                {"Id": queryId, "MetricStat": metricStats[cacheKey]} for queryId, cacheKey in queryIds.items()
+            ],
+            StartTime=self.endTime - lookback,
+            EndTime=self.endTime,
+        ):
+            for result in page["MetricDataResults"]:
+                series = self.series[queryIds[result["Id"]]]
+                series["Timestamps"].extend(result.get("Timestamps", []))
+                series["Values"].extend(result.get("Values", []))
@@ -0,0 +1,164 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import re
+import threading
+
+# Privilege levels a statement can grant, from least to most privileged
+PRIVILEGE_LEVELS = ["none", "scoped", "read-wildcard", "write-wildcard", "service-admin", "admin"]
+# Verbs IAM actions start with which only read or list - every other verb (Put, Create, Delete, Attach,
+# Update, Tag...) can change resources. Action names are PascalCase so the verb is their leading word
+READ_VERBS = [
+    "Get",
+    "List",
+    "Describe",
+    "Search",
+    "Lookup",
+    "View",
+    "Read",
+    "Query",
+    "Scan",
+    "Select",
+    "Check",
+    "Preview",
+    "Detect",
+    "Estimate",
+    "Validate",
+    "Verify",
+]
+# Below this many documents starting worker processes costs more than it saves
+MIN_PARALLEL_DOCUMENTS = 200
+CHUNK_SIZE = 100
+
+def as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+def normalize(document):
+    """Parses the document if needed and returns its statements with Action, NotAction, Resource and
+    NotResource as lists, whether the policy has a single statement or a list of them"""
+    if isinstance(document, str):
+        document = json.loads(document)
+    statements = []
+    for statement in as_list(document.get("Statement")):
+        statements.append(
+            {
+                "Effect": statement.get("Effect"),
+                "Action": as_list(statement.get("Action")),
+                "NotAction": as_list(statement.get("NotAction")),
+                "Resource": as_list(statement.get("Resource")),
+                "NotResource": as_list(statement.get("NotResource")),
+                "Condition": statement.get("Condition"),
+            }
+        )
+    return statements
+
+def action_privilege(action: str):
+    """Classifies one action pattern by expanding its wildcards against the verb catalog"""
+    if action == "*":
+        return "admin"
+    service, _, name = action.partition(":")
+    if "*" not in name and "?" not in name:
+        return "scoped"
+    # the literal part of the name before the first wildcard decides which verbs the pattern can match
+    prefix = re.split(r"[*?]", name, maxsplit=1)[0]
+    if not prefix:
+        # `s3:*` grants the whole service, `s3:*Policy` an unknown set of verbs
+        return "service-admin" if name == "*" else "write-wildcard"
+    for verb in READ_VERBS:
+        if prefix.lower().startswith(verb.lower()):
+            return "read-wildcard"
+    return "write-wildcard"
+
+def statement_privilege(statement: dict):
+    if statement["NotAction"]:
+        # Allow with NotAction grants everything except the listed actions
+        return "admin"
+    levels = [action_privilege(action.strip()) for action in statement["Action"]]
+    return max(levels, key=PRIVILEGE_LEVELS.index, default="none")
+
+def analyze_document(document):
+    """Returns the highest privilege level an unconditional Allow statement of the document grants, and the
+    least privilege rating of the document:
+
+    - failed_high: admin or service-admin over every resource
+    - failed_low: admin or service-admin over specific resources, or wildcard write actions
+    - passing: everything else, including statements restricted with a Condition
+    """
+    privilegeLevel = "none"
+    rating = "passing"
+    for statement in normalize(document):
+        if statement["Effect"] != "Allow" or statement["Condition"]:
+            continue
+        level = statement_privilege(statement)
+        allResources = "*" in statement["Resource"] or bool(statement["NotResource"])
+        if PRIVILEGE_LEVELS.index(level) > PRIVILEGE_LEVELS.index(privilegeLevel):
+            privilegeLevel = level
+        if level in ["admin", "service-admin"] and allResources:
+            rating = "failed_high"
+        elif level in ["admin", "service-admin", "write-wildcard"] and rating != "failed_high":
+            rating = "failed_low"
+    return {"PrivilegeLevel": privilegeLevel, "Rating": rating}
+
+def analyze_documents(documents: list):
+    return [analyze_document(document) for document in documents]
+
+def document_hash(document):
+    if isinstance(document, str):
+        document = json.loads(document)
+    return hashlib.sha256(json.dumps(document, sort_keys=True).encode("utf-8")).hexdigest()
+
+class PolicyAnalyzer(object):
+    """Rates the privilege policy documents grant, memoized by a hash of the document so a policy shared by
+    many principals is only analyzed once per run, and analyzed on a process pool for large batches"""
+
+    def __init__(self, maxWorkers: int = None):
+        self.maxWorkers = maxWorkers
+        self.cache = {}
+        self.lock = threading.Lock()
+
+    def analyze_many(self, documents: list):
+        """Analyzes every document not analyzed yet, returns their results in order"""
+        hashes = [document_hash(document) for document in documents]
+        pending = {}
+        with self.lock:
+            for documentHash, document in zip(hashes, documents):
+                if documentHash not in self.cache:
+                    pending[documentHash] = document
+        if pending:
+            pendingHashes = list(pending)
+            pendingDocuments = [pending[documentHash] for documentHash in pendingHashes]
+            if len(pendingDocuments) < MIN_PARALLEL_DOCUMENTS:
+                results = analyze_documents(pendingDocuments)
+            else:
+                chunks = [pendingDocuments[i:i + CHUNK_SIZE] for i in range(0, len(pendingDocuments), CHUNK_SIZE)]
+                with ProcessPoolExecutor(max_workers=self.maxWorkers) as executor:
+                    results = [result for chunk in executor.map(analyze_documents, chunks) for result in chunk]
+            with self.lock:
+                self.cache.update(zip(pendingHashes, results))
+        return [self.cache[documentHash] for documentHash in hashes]
+
+    def analyze(self, document):
+        return self.analyze_many([document])[0]
@@ -0,0 +1,117 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import socket
+import threading
+import time
+import nmap3
+
+# FTP, SSH, TelNet, SMTP, HTTP, POP3, NetBIOS, SMB, RDP, MSSQL, MySQL/MariaDB, NFS, Docker, Oracle, PostgreSQL,
+# Kibana, VMWare, Proxy, Splunk, K8s, Redis, Kafka, Mongo, Rabbit/AmazonMQ, SparkUI
+DEFAULT_PORTS = "21,22,23,25,80,110,139,445,3389,1433,3306,2049,2375,1521,5432,5601,8182,8080,8089,10250,6379,9092,27017,5672,4040"
+# Hosts per nmap process, each group is a single scan with a single XML parse
+HOST_GROUP_SIZE = 16
+MAX_PARALLEL_GROUPS = 4
+DEFAULT_CACHE_TTL = 86400
+
+class PortScanner(object):
+    """Resolves targets, dedupes them by IP and scans the IPs which are not already cached in parallel
+    host groups. Results are cached per IP for the TTL, in memory and optionally in a file across runs"""
+
+    def __init__(self, ports: str = DEFAULT_PORTS, cacheFile: str = None, cacheTtl: int = DEFAULT_CACHE_TTL):
+        self.ports = ports
+        self.cacheFile = cacheFile
+        self.cacheTtl = cacheTtl
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.nmap = nmap3.NmapScanTechniques()
+        if cacheFile and os.path.exists(cacheFile):
+            try:
+                with open(cacheFile) as jsonfile:
+                    self.cache = json.load(jsonfile)
+            except ValueError as e:
+                print(f"Ignoring unreadable attack surface scan cache {cacheFile}: {e}")
+
+    @classmethod
+    def from_environment(cls):
+        return cls(
+            ports=os.environ.get("ATTACK_SURFACE_PORTS", DEFAULT_PORTS),
+            cacheFile=os.environ.get("ATTACK_SURFACE_CACHE_FILE"),
+            cacheTtl=int(os.environ.get("ATTACK_SURFACE_CACHE_TTL", DEFAULT_CACHE_TTL)),
+        )
+
+    def resolve(self, host: str):
+        try:
+            return socket.gethostbyname(host)
+        except (socket.gaierror, UnicodeError) as e:
+            print(f"Could not resolve {host}: {e}")
+            return None
+
+    def cached(self, ip: str):
+        entry = self.cache.get(ip)
+        # results for a different port list do not answer this scan
+        if entry and entry["Ports"] == self.ports and time.time() - entry["ScannedAt"] < self.cacheTtl:
+            return entry["Result"]
+        return None
+
+    def scan_group(self, ips: list):
+        try:
+            results = self.nmap.nmap_tcp_scan(" ".join(ips), args=f"-Pn -p {self.ports}")
+        except Exception as e:
+            print(f"Failed to scan {ips} with exception {e}")
+            return
+        scannedAt = time.time()
+        with self.lock:
+            for ip in ips:
+                if ip in results:
+                    self.cache[ip] = {"Ports": self.ports, "ScannedAt": scannedAt, "Result": results[ip]}
+
+    def scan(self, hosts: list, assetType: str):
+        """Takes IPs or DNS names and returns a dict of host to {ip: scan result}, or None when the host
+        could not be resolved or scanned - the same shape nmap3 returns for a single host"""
+        hosts = list(dict.fromkeys(hosts))
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_GROUPS * 4) as executor:
+            ips = dict(zip(hosts, executor.map(self.resolve, hosts)))
+
+        stale = sorted({ip for ip in ips.values() if ip and self.cached(ip) is None})
+        if stale:
+            print(f"Scanning {len(stale)} {assetType} IPs for {len(hosts)} targets, {len(set(ips.values())) - len(stale)} were cached")
+            groups = [stale[i:i + HOST_GROUP_SIZE] for i in range(0, len(stale), HOST_GROUP_SIZE)]
+            with ThreadPoolExecutor(max_workers=MAX_PARALLEL_GROUPS) as executor:
+                list(executor.map(self.scan_group, groups))
+            self.save()
+
+        results = {}
+        for host, ip in ips.items():
+            result = self.cached(ip) if ip else None
+            results[host] = {ip: result} if result is not None else None
+        return results
+
+    def save(self):
+        if not self.cacheFile:
+            return
+        # write then rename so an interrupted run never leaves a truncated cache
+        tempFile = f"{self.cacheFile}.tmp"
+        with self.lock:
+            with open(tempFile, "w") as jsonfile:
+                json.dump(self.cache, jsonfile, default=str)
+        os.replace(tempFile, self.cacheFile)
@@ -17,16 +17,174 @@
 #KIND, either express or implied.  See the License for the
 #specific language governing permissions and limitations
 #under the License.
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import sleep
+from processor.outbox import Outbox
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
+from processor.rules import RulesEngine
+from processor.validator import print_validation_report, validate_findings
 
-def process_findings(findings: list, outputs: list, **kwargs):
+# Valid policies for handling findings which share the same Finding Id
+DEDUPE_POLICIES = ["last", "first", "none"]
+# Attempts per output before its findings are left in the outbox, waiting BACKOFF_SECONDS ** attempt in between
+MAX_ATTEMPTS = 3
+BACKOFF_SECONDS = 2
+
+def dedupe_findings(findings: list, policy: str = "last"):
+    """Remove findings with duplicate Ids before they are handed to any output provider.
+    `last` keeps the most recently emitted version of a finding (last write wins), `first` keeps
+    the earliest version and `none` disables deduplication. Order of first appearance is preserved."""
+    if policy == "none":
+        return findings
+    if policy not in DEDUPE_POLICIES:
+        raise ValueError(f"Dedupe policy {policy} is not one of {DEDUPE_POLICIES}")
+
+    # dicts are hash indexed and keep insertion order, so each lookup is O(1) and the output is stable
+    deduped = {}
+    for index, finding in enumerate(findings):
+        findingId = finding.get("Id") if isinstance(finding, dict) else None
+        if not isinstance(findingId, str):
+            # findings without a usable Id are passed through for the validator to report and drop
+            deduped[(None, index)] = finding
+            continue
+        if policy == "first" and findingId in deduped:
+            continue
+        deduped[findingId] = finding
+
+    return list(deduped.values())
+
+def process_findings(findings: list, outputs: list, dedupe_policy: str = "last", outbox_file: str = "", rules_file: str = "", **kwargs):
     """Process all findings from json file and send to outputs sepecified"""
-    for output in outputs:
+    dedupedFindings = dedupe_findings(findings, dedupe_policy)
+    if len(dedupedFindings) != len(findings):
+        print(f"Removed {len(findings) - len(dedupedFindings)} duplicate findings")
+    findings = dedupedFindings
+    # invalid findings would only fail inside the outputs, oversized findings are trimmed to fit
+    validFindings, serialized, validationReport = validate_findings(findings)
+    if validationReport:
+        print_validation_report(validationReport)
+    if len(validFindings) != len(findings):
+        print(f"Dropped {len(findings) - len(validFindings)} findings which are not valid ASFF")
+    findings = validFindings
+    # every provider shares the same payload so findings are only serialized and flattened once
+    payload = FindingsPayload(findings, serialized)
+    # suppression and routing rules decide which findings each output receives
+    routes = None
+    if rules_file:
+        findings, payload, routes = RulesEngine.from_file(rules_file).route(findings, payload, outputs)
+
+    # findings are written to the durable outbox before any output is attempted, so a failed output never forces a rescan
+    outbox = None
+    runId = None
+    if outbox_file:
+        outbox = Outbox(outbox_file)
+        exclusions = route_exclusions(findings, routes) if routes is not None else None
+        runId = outbox.append(payload.serialized, outputs, kwargs.get("output_file", ""), exclusions)
+
+    try:
+        write_outputs(outputs, findings, payload, outbox, runId, routes, **kwargs)
+    finally:
+        if outbox:
+            outbox.close()
+
+def replay_findings(outbox_file: str, rules_file: str = ""):
+    """Redeliver every run in the outbox which has not been written to all of its outputs yet"""
+    rules = RulesEngine.from_file(rules_file) if rules_file else None
+    outbox = Outbox(outbox_file)
+    errors = []
+    try:
+        pendingRuns = outbox.pending_runs()
+        print(f"Found {len(pendingRuns)} runs with undelivered outputs in {outbox_file}")
+        for runId, outputFile, outputs in pendingRuns:
+            findings = outbox.load(runId)
+            print(f"Replaying {len(findings)} findings from run {runId} to {outputs}")
+            payload = FindingsPayload(findings)
+            routes = None
+            exclusions = outbox.exclusions(runId)
+            # runs which were routed are replayed with their recorded routes, with or without the rules file
+            if exclusions is not None:
+                routes = stored_routes(findings, exclusions)
+            elif rules:
+                findings, payload, routes = rules.route(findings, payload, outputs)
+            try:
+                write_outputs(outputs, findings, payload, outbox, runId, routes, output_file=outputFile)
+            except BaseException as e:
+                errors.append(e)
+    finally:
+        outbox.close()
+    # only raise once every other run has had the chance to be replayed
+    if errors:
+        raise errors[0]
+
+def route_exclusions(findings: list, routes: dict):
+    """Positions of the findings each output was routed away from, for the outbox to record"""
+    exclusions = {}
+    for output, (routedFindings, _) in routes.items():
+        routedIds = {id(finding) for finding in routedFindings}
+        exclusions[output] = [index for index, finding in enumerate(findings) if id(finding) not in routedIds]
+    return exclusions
+
+def stored_routes(findings: list, exclusions: dict):
+    """Rebuild the routes of a run from the positions of the findings each output was routed away from"""
+    routes = {}
+    for output, excluded in exclusions.items():
+        excludedSet = set(excluded)
+        routedFindings = [finding for index, finding in enumerate(findings) if index not in excludedSet]
+        routes[output] = (routedFindings, FindingsPayload(routedFindings))
+    return routes
+
+def write_outputs(outputs: list, findings: list, payload: FindingsPayload, outbox=None, runId=None, routes=None, **kwargs):
+    """Write to all outputs concurrently so each sink's latency is not paid one after another.
+    `routes` optionally maps an output to the (findings, payload) the rules engine routed to it"""
+    routes = routes or {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(len(outputs), 1)) as executor:
+        futures = {
+            executor.submit(write_output, output, *routes.get(output, (findings, payload)), outbox, runId, **kwargs): output
+            for output in outputs
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except BaseException as e:
+                print(f"Error writing output {futures[future]}: {e}")
+                errors.append(e)
+    if errors and outbox:
+        print(f"Findings for failed outputs are kept in the outbox, use --replay-outbox to deliver them without re-scanning")
+    # only raise once every other output has had the chance to finish
+    if errors:
+        raise errors[0]
+
+def write_output(output: str, findings: list, payload: FindingsPayload, outbox=None, runId=None, **kwargs):
+    """Send findings to a single output provider, retrying with an exponential backoff"""
+    provider = ElectricEyeOutput.get_provider(output)
+    if not provider:
+        error = ValueError(f"Output provider {output} does not exist")
+        if outbox:
+            outbox.mark_failed(runId, output, 0, error)
+        raise error
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
         try:
-            ElectricEyeOutput.get_provider(output)().write_findings(findings=findings, **kwargs)
-        except Exception as e:
-            print(f"Error writing output: {e}")
+            result = provider().write_findings(findings=findings, payload=payload, **kwargs)
+        # some providers call exit() for missing configuration, retrying would only fail the same way again
+        except SystemExit as e:
+            if outbox:
+                outbox.mark_failed(runId, output, attempt, e)
             raise e
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS:
+                if outbox:
+                    outbox.mark_failed(runId, output, attempt, e)
+                raise e
+            backoff = BACKOFF_SECONDS ** attempt
+            print(f"Attempt {attempt} writing output {output} failed with exception {e}, retrying in {backoff} seconds")
+            sleep(backoff)
+        else:
+            if outbox:
+                outbox.mark_delivered(runId, output, attempt)
+            return result
 
 def get_providers():
     return ElectricEyeOutput.get_all_providers()
\ No newline at end of file
@@ -0,0 +1,74 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import datetime
+
+def parse_timestamp(value):
+    """Parse an ASFF ISO-8601 timestamp into a timezone aware datetime, returns None if it is not parsable"""
+    try:
+        timestamp = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return timestamp
+
+def partition_date(timestamp):
+    """The UTC `date=` partition of a finding from its parsed CreatedAt, shared by every partitioned output
+    so a run lands in the same partitions no matter the format. Unparsable timestamps fall back to today"""
+    if timestamp is None:
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+    return timestamp.astimezone(datetime.timezone.utc).strftime("%Y-%m-%d")
+
+def flatten_finding(finding: dict):
+    """Flatten an ASFF finding into a single level dict - better for indexing without the nested lists.
+    Raises a KeyError if a required ASFF value is missing from the finding"""
+    # some values may not always be present (Details, etc.) - write in fake values to handle this
+    try:
+        resourceDetails = str(finding["Resources"][0]["Details"])
+    except KeyError:
+        resourceDetails = "NoAdditionalDetails"
+
+    return {
+        "SchemaVersion": str(finding["SchemaVersion"]),
+        "Id": str(finding["Id"]),
+        "ProductArn": str(finding["ProductArn"]),
+        "GeneratorId": str(finding["GeneratorId"]),
+        "AwsAccountId": str(finding["AwsAccountId"]),
+        "Types": str(finding["Types"]),
+        "FirstObservedAt": str(finding["FirstObservedAt"]),
+        "CreatedAt": str(finding["CreatedAt"]),
+        "UpdatedAt": str(finding["UpdatedAt"]),
+        "SeverityLabel": str(finding["Severity"]["Label"]),
+        "Confidence": int(finding["Confidence"]),
+        "Title": str(finding["Title"]),
+        "Description": str(finding["Description"]),
+        "RecommendationText": str(finding["Remediation"]["Recommendation"]["Text"]),
+        "RecommendationUrl": str(finding["Remediation"]["Recommendation"]["Url"]),
+        "ProductName": "ElectricEye",
+        "ResourceType": str(finding["Resources"][0]["Type"]),
+        "ResourceId": str(finding["Resources"][0]["Id"]),
+        "ResourcePartition": str(finding["Resources"][0]["Partition"]),
+        "ResourceRegion": str(finding["Resources"][0]["Region"]),
+        "ResourceDetails": resourceDetails,
+        "ComplianceStatus": str(finding["Compliance"]["Status"]),
+        "ComplianceRelatedRequirements": finding["Compliance"]["RelatedRequirements"],
+        "WorkflowStatus": str(finding["Workflow"]["Status"]),
+        "RecordState": str(finding["RecordState"])
+    }
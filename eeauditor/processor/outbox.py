@@ -0,0 +1,147 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import datetime
+import json
+import sqlite3
+import threading
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs(
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    output_file TEXT
+);
+CREATE TABLE IF NOT EXISTS findings(
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    document TEXT
+);
+CREATE TABLE IF NOT EXISTS deliveries(
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    output TEXT NOT NULL,
+    delivered INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    updated_at TEXT,
+    excluded TEXT,
+    PRIMARY KEY (run_id, output)
+);
+CREATE INDEX IF NOT EXISTS idx_findings_run_id ON findings(run_id);
+"""
+
+class Outbox(object):
+    """Durable local log of findings - each output provider keeps its own delivery checkpoint per run so
+    findings for an unreachable output can be replayed later without re-scanning"""
+
+    def __init__(self, outboxFile: str):
+        # connection is shared by the output threads, writes are serialized by the lock
+        self.conn = sqlite3.connect(outboxFile, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            self.conn.executescript(SCHEMA)
+            # outboxes created before routed runs were recorded
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(deliveries)")]
+            if "excluded" not in columns:
+                self.conn.execute("ALTER TABLE deliveries ADD COLUMN excluded TEXT")
+
+    def append(self, serialized: list, outputs: list, outputFile: str, exclusions: dict = None):
+        """Durably write the findings of a run and a pending delivery for every output, returns the Run Id.
+        `exclusions` maps each output of a routed run to the positions of the findings the rules kept from it,
+        so a replay sends every output exactly what the original run would have"""
+        runId = str(uuid.uuid4())
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO runs(run_id, created_at, output_file) VALUES (?, ?, ?)",
+                (runId, self.now(), outputFile)
+            )
+            self.conn.executemany(
+                "INSERT INTO findings(run_id, document) VALUES (?, ?)",
+                ((runId, document) for document in serialized)
+            )
+            self.conn.executemany(
+                "INSERT INTO deliveries(run_id, output, updated_at, excluded) VALUES (?, ?, ?, ?)",
+                (
+                    (runId, output, self.now(), json.dumps(exclusions.get(output, [])) if exclusions is not None else None)
+                    for output in outputs
+                )
+            )
+        print(f"Appended {len(serialized)} findings to the outbox as run {runId}")
+        return runId
+
+    def mark_delivered(self, runId: str, output: str, attempts: int):
+        """Checkpoint a successful delivery, runs which have been delivered to every output are purged"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE deliveries SET delivered = 1, attempts = attempts + ?, last_error = NULL, updated_at = ? WHERE run_id = ? AND output = ?",
+                (attempts, self.now(), runId, output)
+            )
+            pending = self.conn.execute(
+                "SELECT COUNT(*) FROM deliveries WHERE run_id = ? AND delivered = 0", (runId,)
+            ).fetchone()[0]
+            if pending == 0:
+                self.conn.execute("DELETE FROM runs WHERE run_id = ?", (runId,))
+
+    def mark_failed(self, runId: str, output: str, attempts: int, error: BaseException):
+        """Record a failed delivery, the findings stay in the outbox until they are replayed"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE deliveries SET attempts = attempts + ?, last_error = ?, updated_at = ? WHERE run_id = ? AND output = ?",
+                (attempts, repr(error), self.now(), runId, output)
+            )
+
+    def pending_runs(self):
+        """Returns a list of (Run Id, Output File, [outputs]) for every run which has undelivered outputs"""
+        with self.lock:
+            rows = self.conn.execute(
+                """SELECT r.run_id, r.output_file, d.output FROM runs r JOIN deliveries d ON d.run_id = r.run_id
+                WHERE d.delivered = 0 ORDER BY r.created_at, d.output"""
+            ).fetchall()
+        runs = {}
+        for runId, outputFile, output in rows:
+            runs.setdefault((runId, outputFile), []).append(output)
+        return [(runId, outputFile, outputs) for (runId, outputFile), outputs in runs.items()]
+
+    def exclusions(self, runId: str):
+        """Returns a dict of output to the positions of the findings it was routed away from, or None if the
+        run was not routed by any rules"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT output, excluded FROM deliveries WHERE run_id = ?", (runId,)
+            ).fetchall()
+        if all(excluded is None for _, excluded in rows):
+            return None
+        return {output: json.loads(excluded) for output, excluded in rows if excluded is not None}
+
+    def load(self, runId: str):
+        """Returns the findings of a run, in the order they were appended"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT document FROM findings WHERE run_id = ? ORDER BY seq", (runId,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+    def now(self):
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
@@ -17,14 +17,5 @@
 #KIND, either express or implied.  See the License for the
 #specific language governing permissions and limitations
 #under the License.
-import importlib
-import os
-
-# import all the output modules to get them registered
-for output_file in os.listdir(os.path.dirname(__file__)):
-    # Skip the common base file and any non-py files
-    if output_file.startswith(("__init__", "output_base")) or not output_file.endswith(".py"):
-        continue
-    full_import = ["processor", "outputs", os.path.splitext(output_file)[0]]
-
-    importlib.import_module(".".join(full_import))
\ No newline at end of file
+# Output providers are not imported here - they are imported on demand from the registry in
+# processor.outputs.output_base so unused outputs never load their dependencies
\ No newline at end of file
@@ -19,50 +19,104 @@
 #under the License.
 
 import csv
-from functools import reduce
+import gzip
+import os
+from itertools import islice
 
 from processor.outputs.output_base import ElectricEyeOutput
 
+DEFAULT_CSV_COLUMNS = [
+    {"name": "Id", "path": "Id"},
+    {"name": "Title", "path": "Title"},
+    {"name": "ProductArn", "path": "ProductArn"},
+    {"name": "AwsAccountId", "path": "AwsAccountId"},
+    {"name": "Severity", "path": "Severity.Label"},
+    {"name": "Confidence", "path": "Confidence"},
+    {"name": "Description", "path": "Description"},
+    {"name": "RecordState", "path": "RecordState"},
+    {"name": "Compliance Status", "path": "Compliance.Status"},
+    {"name": "Remediation Recommendation", "path": "Remediation.Recommendation.Text",},
+    {"name": "Remediation Recommendation Link", "path": "Remediation.Recommendation.Url",},
+]
+# Rows handed to the csv writer at once and size of the file buffer
+CHUNK_SIZE = 5000
+BUFFER_SIZE = 1024 * 1024
+# Separator used for list values such as Compliance.RelatedRequirements
+LIST_SEPARATOR = ", "
+
 
 @ElectricEyeOutput
 class CsvProvider(object):
     __provider__ = "csv"
 
-    def write_findings(self, findings: list, output_file: str, **kwargs):
-        csv_columns = [
-            {"name": "Id", "path": "Id"},
-            {"name": "Title", "path": "Title"},
-            {"name": "ProductArn", "path": "ProductArn"},
-            {"name": "AwsAccountId", "path": "AwsAccountId"},
-            {"name": "Severity", "path": "Severity.Label"},
-            {"name": "Confidence", "path": "Confidence"},
-            {"name": "Description", "path": "Description"},
-            {"name": "RecordState", "path": "RecordState"},
-            {"name": "Compliance Status", "path": "Compliance.Status"},
-            {"name": "Remediation Recommendation", "path": "Remediation.Recommendation.Text",},
-            {"name": "Remediation Recommendation Link", "path": "Remediation.Recommendation.Url",},
-        ]
-        csv_file = output_file + ".csv"
+    def __init__(self):
+        # Columns can be overridden with a comma separated list of paths, optionally named, e.g.
+        # CSV_COLUMNS="Id,Severity=Severity.Label,Requirements=Compliance.RelatedRequirements"
+        try:
+            self.csv_columns = self.parse_columns(os.environ["CSV_COLUMNS"])
+        except KeyError:
+            self.csv_columns = DEFAULT_CSV_COLUMNS
+        self.gzip = os.environ.get("CSV_GZIP", "false").lower() == "true"
+        # the column paths are compiled once into accessors instead of being resolved for every cell
+        self.accessors = [self.compile_accessor(column["path"]) for column in self.csv_columns]
+
+    def write_findings(self, findings, output_file: str, **kwargs):
+        csv_file = output_file + (".csv.gz" if self.gzip else ".csv")
+        print(f"Writing findings to {csv_file}")
+        accessors = self.accessors
+        # findings can be any iterable, they are consumed and written in chunks rather than held as rows
+        findings = iter(findings)
+        count = 0
         try:
-            with open(csv_file, "w") as csvfile:
-                print(f"Writing {len(findings)} findings to {csv_file}")
+            if self.gzip:
+                csvfile = gzip.open(csv_file, "wt", newline="")
+            else:
+                csvfile = open(csv_file, "w", newline="", buffering=BUFFER_SIZE)
+            with csvfile:
                 writer = csv.writer(csvfile, dialect="excel")
-                writer.writerow(item["name"] for item in csv_columns)
-                for finding in findings:
-                    row_data = []
-                    for column_dict in csv_columns:
-                        row_data.append(self.deep_get(finding, column_dict["path"]))
-                    writer.writerow(row_data)
-            csvfile.close()
+                writer.writerow(item["name"] for item in self.csv_columns)
+                while True:
+                    chunk = [
+                        [accessor(finding) for accessor in accessors]
+                        for finding in islice(findings, CHUNK_SIZE)
+                    ]
+                    if not chunk:
+                        break
+                    writer.writerows(chunk)
+                    count += len(chunk)
         except IOError as e:
             print(f"Error writing to file {output_file} with exception {e}")
             return False
+        print(f"Wrote {count} findings to {csv_file}")
         return True
 
-    # Return nested dictionary values by passing in dictionary and keys separated by "."
-    def deep_get(self, dictionary, keys):
-        return reduce(
-            lambda d, key: d.get(key) if isinstance(d, dict) else None,
-            keys.split("."),
-            dictionary,
-        )
+    # Parse "Name=Path" or "Path" column definitions separated by commas
+    def parse_columns(self, columns: str):
+        parsed = []
+        for column in columns.split(","):
+            column = column.strip()
+            if not column:
+                continue
+            name, _, path = column.rpartition("=")
+            parsed.append({"name": name or path, "path": path})
+        return parsed
+
+    # Return a function which returns the nested value for keys separated by "." - numeric keys index into lists
+    # and list values are joined so they fit in a single cell
+    def compile_accessor(self, path: str):
+        keys = [int(key) if key.isdigit() else key for key in path.split(".")]
+
+        def accessor(finding):
+            value = finding
+            for key in keys:
+                if isinstance(value, dict) and not isinstance(key, int):
+                    value = value.get(key)
+                elif isinstance(value, list) and isinstance(key, int) and key < len(value):
+                    value = value[key]
+                else:
+                    return None
+            if isinstance(value, list):
+                return LIST_SEPARATOR.join(str(item) for item in value)
+            return value
+
+        return accessor
\ No newline at end of file
@@ -23,8 +23,6 @@ import requests
 import pymongo
 from processor.outputs.output_base import ElectricEyeOutput
 
-ssm = boto3.client("ssm")
-
 @ElectricEyeOutput
 class JsonProvider(object):
     __provider__ = "docdb"
@@ -53,6 +51,7 @@ class JsonProvider(object):
             print("Missing required MongoDB parameters")
 
         # pull out the MongoDB Password from SSM
+        ssm = boto3.client("ssm")
         mongoPw = str(ssm.get_parameter(Name=mongoPwParam)["Parameter"]["Value"])
 
         # Download the latest AWS Mongo TLS cert bundle
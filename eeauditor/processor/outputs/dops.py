@@ -19,10 +19,10 @@
 #under the License.
 import sys
 import boto3
-import json
 import os
 import requests
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
 
 
 @ElectricEyeOutput
@@ -56,10 +56,11 @@ class DopsProvider(object):
     def write_findings(self, findings: list, **kwargs):
         print(f"Writing {len(findings)} results to DisruptOps")
         if self.client_id and self.api_key and self.url:
-            for finding in findings:
+            payload = kwargs.get("payload") or FindingsPayload(findings)
+            for finding in payload.serialized:
                 requests.post(
                     self.url, 
-                    data=json.dumps(finding),
+                    data=finding,
                     auth=(self.client_id, self.api_key)
                 )
         else:
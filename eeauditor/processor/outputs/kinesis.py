@@ -0,0 +1,250 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import abc
+import hashlib
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import sleep
+import boto3
+from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
+
+# PutRecords and PutRecordBatch accept up to 500 records and the request is kept under 4MB
+MAX_BATCH_RECORDS = 500
+MAX_BATCH_BYTES = 4 * 1024 * 1024
+# Records, including an aggregated record, must be under 1000 KiB
+MAX_RECORD_BYTES = 1000 * 1024
+# Times only the failed records of a batch are re-sent, waiting BACKOFF_SECONDS ** attempt in between
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 2
+# Magic number which prefixes every KPL aggregated record
+KPL_MAGIC = b"\xf3\x89\x9a\xc2"
+
+class KinesisBatchWriter(abc.ABC):
+    """Shared batching for the Kinesis Data Streams and Kinesis Data Firehose output providers - findings are packed
+    into batches of up to 500 records or 4MB, with a bounded number of batches in flight, and only the failed
+    records of a batch are retried"""
+
+    def __init__(self):
+        self.aggregate = os.environ.get("KINESIS_AGGREGATION", "false").lower() == "true"
+        self.max_in_flight = int(os.environ.get("KINESIS_MAX_IN_FLIGHT", "4"))
+
+    def write_findings(self, findings: list, **kwargs):
+        print(f"Writing {len(findings)} results to {self.__provider__}")
+        payload = kwargs.get("payload") or FindingsPayload(findings)
+        records = self.build_records(findings, payload.serialized)
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            inFlight = set()
+            for batch in self.batches(records):
+                # wait for a batch to complete before sending more than max_in_flight at once
+                if len(inFlight) >= self.max_in_flight:
+                    done, inFlight = wait(inFlight, return_when=FIRST_COMPLETED)
+                    failed += sum(future.result() for future in done)
+                inFlight.add(executor.submit(self.put_batch, batch))
+            failed += sum(future.result() for future in wait(inFlight).done)
+
+        if failed:
+            raise RuntimeError(f"{failed} records could not be written to {self.__provider__} after {MAX_RETRIES} retries")
+        return True
+
+    def batches(self, records):
+        """Group records into batches within the record count and size limits of a single request"""
+        batch = []
+        batchBytes = 0
+        for record in records:
+            recordBytes = self.record_size(record)
+            if batch and (len(batch) == MAX_BATCH_RECORDS or batchBytes + recordBytes > MAX_BATCH_BYTES):
+                yield batch
+                batch = []
+                batchBytes = 0
+            batch.append(record)
+            batchBytes += recordBytes
+        if batch:
+            yield batch
+
+    def put_batch(self, batch: list):
+        """Send a batch, retrying only the records which failed, returns the number of records which still failed"""
+        for attempt in range(MAX_RETRIES + 1):
+            batch = self.send(batch)
+            if not batch:
+                return 0
+            if attempt < MAX_RETRIES:
+                sleep(BACKOFF_SECONDS ** attempt)
+        print(f"{len(batch)} records failed to be written to {self.__provider__}")
+        return len(batch)
+
+    @abc.abstractmethod
+    def build_records(self, findings: list, serialized: list):
+        """Build the records for the serialized findings, in the shape the service's batch call takes"""
+
+    @abc.abstractmethod
+    def record_size(self, record: dict):
+        """Size of a record as it counts against the request size limit"""
+
+    @abc.abstractmethod
+    def send(self, batch: list):
+        """Send a batch and return the records which failed"""
+
+
+@ElectricEyeOutput
+class KinesisProvider(KinesisBatchWriter):
+    __provider__ = "kinesis"
+
+    def __init__(self):
+        super().__init__()
+        try:
+            streamName = os.environ["KINESIS_STREAM_NAME"]
+        except KeyError:
+            streamName = "placeholder"
+
+        if streamName == ("placeholder" or None):
+            print('Either the Kinesis Data Stream name was not provided, or the "placeholder" value was kept')
+            sys.exit(2)
+
+        self.stream_name = streamName
+        self.kinesis = boto3.client("kinesis")
+
+    def build_records(self, findings: list, serialized: list):
+        # the Finding Id is used as the Partition Key to spread findings evenly across shards
+        records = (
+            {"Data": document.encode("utf-8"), "PartitionKey": str(finding["Id"])[:256]}
+            for finding, document in zip(findings, serialized)
+        )
+        if self.aggregate:
+            return self.aggregate_records(records)
+        return records
+
+    def record_size(self, record: dict):
+        return len(record["Data"]) + len(record["PartitionKey"].encode("utf-8"))
+
+    def send(self, batch: list):
+        response = self.kinesis.put_records(StreamName=self.stream_name, Records=batch)
+        if not response["FailedRecordCount"]:
+            return []
+        return [
+            record for record, result in zip(batch, response["Records"]) if "ErrorCode" in result
+        ]
+
+    def aggregate_records(self, records):
+        """Pack records into KPL aggregated records, which the KCL and the Lambda deaggregation libraries unpack"""
+        aggregated = []
+        aggregatedBytes = 0
+        for record in records:
+            # partition key, data and the protobuf framing of a single user record
+            recordBytes = self.record_size(record) + 32
+            if aggregated and aggregatedBytes + recordBytes > MAX_RECORD_BYTES:
+                yield self.encode_aggregated_record(aggregated)
+                aggregated = []
+                aggregatedBytes = 0
+            aggregated.append(record)
+            aggregatedBytes += recordBytes
+        if aggregated:
+            yield self.encode_aggregated_record(aggregated)
+
+    def encode_aggregated_record(self, records: list):
+        """Encode records as an AggregatedRecord protobuf message - MAGIC + message + MD5(message)"""
+        partitionKeys = {}
+        message = bytearray()
+        for record in records:
+            partitionKeys.setdefault(record["PartitionKey"], len(partitionKeys))
+        # repeated string partition_key_table = 1
+        for partitionKey in partitionKeys:
+            message += self.length_delimited(1, partitionKey.encode("utf-8"))
+        # repeated Record records = 3, Record has required uint64 partition_key_index = 1 and required bytes data = 3
+        for record in records:
+            userRecord = bytearray()
+            userRecord += self.varint(1 << 3)
+            userRecord += self.varint(partitionKeys[record["PartitionKey"]])
+            userRecord += self.length_delimited(3, record["Data"])
+            message += self.length_delimited(3, bytes(userRecord))
+        message = bytes(message)
+        return {
+            "Data": KPL_MAGIC + message + hashlib.md5(message).digest(),
+            "PartitionKey": records[0]["PartitionKey"]
+        }
+
+    def length_delimited(self, fieldNumber: int, value: bytes):
+        return self.varint((fieldNumber << 3) | 2) + self.varint(len(value)) + value
+
+    def varint(self, value: int):
+        encoded = bytearray()
+        while True:
+            byte = value & 0x7F
+            value >>= 7
+            if value:
+                encoded.append(byte | 0x80)
+            else:
+                encoded.append(byte)
+                return bytes(encoded)
+
+
+@ElectricEyeOutput
+class FirehoseProvider(KinesisBatchWriter):
+    __provider__ = "firehose"
+
+    def __init__(self):
+        super().__init__()
+        try:
+            deliveryStreamName = os.environ["FIREHOSE_DELIVERY_STREAM_NAME"]
+        except KeyError:
+            deliveryStreamName = "placeholder"
+
+        if deliveryStreamName == ("placeholder" or None):
+            print('Either the Kinesis Data Firehose delivery stream name was not provided, or the "placeholder" value was kept')
+            sys.exit(2)
+
+        self.delivery_stream_name = deliveryStreamName
+        self.firehose = boto3.client("firehose")
+
+    def build_records(self, findings: list, serialized: list):
+        # newline delimited so the objects Firehose delivers are valid JSON Lines
+        records = ({"Data": (document + "\n").encode("utf-8")} for document in serialized)
+        if self.aggregate:
+            return self.aggregate_records(records)
+        return records
+
+    def record_size(self, record: dict):
+        return len(record["Data"])
+
+    def send(self, batch: list):
+        response = self.firehose.put_record_batch(DeliveryStreamName=self.delivery_stream_name, Records=batch)
+        if not response["FailedPutCount"]:
+            return []
+        return [
+            record for record, result in zip(batch, response["RequestResponses"]) if "ErrorCode" in result
+        ]
+
+    def aggregate_records(self, records):
+        """Pack multiple JSON Lines into a single Firehose record, Firehose concatenates records on delivery so no
+        deaggregation is required downstream"""
+        aggregated = []
+        aggregatedBytes = 0
+        for record in records:
+            if aggregated and aggregatedBytes + len(record["Data"]) > MAX_RECORD_BYTES:
+                yield {"Data": b"".join(aggregated)}
+                aggregated = []
+                aggregatedBytes = 0
+            aggregated.append(record["Data"])
+            aggregatedBytes += len(record["Data"])
+        if aggregated:
+            yield {"Data": b"".join(aggregated)}
@@ -17,10 +17,31 @@
 #KIND, either express or implied.  See the License for the
 #specific language governing permissions and limitations
 #under the License.
+import importlib
+import os
+
 class ElectricEyeOutput(object):
     """Class to be used as a decorator to register all output providers"""
 
     _outputs = {}
+    # Lightweight registry of output provider names to the module which defines them, a provider module (and
+    # its dependencies such as pymongo or psycopg2) is only imported once that provider is selected. New output
+    # providers should be added here so they are listed by --list-options without importing anything
+    _modules = {
+        "csv": "processor.outputs.csv",
+        "docdb": "processor.outputs.docdb-output",
+        "dops": "processor.outputs.dops",
+        "firehose": "processor.outputs.kinesis",
+        "json": "processor.outputs.json-output",
+        "json_normalized": "processor.outputs.json-output-normalized",
+        "kinesis": "processor.outputs.kinesis",
+        "parquet": "processor.outputs.parquet",
+        "postgres": "processor.outputs.postgresql",
+        "s3": "processor.outputs.s3",
+        "sechub": "processor.outputs.sechub",
+        "sqlite": "processor.outputs.sqlite",
+        "stdout": "processor.outputs.stdout",
+    }
 
     def __new__(cls, output):
         ElectricEyeOutput._outputs[output.__provider__] = output
@@ -29,6 +50,11 @@ class ElectricEyeOutput(object):
     @classmethod
     def get_provider(cls, provider):
         """Returns the class to process the findings"""
+        if provider not in cls._outputs:
+            if provider in cls._modules:
+                importlib.import_module(cls._modules[provider])
+            else:
+                cls.import_unregistered_providers()
         try:
             return cls._outputs[provider]
         except KeyError:
@@ -37,4 +63,19 @@ class ElectricEyeOutput(object):
     @classmethod
     def get_all_providers(cls):
         """Return a list of all the possible output providers"""
-        return [*cls._outputs]
\ No newline at end of file
+        return [*dict.fromkeys([*cls._modules, *cls._outputs])]
+
+    @classmethod
+    def import_unregistered_providers(cls):
+        """Import any output modules which were dropped into this directory without being added to the registry"""
+        registeredModules = {module.rpartition(".")[2] for module in cls._modules.values()}
+        for output_file in os.listdir(os.path.dirname(__file__)):
+            # Skip the common base file, registered modules and any non-py files
+            moduleName = os.path.splitext(output_file)[0]
+            if (
+                output_file.startswith(("__init__", "output_base"))
+                or not output_file.endswith(".py")
+                or moduleName in registeredModules
+            ):
+                continue
+            importlib.import_module(".".join(["processor", "outputs", moduleName]))
\ No newline at end of file
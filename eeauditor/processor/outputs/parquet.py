@@ -0,0 +1,130 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import os
+import uuid
+import pyarrow as pa
+import pyarrow.parquet as pq
+from processor.normalize import parse_timestamp, partition_date
+from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
+
+# Typed schema for the normalized (flattened) findings - partition columns are written into the path
+PARQUET_SCHEMA = pa.schema([
+    ("SchemaVersion", pa.string()),
+    ("Id", pa.string()),
+    ("ProductArn", pa.string()),
+    ("GeneratorId", pa.string()),
+    ("Types", pa.string()),
+    ("FirstObservedAt", pa.timestamp("us", tz="UTC")),
+    ("CreatedAt", pa.timestamp("us", tz="UTC")),
+    ("UpdatedAt", pa.timestamp("us", tz="UTC")),
+    ("SeverityLabel", pa.string()),
+    ("Confidence", pa.int32()),
+    ("Title", pa.string()),
+    ("Description", pa.string()),
+    ("RecommendationText", pa.string()),
+    ("RecommendationUrl", pa.string()),
+    ("ProductName", pa.string()),
+    ("ResourceType", pa.string()),
+    ("ResourceId", pa.string()),
+    ("ResourcePartition", pa.string()),
+    ("ResourceDetails", pa.string()),
+    ("ComplianceStatus", pa.string()),
+    ("ComplianceRelatedRequirements", pa.list_(pa.string())),
+    ("WorkflowStatus", pa.string()),
+    ("RecordState", pa.string())
+])
+# Highly repetitive values across findings - dictionary encoding these is what shrinks the files
+DICTIONARY_COLUMNS = [
+    "SchemaVersion",
+    "ProductArn",
+    "GeneratorId",
+    "Types",
+    "SeverityLabel",
+    "Title",
+    "Description",
+    "RecommendationText",
+    "RecommendationUrl",
+    "ProductName",
+    "ResourceType",
+    "ResourcePartition",
+    "ComplianceStatus",
+    "ComplianceRelatedRequirements.list.element",
+    "WorkflowStatus",
+    "RecordState"
+]
+TIMESTAMP_COLUMNS = ["FirstObservedAt", "CreatedAt", "UpdatedAt"]
+# Number of findings per Row Group
+ROW_GROUP_SIZE = 50000
+
+@ElectricEyeOutput
+class ParquetProvider(object):
+    __provider__ = "parquet"
+
+    def write_findings(self, findings: list, output_file: str, **kwargs):
+        print(f"Writing {len(findings)} findings to Parquet")
+        # Hive-style partitions are written underneath this directory, e.g. AwsAccountId=.../Region=.../date=...
+        parquetRoot = f"{output_file}-parquet"
+        print(f"Your Parquet dataset is located in {parquetRoot}")
+
+        payload = kwargs.get("payload") or FindingsPayload(findings)
+        partitions = self.partition_rows(payload.normalized)
+
+        for (awsAccountId, awsRegion, scanDate), rows in partitions.items():
+            partitionDir = os.path.join(
+                parquetRoot,
+                f"AwsAccountId={awsAccountId}",
+                f"Region={awsRegion}",
+                f"date={scanDate}"
+            )
+            os.makedirs(partitionDir, exist_ok=True)
+            self.write_rows(os.path.join(partitionDir, f"part-{uuid.uuid4()}.parquet"), rows)
+
+        print(f"Wrote {len(partitions)} partitions to Parquet")
+
+        return True
+
+    def partition_rows(self, normalized: list):
+        """Group typed copies of normalized findings by (AwsAccountId, Region, date) - the partition
+        columns are removed from the rows as they are written into the path instead"""
+        partitions = {}
+        for normalizedRow in normalized:
+            # normalized rows are shared with other providers, work on a copy
+            row = dict(normalizedRow)
+            for col in TIMESTAMP_COLUMNS:
+                row[col] = parse_timestamp(row[col])
+            scanDate = partition_date(row["CreatedAt"])
+            partitionKey = (row.pop("AwsAccountId"), row.pop("ResourceRegion"), scanDate)
+            partitions.setdefault(partitionKey, []).append(row)
+        return partitions
+
+    def write_rows(self, where, rows: list):
+        """Write rows to a Parquet file path or writable file-like object"""
+        with pq.ParquetWriter(
+            where,
+            PARQUET_SCHEMA,
+            compression="snappy",
+            use_dictionary=DICTIONARY_COLUMNS
+        ) as writer:
+            # write in Row Group sized batches so large partitions are never converted in one go
+            for i in range(0, len(rows), ROW_GROUP_SIZE):
+                writer.write_table(
+                    pa.Table.from_pylist(rows[i:i + ROW_GROUP_SIZE], schema=PARQUET_SCHEMA)
+                )
@@ -0,0 +1,227 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import gzip
+import io
+import json
+import os
+import sys
+import uuid
+import boto3
+from processor.normalize import parse_timestamp, partition_date
+from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
+
+# Size of each uploaded part, S3 requires every part but the last to be at least 5MB
+PART_SIZE = 8 * 1024 * 1024
+OUTPUT_FORMATS = ["ndjson", "parquet"]
+
+class S3MultipartWriter(io.RawIOBase):
+    """Writable file-like object which uploads to S3 in parts while it is being written to, so nothing is
+    staged on local disk. Used as a context manager the upload is completed on success and aborted on error"""
+
+    def __init__(self, s3, bucket: str, key: str, contentType: str):
+        super().__init__()
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.buffer = bytearray()
+        self.parts = []
+        self.position = 0
+        self.upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key, ContentType=contentType)["UploadId"]
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        size = memoryview(data).nbytes
+        self.buffer += data
+        self.position += size
+        if len(self.buffer) >= PART_SIZE:
+            self.upload_part()
+        return size
+
+    def tell(self):
+        return self.position
+
+    def upload_part(self):
+        partNumber = len(self.parts) + 1
+        response = self.s3.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=partNumber,
+            Body=bytes(self.buffer)
+        )
+        self.parts.append({"ETag": response["ETag"], "PartNumber": partNumber})
+        self.buffer = bytearray()
+
+    def close(self):
+        """Upload the remaining buffer and complete the multipart upload"""
+        if self.closed:
+            return
+        try:
+            # an empty upload still needs a single (empty) part to be completed
+            if self.buffer or not self.parts:
+                self.upload_part()
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={"Parts": self.parts}
+            )
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            super().close()
+
+    def abort(self):
+        """Abort the multipart upload so no orphaned parts are left behind"""
+        if not self.closed:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type:
+            self.abort()
+        else:
+            self.close()
+
+
+@ElectricEyeOutput
+class S3Provider(object):
+    __provider__ = "s3"
+
+    def __init__(self):
+        try:
+            bucketName = os.environ["S3_OUTPUT_BUCKET"]
+        except KeyError:
+            bucketName = "placeholder"
+
+        if bucketName == ("placeholder" or None):
+            print('Either the S3 output bucket was not provided, or the "placeholder" value was kept')
+            sys.exit(2)
+
+        self.bucket = bucketName
+        self.prefix = os.environ.get("S3_OUTPUT_PREFIX", "electriceye").strip("/")
+        self.format = os.environ.get("S3_OUTPUT_FORMAT", "ndjson").lower()
+        if self.format not in OUTPUT_FORMATS:
+            raise ValueError(f"S3 output format {self.format} is not one of {OUTPUT_FORMATS}")
+        self.s3 = boto3.client("s3")
+
+    def write_findings(self, findings: list, output_file: str, **kwargs):
+        print(f"Writing {len(findings)} findings to s3://{self.bucket}/{self.prefix} as {self.format}")
+        payload = kwargs.get("payload") or FindingsPayload(findings)
+        # every object written by this run shares the output file name and a Run Id so reruns never overwrite
+        fileName = f"{os.path.basename(output_file) or 'output'}-{uuid.uuid4()}"
+
+        if self.format == "parquet":
+            keys = self.write_parquet(payload, fileName)
+        else:
+            keys = self.write_ndjson(findings, payload.serialized, fileName)
+
+        # QuickSight manifests cannot describe Parquet, Parquet datasets are read from their partitions instead
+        if self.format == "ndjson":
+            self.write_manifest(keys, output_file, fileName)
+        print(f"Wrote {len(keys)} objects to s3://{self.bucket}/{self.prefix}")
+
+        return True
+
+    def partition_key(self, awsAccountId: str, awsRegion: str, scanDate: str, fileName: str):
+        """Hive-style partitioned object key"""
+        return f"{self.prefix}/AwsAccountId={awsAccountId}/Region={awsRegion}/date={scanDate}/{fileName}"
+
+    def write_ndjson(self, findings: list, serialized: list, fileName: str):
+        """Stream gzipped newline delimited JSON into one multipart upload per partition as findings are read"""
+        streams = {}
+        try:
+            for finding, document in zip(findings, serialized):
+                try:
+                    awsRegion = finding["Resources"][0]["Region"]
+                except (KeyError, IndexError):
+                    awsRegion = "global"
+                partition = (
+                    finding.get("AwsAccountId", "unknown"),
+                    awsRegion,
+                    partition_date(parse_timestamp(finding.get("CreatedAt", "")))
+                )
+                if partition not in streams:
+                    writer = S3MultipartWriter(
+                        self.s3,
+                        self.bucket,
+                        self.partition_key(*partition, f"{fileName}.json.gz"),
+                        "application/x-ndjson"
+                    )
+                    streams[partition] = (writer, gzip.GzipFile(fileobj=writer, mode="wb"))
+                streams[partition][1].write((document + "\n").encode("utf-8"))
+        except BaseException:
+            for writer, _ in streams.values():
+                writer.abort()
+            raise
+
+        for writer, compressor in streams.values():
+            # closing the GzipFile writes the gzip trailer, it does not close the upload
+            with writer:
+                compressor.close()
+
+        return [writer.key for writer, _ in streams.values()]
+
+    def write_parquet(self, payload: FindingsPayload, fileName: str):
+        """Stream a Parquet file per partition - uses the same typed schema as the parquet output"""
+        from processor.outputs.parquet import ParquetProvider
+
+        parquet = ParquetProvider()
+        keys = []
+        for partition, rows in parquet.partition_rows(payload.normalized).items():
+            with S3MultipartWriter(
+                self.s3,
+                self.bucket,
+                self.partition_key(*partition, f"{fileName}.parquet"),
+                "application/vnd.apache.parquet"
+            ) as writer:
+                parquet.write_rows(writer, rows)
+            keys.append(writer.key)
+
+        return keys
+
+    def write_manifest(self, keys: list, output_file: str, fileName: str):
+        """Write a QuickSight manifest of every ndjson object in this run, along with a copy at a fixed key
+        so downstream readers such as QuickSight data sources can always point at the latest run"""
+        manifest = json.dumps(
+            {
+                "fileLocations": [
+                    {"URIs": [f"s3://{self.bucket}/{key}" for key in keys]}
+                ],
+                "globalUploadSettings": {
+                    "format": "JSON"
+                }
+            },
+            indent=2
+        )
+        for manifestKey in [
+            f"{self.prefix}/manifests/{fileName}.json",
+            f"{self.prefix}/manifests/{os.path.basename(output_file) or 'output'}-latest.json"
+        ]:
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=manifestKey,
+                Body=manifest.encode("utf-8"),
+                ContentType="application/json"
+            )
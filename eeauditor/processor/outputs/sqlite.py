@@ -0,0 +1,202 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import sqlite3
+from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
+from processor.validator import control_id
+
+# Number of findings written per transaction
+BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings(
+    id TEXT PRIMARY KEY,
+    schema_version TEXT,
+    product_arn TEXT,
+    generator_id TEXT,
+    control_id TEXT,
+    aws_account_id TEXT,
+    types TEXT,
+    first_observed_at TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    severity_label TEXT,
+    confidence INTEGER,
+    title TEXT,
+    description TEXT,
+    recommendation_text TEXT,
+    recommendation_url TEXT,
+    compliance_status TEXT,
+    workflow_status TEXT,
+    record_state TEXT,
+    finding TEXT
+);
+CREATE TABLE IF NOT EXISTS resources(
+    finding_id TEXT NOT NULL REFERENCES findings(id) ON DELETE CASCADE,
+    resource_id TEXT,
+    resource_type TEXT,
+    resource_partition TEXT,
+    resource_region TEXT,
+    details TEXT
+);
+CREATE TABLE IF NOT EXISTS compliance_requirements(
+    finding_id TEXT NOT NULL REFERENCES findings(id) ON DELETE CASCADE,
+    requirement TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity_label);
+CREATE INDEX IF NOT EXISTS idx_findings_compliance_status ON findings(compliance_status);
+CREATE INDEX IF NOT EXISTS idx_findings_record_state ON findings(record_state);
+CREATE INDEX IF NOT EXISTS idx_findings_generator_id ON findings(generator_id);
+CREATE INDEX IF NOT EXISTS idx_findings_control_id ON findings(control_id);
+CREATE INDEX IF NOT EXISTS idx_resources_finding_id ON resources(finding_id);
+CREATE INDEX IF NOT EXISTS idx_resources_resource_type ON resources(resource_type);
+CREATE INDEX IF NOT EXISTS idx_resources_resource_id ON resources(resource_id);
+CREATE INDEX IF NOT EXISTS idx_compliance_requirements_finding_id ON compliance_requirements(finding_id);
+CREATE INDEX IF NOT EXISTS idx_compliance_requirements_requirement ON compliance_requirements(requirement);
+"""
+
+# Upsert on the Finding Id - the first time a finding was observed is kept from the original record
+# so the store can back incremental scans, everything else is replaced with the latest values
+UPSERT_FINDING = """
+INSERT INTO findings(
+    id, schema_version, product_arn, generator_id, control_id, aws_account_id, types, first_observed_at,
+    created_at, updated_at, severity_label, confidence, title, description, recommendation_text,
+    recommendation_url, compliance_status, workflow_status, record_state, finding
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    schema_version = excluded.schema_version,
+    product_arn = excluded.product_arn,
+    generator_id = excluded.generator_id,
+    control_id = excluded.control_id,
+    aws_account_id = excluded.aws_account_id,
+    types = excluded.types,
+    updated_at = excluded.updated_at,
+    severity_label = excluded.severity_label,
+    confidence = excluded.confidence,
+    title = excluded.title,
+    description = excluded.description,
+    recommendation_text = excluded.recommendation_text,
+    recommendation_url = excluded.recommendation_url,
+    compliance_status = excluded.compliance_status,
+    workflow_status = excluded.workflow_status,
+    record_state = excluded.record_state,
+    finding = excluded.finding
+"""
+
+@ElectricEyeOutput
+class SqliteProvider(object):
+    __provider__ = "sqlite"
+
+    def write_findings(self, findings: list, output_file: str, **kwargs):
+        print(f"Writing {len(findings)} findings to SQLite")
+        # create output file based on inputs
+        dbFile = f"{output_file}.db"
+        print(f"Your SQLite database is called {dbFile}")
+
+        payload = kwargs.get("payload") or FindingsPayload(findings)
+        conn = self.connect(dbFile)
+        try:
+            for i in range(0, len(findings), BATCH_SIZE):
+                self.write_batch(conn, findings[i:i + BATCH_SIZE], payload.serialized[i:i + BATCH_SIZE])
+        finally:
+            conn.close()
+
+        return True
+
+    def connect(self, dbFile: str):
+        """Open the findings store in WAL mode and create the schema if it does not exist yet"""
+        conn = sqlite3.connect(dbFile)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        # stores created before the control_id column was added are migrated before it is indexed
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(findings)")]
+        if columns and "control_id" not in columns:
+            conn.execute("ALTER TABLE findings ADD COLUMN control_id TEXT")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def write_batch(self, conn, findings: list, serialized: list):
+        """Upsert a batch of findings, along with their JSON documents, and replace their child rows in a single transaction"""
+        # keyed by Finding Id so a duplicated finding within the batch is only written once (last write wins)
+        batch = {}
+        for finding, document in zip(findings, serialized):
+            try:
+                findingId = str(finding["Id"])
+                findingRow = (
+                    findingId,
+                    str(finding["SchemaVersion"]),
+                    str(finding["ProductArn"]),
+                    str(finding["GeneratorId"]),
+                    control_id(finding["Title"]),
+                    str(finding["AwsAccountId"]),
+                    json.dumps(finding["Types"]),
+                    str(finding["FirstObservedAt"]),
+                    str(finding["CreatedAt"]),
+                    str(finding["UpdatedAt"]),
+                    str(finding["Severity"]["Label"]),
+                    int(finding.get("Confidence", 99)),
+                    str(finding["Title"]),
+                    str(finding["Description"]),
+                    str(finding["Remediation"]["Recommendation"]["Text"]),
+                    str(finding["Remediation"]["Recommendation"]["Url"]),
+                    str(finding["Compliance"]["Status"]),
+                    str(finding["Workflow"]["Status"]),
+                    str(finding["RecordState"]),
+                    document
+                )
+                resourceRows = [
+                    (
+                        findingId,
+                        str(resource["Id"]),
+                        str(resource["Type"]),
+                        str(resource.get("Partition")),
+                        str(resource.get("Region")),
+                        json.dumps(resource.get("Details", {}), default=str)
+                    )
+                    for resource in finding["Resources"]
+                ]
+            except KeyError as e:
+                print(f"Issue with Finding ID {finding.get('Id')} due to missing value {e}")
+                continue
+            requirementRows = [
+                (findingId, str(requirement))
+                for requirement in finding["Compliance"].get("RelatedRequirements", [])
+            ]
+            batch[findingId] = (findingRow, resourceRows, requirementRows)
+
+        findingIds = [(findingId,) for findingId in batch]
+        findingRows = [row for row, _, _ in batch.values()]
+        resourceRows = [row for _, rows, _ in batch.values() for row in rows]
+        requirementRows = [row for _, _, rows in batch.values() for row in rows]
+        # the connection as a context manager commits the whole batch, or rolls it back on error
+        with conn:
+            conn.executemany("DELETE FROM resources WHERE finding_id = ?", findingIds)
+            conn.executemany("DELETE FROM compliance_requirements WHERE finding_id = ?", findingIds)
+            conn.executemany(UPSERT_FINDING, findingRows)
+            conn.executemany(
+                "INSERT INTO resources(finding_id, resource_id, resource_type, resource_partition, resource_region, details) VALUES (?, ?, ?, ?, ?, ?)",
+                resourceRows
+            )
+            conn.executemany(
+                "INSERT INTO compliance_requirements(finding_id, requirement) VALUES (?, ?)",
+                requirementRows
+            )
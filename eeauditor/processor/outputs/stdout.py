@@ -17,21 +17,17 @@
 #KIND, either express or implied.  See the License for the
 #specific language governing permissions and limitations
 #under the License.
-import json
 from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
 
 @ElectricEyeOutput
 class StdoutProvider(object):
     __provider__ = "stdout"
 
     def write_findings(self, findings: list, output_file: str, **kwargs):
-        checkedIds = []
-
-        for finding in findings:
-            if finding["Id"] not in checkedIds:
-                checkedIds.append(finding["Id"])
-                print(json.dumps(finding,default=str))
-            else:
-                continue
+        payload = kwargs.get("payload") or FindingsPayload(findings)
+        # findings are already deduplicated by the processor
+        for finding in payload.serialized:
+            print(finding)
             
         return True
\ No newline at end of file
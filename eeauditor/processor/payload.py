@@ -0,0 +1,55 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import threading
+from processor.normalize import flatten_finding
+
+class FindingsPayload(object):
+    """Findings shared between all output providers - the serialized and normalized forms are
+    built once, on first use, no matter how many providers consume them"""
+
+    def __init__(self, findings: list, serialized: list = None):
+        self.findings = findings
+        self._serialized = serialized
+        self._serializedLock = threading.Lock()
+        self._normalized = None
+        self._normalizedLock = threading.Lock()
+
+    @property
+    def serialized(self):
+        """List of JSON documents, one per finding"""
+        with self._serializedLock:
+            if self._serialized is None:
+                self._serialized = [json.dumps(finding, default=str) for finding in self.findings]
+        return self._serialized
+
+    @property
+    def normalized(self):
+        """List of flattened findings, findings which are missing required values are dropped"""
+        with self._normalizedLock:
+            if self._normalized is None:
+                normalized = []
+                for finding in self.findings:
+                    try:
+                        normalized.append(flatten_finding(finding))
+                    except KeyError as e:
+                        print(f"Issue with Finding ID {finding.get('Id')} due to missing value {e}")
+                self._normalized = normalized
+        return self._normalized
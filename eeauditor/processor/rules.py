@@ -0,0 +1,159 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import fnmatch
+import json
+import re
+from processor.payload import FindingsPayload
+from processor.validator import check_id
+
+RULE_ACTIONS = ["suppress", "route"]
+
+class Rule(object):
+    """A single suppression or routing rule, compiled from an entry in the rules file such as
+    {
+        "Name": "sandbox-accounts",
+        "Action": "suppress",
+        "Outputs": ["sechub", "dops"],
+        "CheckId": ["EC2.1"],
+        "ResourceArn": ["arn:aws:s3:::sandbox-*"],
+        "AccountId": ["111111111111"],
+        "Severity": ["INFORMATIONAL"],
+        "ComplianceStatus": ["PASSED"],
+        "Tags": {"Environment": "sandbox*"}
+    }
+    A finding matches when every condition given matches. `suppress` removes matching findings from the Outputs
+    (every output when Outputs is not given) and `route` only sends matching findings to the Outputs"""
+
+    def __init__(self, position: int, rule: dict):
+        self.position = position
+        self.name = rule.get("Name", f"rule-{position}")
+        self.action = rule.get("Action", "suppress")
+        if self.action not in RULE_ACTIONS:
+            raise ValueError(f"Rule {self.name} has an Action which is not one of {RULE_ACTIONS}")
+        if self.action == "route" and not rule.get("Outputs"):
+            raise ValueError(f"Rule {self.name} routes findings but does not specify any Outputs")
+        self.outputs = set(rule["Outputs"]) if rule.get("Outputs") else None
+        self.check_ids = set(rule["CheckId"]) if rule.get("CheckId") else None
+        self.accounts = set(rule["AccountId"]) if rule.get("AccountId") else None
+        self.severities = set(rule["Severity"]) if rule.get("Severity") else None
+        self.statuses = set(rule["ComplianceStatus"]) if rule.get("ComplianceStatus") else None
+        # all ARN globs of a rule are compiled into a single regex
+        self.resource_arns = (
+            re.compile("|".join(fnmatch.translate(pattern) for pattern in rule["ResourceArn"]))
+            if rule.get("ResourceArn") else None
+        )
+        self.tags = rule.get("Tags") or None
+
+    def matches(self, finding: dict):
+        """Check Id is matched by the index, everything else is matched here"""
+        if self.accounts is not None and finding.get("AwsAccountId") not in self.accounts:
+            return False
+        if self.severities is not None and finding.get("Severity", {}).get("Label") not in self.severities:
+            return False
+        if self.statuses is not None and finding.get("Compliance", {}).get("Status") not in self.statuses:
+            return False
+        resources = finding.get("Resources", [])
+        if self.resource_arns is not None and not any(
+            self.resource_arns.match(str(resource.get("Id", ""))) for resource in resources
+        ):
+            return False
+        if self.tags is not None and not any(
+            all(
+                key in resource.get("Tags", {}) and fnmatch.fnmatchcase(str(resource["Tags"][key]), value)
+                for key, value in self.tags.items()
+            )
+            for resource in resources
+        ):
+            return False
+        return True
+
+    def excluded_outputs(self, outputs: set):
+        """The outputs a matching finding is removed from"""
+        if self.action == "route":
+            return outputs - self.outputs
+        return outputs & self.outputs if self.outputs else outputs
+
+
+class RulesEngine(object):
+    """Suppression and routing rules, indexed by Check Id so a finding is only evaluated against the
+    rules which can apply to it"""
+
+    def __init__(self, rules: list):
+        self.rules = [Rule(position, rule) for position, rule in enumerate(rules)]
+        self.by_check_id = {}
+        self.unindexed = []
+        for rule in self.rules:
+            if rule.check_ids is None:
+                self.unindexed.append(rule)
+            else:
+                for checkId in rule.check_ids:
+                    self.by_check_id.setdefault(checkId, []).append(rule)
+
+    @classmethod
+    def from_file(cls, rulesFile: str):
+        with open(rulesFile) as jsonfile:
+            return cls(json.load(jsonfile))
+
+    def excluded_outputs(self, finding: dict, outputs: set):
+        """Returns the outputs a finding must not be sent to"""
+        candidates = self.by_check_id.get(check_id(finding), [])
+        if candidates and self.unindexed:
+            # keep the rules in the order they were written
+            candidates = sorted(candidates + self.unindexed, key=lambda rule: rule.position)
+        elif not candidates:
+            candidates = self.unindexed
+        excluded = set()
+        for rule in candidates:
+            if rule.matches(finding):
+                excluded |= rule.excluded_outputs(outputs)
+        return excluded
+
+    def route(self, findings: list, payload: FindingsPayload, outputs: list):
+        """Applies the rules to every finding, returning the findings and payload which reach at least one output and
+        a dict of output to the (findings, payload) it should be sent. Outputs which receive the same findings share
+        the same payload, so findings are still only serialized and flattened once per route"""
+        allOutputs = set(outputs)
+        exclusions = [self.excluded_outputs(finding, allOutputs) for finding in findings]
+        serialized = payload.serialized
+
+        # findings suppressed from every output are dropped before they reach the outbox or any output
+        kept = [index for index, excluded in enumerate(exclusions) if excluded != allOutputs]
+        if len(kept) != len(findings):
+            print(f"Rules suppressed {len(findings) - len(kept)} findings from every output")
+            findings = [findings[index] for index in kept]
+            serialized = [serialized[index] for index in kept]
+            exclusions = [exclusions[index] for index in kept]
+            payload = FindingsPayload(findings, serialized)
+
+        routes = {}
+        payloads = {(): (findings, payload)}
+        for output in outputs:
+            excluded = tuple(index for index, excludedOutputs in enumerate(exclusions) if output in excludedOutputs)
+            if excluded not in payloads:
+                excludedSet = set(excluded)
+                indexes = [index for index in range(len(findings)) if index not in excludedSet]
+                routedFindings = [findings[index] for index in indexes]
+                payloads[excluded] = (
+                    routedFindings,
+                    FindingsPayload(routedFindings, [serialized[index] for index in indexes])
+                )
+                print(f"Rules removed {len(excluded)} findings from output {output}")
+            routes[output] = payloads[excluded]
+        return findings, payload, routes
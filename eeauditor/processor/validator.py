@@ -0,0 +1,227 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import datetime
+import json
+import re
+
+# Limits of the AWS Security Finding Format enforced by BatchImportFindings
+# https://docs.aws.amazon.com/securityhub/1.0/APIReference/API_AwsSecurityFinding.html
+MAX_FINDING_BYTES = 240 * 1024
+REQUIRED_FIELDS = {
+    "SchemaVersion": str,
+    "Id": str,
+    "ProductArn": str,
+    "GeneratorId": str,
+    "AwsAccountId": str,
+    "Types": list,
+    "CreatedAt": str,
+    "UpdatedAt": str,
+    "Severity": dict,
+    "Title": str,
+    "Description": str,
+    "Resources": list,
+}
+# Identifiers can not be truncated without changing the finding, these are invalid when too long
+MAX_IDENTIFIER_LENGTHS = {
+    "Id": 512,
+    "ProductArn": 512,
+    "GeneratorId": 512,
+}
+# Free text which is truncated to fit
+MAX_TEXT_LENGTHS = {
+    ("Title",): 256,
+    ("Description",): 1024,
+    ("Remediation", "Recommendation", "Text"): 512,
+    ("Remediation", "Recommendation", "Url"): 512,
+}
+MAX_TYPES = 50
+MAX_RESOURCES = 32
+MAX_RELATED_REQUIREMENTS = 32
+MAX_PRODUCT_FIELDS = 50
+MAX_PRODUCT_FIELD_KEY_LENGTH = 128
+MAX_PRODUCT_FIELD_VALUE_LENGTH = 2048
+TIMESTAMP_FIELDS = ["FirstObservedAt", "LastObservedAt", "CreatedAt", "UpdatedAt"]
+TIMESTAMP_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$")
+SEVERITY_LABELS = {"INFORMATIONAL", "LOW", "MEDIUM", "HIGH", "CRITICAL"}
+COMPLIANCE_STATUSES = {"PASSED", "WARNING", "FAILED", "NOT_AVAILABLE"}
+WORKFLOW_STATUSES = {"NEW", "NOTIFIED", "RESOLVED", "SUPPRESSED"}
+RECORD_STATES = {"ACTIVE", "ARCHIVED"}
+TRUNCATION_SUFFIX = "..."
+# ElectricEye Titles start with the Check's control, e.g. [EC2.1]
+CHECK_ID_PATTERN = re.compile(r"^\[([^\]]+)\]")
+
+def truncate(value: str, maxLength: int):
+    """Deterministically truncate text to a maximum length, marking that it was truncated"""
+    return value[:maxLength - len(TRUNCATION_SUFFIX)] + TRUNCATION_SUFFIX
+
+def control_id(title: str):
+    """Returns the control prefixed to a Title, e.g. EC2.1 for [EC2.1], or None if there is none"""
+    match = CHECK_ID_PATTERN.match(str(title))
+    if match:
+        return match.group(1)
+    return None
+
+def check_id(finding: dict):
+    """Returns the control of the Check which created a finding, falls back to the GeneratorId"""
+    return control_id(finding.get("Title", "")) or str(finding.get("GeneratorId", "unknown"))
+
+def finding_size(finding: dict):
+    return len(json.dumps(finding, default=str).encode("utf-8"))
+
+def validate_finding(finding: dict):
+    """Validate a finding against the ASFF and trim oversized members in place. Returns a tuple of
+    (errors, trims, document) - the finding is only valid if there are no errors, document is the finding
+    serialized to JSON which is needed to check its size and is reused by the outputs"""
+    errors = []
+    trims = []
+
+    for field, fieldType in REQUIRED_FIELDS.items():
+        if field not in finding:
+            errors.append(f"missing required field {field}")
+        elif not isinstance(finding[field], fieldType):
+            errors.append(f"{field} is not a {fieldType.__name__}")
+    if errors:
+        return errors, trims, None
+
+    for field, maxLength in MAX_IDENTIFIER_LENGTHS.items():
+        if len(finding[field]) > maxLength:
+            errors.append(f"{field} is longer than {maxLength} characters")
+
+    for field in TIMESTAMP_FIELDS:
+        value = finding.get(field)
+        if value is None:
+            continue
+        # datetimes which were never converted are fixed rather than rejected
+        if isinstance(value, datetime.datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=datetime.timezone.utc)
+            finding[field] = value.isoformat()
+            trims.append(f"converted {field} to ISO 8601")
+        elif not isinstance(value, str) or not TIMESTAMP_PATTERN.match(value):
+            errors.append(f"{field} is not an ISO 8601 timestamp")
+
+    severity = finding["Severity"]
+    if "Label" in severity and severity["Label"] not in SEVERITY_LABELS:
+        errors.append(f"Severity.Label {severity['Label']} is not one of {sorted(SEVERITY_LABELS)}")
+    if "Label" not in severity and "Normalized" not in severity:
+        errors.append("Severity has neither a Label or Normalized score")
+    confidence = finding.get("Confidence")
+    if confidence is not None and (not isinstance(confidence, int) or not 0 <= confidence <= 100):
+        errors.append("Confidence is not an integer between 0 and 100")
+    if "Compliance" in finding and finding["Compliance"].get("Status", "PASSED") not in COMPLIANCE_STATUSES:
+        errors.append(f"Compliance.Status is not one of {sorted(COMPLIANCE_STATUSES)}")
+    if "Workflow" in finding and finding["Workflow"].get("Status", "NEW") not in WORKFLOW_STATUSES:
+        errors.append(f"Workflow.Status is not one of {sorted(WORKFLOW_STATUSES)}")
+    if finding.get("RecordState", "ACTIVE") not in RECORD_STATES:
+        errors.append(f"RecordState is not one of {sorted(RECORD_STATES)}")
+
+    resources = finding["Resources"]
+    if not resources:
+        errors.append("Resources is empty")
+    for resource in resources:
+        if not isinstance(resource, dict) or "Type" not in resource or "Id" not in resource:
+            errors.append("Resources must each have a Type and Id")
+            break
+    if errors:
+        return errors, trims, None
+
+    # everything below can be fixed by trimming
+    for path, maxLength in MAX_TEXT_LENGTHS.items():
+        parent = finding
+        for key in path[:-1]:
+            parent = parent.get(key) if isinstance(parent, dict) else None
+        if isinstance(parent, dict) and isinstance(parent.get(path[-1]), str) and len(parent[path[-1]]) > maxLength:
+            parent[path[-1]] = truncate(parent[path[-1]], maxLength)
+            trims.append(f"truncated {'.'.join(path)} to {maxLength} characters")
+
+    if len(finding["Types"]) > MAX_TYPES:
+        finding["Types"] = finding["Types"][:MAX_TYPES]
+        trims.append(f"trimmed Types to {MAX_TYPES} entries")
+    if len(resources) > MAX_RESOURCES:
+        finding["Resources"] = resources = resources[:MAX_RESOURCES]
+        trims.append(f"trimmed Resources to {MAX_RESOURCES} entries")
+    requirements = finding.get("Compliance", {}).get("RelatedRequirements")
+    if requirements and len(requirements) > MAX_RELATED_REQUIREMENTS:
+        finding["Compliance"]["RelatedRequirements"] = requirements[:MAX_RELATED_REQUIREMENTS]
+        trims.append(f"trimmed Compliance.RelatedRequirements to {MAX_RELATED_REQUIREMENTS} entries")
+
+    productFields = finding.get("ProductFields")
+    if productFields:
+        trimmedFields = {}
+        for key, value in list(productFields.items())[:MAX_PRODUCT_FIELDS]:
+            key = str(key)[:MAX_PRODUCT_FIELD_KEY_LENGTH]
+            value = str(value)
+            trimmedFields[key] = truncate(value, MAX_PRODUCT_FIELD_VALUE_LENGTH) if len(value) > MAX_PRODUCT_FIELD_VALUE_LENGTH else value
+        if trimmedFields != productFields:
+            finding["ProductFields"] = trimmedFields
+            trims.append("trimmed ProductFields")
+
+    # drop the largest Resources[].Details first until the whole finding fits, ties go to the first resource
+    document = json.dumps(finding, default=str)
+    if len(document.encode("utf-8")) > MAX_FINDING_BYTES:
+        detailed = sorted(
+            (index for index, resource in enumerate(resources) if "Details" in resource),
+            key=lambda index: (-finding_size(resources[index]["Details"]), index)
+        )
+        for index in detailed:
+            del resources[index]["Details"]
+            trims.append(f"removed Resources[{index}].Details")
+            document = json.dumps(finding, default=str)
+            if len(document.encode("utf-8")) <= MAX_FINDING_BYTES:
+                break
+        else:
+            errors.append(f"finding is larger than {MAX_FINDING_BYTES} bytes")
+
+    return errors, trims, document
+
+def validate_findings(findings: list):
+    """Validate and trim every finding, returns the valid findings, their JSON documents and a report of
+    errors and trims per Check"""
+    validFindings = []
+    serialized = []
+    report = {}
+    for finding in findings:
+        if not isinstance(finding, dict):
+            errors, trims, document = ["finding is not a dict"], [], None
+            checkId = "unknown"
+        else:
+            errors, trims, document = validate_finding(finding)
+            checkId = check_id(finding)
+        if errors or trims:
+            entry = report.setdefault(checkId, {"Dropped": 0, "Trimmed": 0, "Errors": set(), "Trims": set()})
+            entry["Errors"].update(errors)
+            entry["Trims"].update(trims)
+            if errors:
+                entry["Dropped"] += 1
+            elif trims:
+                entry["Trimmed"] += 1
+        if not errors:
+            validFindings.append(finding)
+            serialized.append(document)
+
+    return validFindings, serialized, report
+
+def print_validation_report(report: dict):
+    """Print the per-check ASFF validation report"""
+    for checkId, entry in report.items():
+        print(
+            f"ASFF validation for {checkId}: {entry['Dropped']} dropped, {entry['Trimmed']} trimmed. "
+            f"Errors: {sorted(entry['Errors'])}. Trims: {sorted(entry['Trims'])}"
+        )
@@ -0,0 +1,116 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+from detect_secrets.__version__ import VERSION
+from detect_secrets.settings import default_settings, get_filters, get_plugins, get_settings
+from detect_secrets.util.code_snippet import get_code_snippet
+from detect_secrets.util.inject import call_function_with_arguments
+
+# The documents are scanned as if they were JSON files, the same as `detect-secrets scan` on a file of them
+SCAN_FILENAME = "electriceye-scan.json"
+# Below this many documents starting worker processes costs more than it saves
+MIN_PARALLEL_DOCUMENTS = 50
+CHUNK_SIZE = 25
+
+def is_filtered_out(**kwargs):
+    """Runs every detect-secrets filter which can be called with the given arguments"""
+    for filterFunction in get_filters():
+        if set(filterFunction.injectable_variables) <= set(kwargs):
+            if call_function_with_arguments(filterFunction, **kwargs):
+                return True
+    return False
+
+def scan_document(document: str):
+    """Returns the secret types found in a document, in the order they appear"""
+    lines = document.splitlines()
+    secretTypes = []
+    for lineNumber, line in enumerate(lines, start=1):
+        context = get_code_snippet(lines=lines, line_number=lineNumber)
+        if is_filtered_out(filename=SCAN_FILENAME, line=line, context=context):
+            continue
+        for plugin in get_plugins():
+            for secret in plugin.analyze_line(filename=SCAN_FILENAME, line=line, line_number=lineNumber, context=context):
+                if is_filtered_out(
+                    filename=SCAN_FILENAME, secret=secret.secret_value, plugin=plugin, line=line, context=context
+                ):
+                    continue
+                if secret.type not in secretTypes:
+                    secretTypes.append(secret.type)
+    return secretTypes
+
+def scan_documents(documents: list):
+    with default_settings():
+        # documents are never written to disk, so the filter for files which do not exist has to be disabled
+        get_settings().disable_filters("detect_secrets.filters.common.is_invalid_file")
+        get_filters.cache_clear()
+        return [scan_document(document) for document in documents]
+
+def content_hash(document: str):
+    # results depend on the detectors as much as the content
+    return hashlib.sha256(f"{VERSION}\0{document}".encode("utf-8")).hexdigest()
+
+class SecretScanner(object):
+    """Scans documents with the detect-secrets plugins in-process, on a process pool for large batches, and
+    caches the results by content hash so unchanged environment variables and user data are never rescanned"""
+
+    def __init__(self, cacheFile: str = None, maxWorkers: int = None):
+        self.cacheFile = cacheFile
+        self.maxWorkers = maxWorkers
+        self.cache = {}
+        if cacheFile and os.path.exists(cacheFile):
+            try:
+                with open(cacheFile) as jsonfile:
+                    self.cache = json.load(jsonfile)
+            except ValueError as e:
+                print(f"Ignoring unreadable secrets scan cache {cacheFile}: {e}")
+
+    def scan(self, documents: dict):
+        """Takes a dict of key to document and returns a dict of key to the secret types found in it"""
+        hashes = {key: content_hash(document) for key, document in documents.items()}
+        pending = {}
+        for key, document in documents.items():
+            if hashes[key] not in self.cache:
+                pending[hashes[key]] = document
+
+        if pending:
+            pendingHashes = list(pending)
+            pendingDocuments = [pending[contentHash] for contentHash in pendingHashes]
+            if len(pendingDocuments) < MIN_PARALLEL_DOCUMENTS:
+                results = scan_documents(pendingDocuments)
+            else:
+                chunks = [pendingDocuments[i:i + CHUNK_SIZE] for i in range(0, len(pendingDocuments), CHUNK_SIZE)]
+                with ProcessPoolExecutor(max_workers=self.maxWorkers) as executor:
+                    results = [result for chunk in executor.map(scan_documents, chunks) for result in chunk]
+            self.cache.update(zip(pendingHashes, results))
+            self.save()
+
+        return {key: self.cache[hashes[key]] for key in documents}
+
+    def save(self):
+        if not self.cacheFile:
+            return
+        # write then rename so an interrupted run never leaves a truncated cache
+        tempFile = f"{self.cacheFile}.tmp"
+        with open(tempFile, "w") as jsonfile:
+            json.dump(self.cache, jsonfile)
+        os.replace(tempFile, self.cacheFile)
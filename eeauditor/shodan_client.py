@@ -0,0 +1,155 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import socket
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SHODAN_HOST_URL = "https://api.shodan.io/shodan/host/"
+# The Shodan API allows 1 request per second on every plan, requests overlap up to MAX_CONCURRENCY to hide latency
+DEFAULT_REQUESTS_PER_SECOND = 1
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_CACHE_TTL = 86400
+# (connect, read) timeouts in seconds
+TIMEOUT = (5, 30)
+# Host lookups which are not errors, or which are the expected answer for an IP Shodan has not indexed
+CACHEABLE_STATUS_CODES = [200, 404]
+
+class ShodanClient(object):
+    """Shodan host lookups over a pooled session, rate limited to the API plan, deduplicated by IP and cached
+    with a TTL in memory and optionally in a file so repeated scans only look up IPs whose answer is stale"""
+
+    def __init__(
+        self,
+        apiKey: str,
+        cacheFile: str = None,
+        cacheTtl: int = DEFAULT_CACHE_TTL,
+        requestsPerSecond: float = DEFAULT_REQUESTS_PER_SECOND,
+        maxConcurrency: int = DEFAULT_MAX_CONCURRENCY
+    ):
+        self.apiKey = apiKey
+        self.cacheFile = cacheFile
+        self.cacheTtl = cacheTtl
+        self.interval = 1.0 / requestsPerSecond
+        self.maxConcurrency = maxConcurrency
+        self.cache = {}
+        self.addresses = {}
+        self.lock = threading.Lock()
+        self.nextRequestAt = 0.0
+        self.session = requests.Session()
+        # 429s are retried after the Retry-After Shodan sends, 5XXs with an exponential backoff
+        retries = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False,
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=maxConcurrency, max_retries=retries)
+        self.session.mount("https://", adapter)
+        if cacheFile and os.path.exists(cacheFile):
+            try:
+                with open(cacheFile) as jsonfile:
+                    self.cache = json.load(jsonfile)
+            except ValueError as e:
+                print(f"Ignoring unreadable Shodan cache {cacheFile}: {e}")
+
+    @classmethod
+    def from_environment(cls, apiKey: str):
+        return cls(
+            apiKey,
+            cacheFile=os.environ.get("SHODAN_CACHE_FILE"),
+            cacheTtl=int(os.environ.get("SHODAN_CACHE_TTL", DEFAULT_CACHE_TTL)),
+            requestsPerSecond=float(os.environ.get("SHODAN_REQUESTS_PER_SECOND", DEFAULT_REQUESTS_PER_SECOND)),
+            maxConcurrency=int(os.environ.get("SHODAN_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        )
+
+    def resolve(self, host: str):
+        """DNS lookup which is only made once per host in a run"""
+        with self.lock:
+            if host in self.addresses:
+                return self.addresses[host]
+        address = socket.gethostbyname(host)
+        with self.lock:
+            self.addresses[host] = address
+        return address
+
+    def cached(self, ip: str):
+        entry = self.cache.get(ip)
+        if entry and time.time() - entry["LookedUpAt"] < self.cacheTtl:
+            return entry["Result"]
+        return None
+
+    def wait_for_rate_limit(self):
+        with self.lock:
+            now = time.monotonic()
+            waitFor = self.nextRequestAt - now
+            self.nextRequestAt = max(now, self.nextRequestAt) + self.interval
+        if waitFor > 0:
+            time.sleep(waitFor)
+
+    def fetch(self, ip: str):
+        self.wait_for_rate_limit()
+        try:
+            r = self.session.get(url=SHODAN_HOST_URL + ip, params={"key": self.apiKey}, timeout=TIMEOUT)
+            data = r.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Shodan lookup of {ip} failed with exception {e}")
+            return {"error": str(e)}
+        if r.status_code in CACHEABLE_STATUS_CODES:
+            with self.lock:
+                self.cache[ip] = {"LookedUpAt": time.time(), "Result": data}
+        return data
+
+    def lookup_many(self, ips: list):
+        """Returns a dict of IP to the Shodan host information, only IPs without a fresh answer are requested"""
+        ips = list(dict.fromkeys(ips))
+        results = {}
+        stale = []
+        for ip in ips:
+            result = self.cached(ip)
+            if result is None:
+                stale.append(ip)
+            else:
+                results[ip] = result
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.maxConcurrency) as executor:
+                results.update(zip(stale, executor.map(self.fetch, stale)))
+            self.save()
+        return results
+
+    def lookup(self, ip: str):
+        return self.lookup_many([ip])[ip]
+
+    def save(self):
+        if not self.cacheFile:
+            return
+        # write then rename so an interrupted run never leaves a truncated cache
+        tempFile = f"{self.cacheFile}.tmp"
+        with self.lock:
+            with open(tempFile, "w") as jsonfile:
+                json.dump(self.cache, jsonfile, default=str)
+        os.replace(tempFile, self.cacheFile)
@@ -0,0 +1,91 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import boto3
+
+tagging = boto3.client("resourcegroupstaggingapi")
+
+# ASFF allows at most 50 tags per Resource
+MAX_RESOURCE_TAGS = 50
+
+def parse_tag_scope(tagScope: list):
+    """Parses `Key=Value` scope filters into {Key: [Values]}. Values of the same Key are OR'd and different
+    Keys are AND'd, the same as the TagFilters of tag:GetResources. A `Key` without a value matches any value"""
+    scope = {}
+    for tagFilter in tagScope or []:
+        key, _, value = tagFilter.partition("=")
+        values = scope.setdefault(key, [])
+        if value:
+            values.append(value)
+    return scope
+
+class TagIndex(object):
+    """ARN to tags index built from the Resource Groups Tagging API, so every resource's tags are fetched
+    in a handful of paginated tag:GetResources calls instead of one call per resource and service"""
+
+    def __init__(self, scope: dict = None, enrichTags: bool = True):
+        self.scope = scope or {}
+        # a tag scope alone only filters findings, tags are only attached with --enrich-tags
+        self.enrichTags = enrichTags
+        self.tags = {}
+
+    def load(self):
+        paginator = tagging.get_paginator("get_resources")
+        for page in paginator.paginate(ResourcesPerPage=100):
+            for resource in page["ResourceTagMappingList"]:
+                self.tags[resource["ResourceARN"]] = {
+                    tag["Key"]: tag["Value"] for tag in resource.get("Tags", [])
+                }
+        print(f"Indexed tags for {len(self.tags)} resources")
+        return self
+
+    def resource_in_scope(self, arn: str):
+        """The Tagging API leaves out resources which were never tagged, so an ARN missing from the index has none
+        of the scoped tags and is out of scope. Resource Ids which are not ARNs cannot be judged and stay in scope"""
+        if not self.scope:
+            return True
+        if arn not in self.tags:
+            return not arn.startswith("arn:")
+        tags = self.tags[arn]
+        for key, values in self.scope.items():
+            if key not in tags:
+                return False
+            if values and tags[key] not in values:
+                return False
+        return True
+
+    def in_scope(self, finding: dict):
+        """A finding is out of scope when every one of its Resources is out of scope"""
+        resources = finding.get("Resources", [])
+        if not self.scope or not resources:
+            return True
+        return any(self.resource_in_scope(resource.get("Id", "")) for resource in resources)
+
+    def enrich(self, finding: dict):
+        """Attaches indexed tags to Resources[].Tags, keeping any tags the Check already set"""
+        for resource in finding.get("Resources", []):
+            tags = self.tags.get(resource.get("Id", ""))
+            if not tags:
+                continue
+            # aws: prefixed tags are reserved by AWS and rejected by Security Hub
+            merged = {key: value for key, value in tags.items() if not key.startswith("aws:")}
+            merged.update(resource.get("Tags", {}))
+            if merged:
+                resource["Tags"] = dict(list(merged.items())[:MAX_RESOURCE_TAGS])
+        return finding
@@ -30,7 +30,15 @@ from auditors.aws.AWS_IAM_Auditor import (
     iam_user_policy_least_priv_check,
     iam_group_policy_least_priv_check,
     iam_role_policy_least_priv_check,
-    iam
+    user_inline_policy_check,
+    user_direct_attached_policy_check,
+    iam_access_key_age_check,
+    user_mfa_check,
+    user_password_age_check,
+    user_unused_credentials_check,
+    iam,
+    iamInventory,
+    credentialReport
 )
 
 list_policies = {
@@ -177,18 +185,6 @@ get_policy_action_list_resource = {
     }
 }
 
-list_user_policies = {'PolicyNames': [
-    'example-inline']
-}
-
-list_group_policies = {'PolicyNames': [
-    'example-inline']
-}
-
-list_role_policies = {'PolicyNames': [
-    'example-inline']
-}
-
 get_user_policy_star_star = {
     'UserName': 'example-user1',
     'PolicyName': 'example-inline',
@@ -281,16 +277,69 @@ get_role_policy_list_list_resource = {
 
 
 
+def managed_policy_details(get_policy_version):
+    policy = dict(list_policies["Policies"][0])
+    policy["PolicyVersionList"] = [
+        {
+            "Document": get_policy_version["PolicyVersion"]["Document"],
+            "VersionId": policy["DefaultVersionId"],
+            "IsDefaultVersion": True,
+        }
+    ]
+    return {"Policies": [policy]}
+
+
+def inline_policy_details(principal, detailList, policyList, get_inline_policy):
+    # PasswordLastUsed is only returned by list_users
+    details = {key: value for key, value in principal.items() if key != "PasswordLastUsed"}
+    details[policyList] = [
+        {"PolicyName": get_inline_policy["PolicyName"], "PolicyDocument": get_inline_policy["PolicyDocument"]}
+    ]
+    return {detailList: [details]}
+
+
+def credential_report(*rows):
+    header = (
+        "user,arn,user_creation_time,password_enabled,password_last_used,password_last_changed,"
+        "password_next_rotation,mfa_active,access_key_1_active,access_key_1_last_rotated,"
+        "access_key_1_last_used_date,access_key_1_last_used_region,access_key_1_last_used_service,"
+        "access_key_2_active,access_key_2_last_rotated,access_key_2_last_used_date,"
+        "access_key_2_last_used_region,access_key_2_last_used_service,cert_1_active,cert_1_last_rotated,"
+        "cert_2_active,cert_2_last_rotated"
+    )
+    return {
+        "Content": "\n".join((header,) + rows).encode(),
+        "ReportFormat": "text/csv",
+        "GeneratedTime": datetime.datetime(2021, 5, 10),
+    }
+
+
+def days_ago(days):
+    return (datetime.datetime.utcnow() - datetime.timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+# root has no IAM user Checks, new-user rotates and uses everything, old-user has stale credentials and no MFA
+get_credential_report = credential_report(
+    f"<root_account>,arn:aws:iam::805574742241:root,{days_ago(900)},not_supported,{days_ago(1)},not_supported,"
+    "not_supported,true,false,N/A,N/A,N/A,N/A,false,N/A,N/A,N/A,N/A,false,N/A,false,N/A",
+    f"new-user,arn:aws:iam::805574742241:user/new-user,{days_ago(10)},true,{days_ago(1)},{days_ago(10)},N/A,"
+    f"true,true,{days_ago(10)},{days_ago(1)},us-east-1,s3,false,N/A,N/A,N/A,N/A,false,N/A,false,N/A",
+    f"old-user,arn:aws:iam::805574742241:user/old-user,{days_ago(400)},true,no_information,{days_ago(400)},N/A,"
+    f"false,true,{days_ago(400)},{days_ago(1)},us-east-1,s3,true,{days_ago(200)},N/A,N/A,N/A,false,N/A,false,N/A",
+)
+
+
 @pytest.fixture(scope="function")
 def iam_stubber():
+    iamInventory.clear()
+    credentialReport.clear()
     iam_stubber = Stubber(iam)
     iam_stubber.activate()
     yield iam_stubber
     iam_stubber.deactivate()
 
 def test_iam_mngd_policy_cond_check(iam_stubber):
-    iam_stubber.add_response("list_policies", list_policies)
-    iam_stubber.add_response("get_policy_version", get_policy_condition)
+    iam_stubber.add_response("get_account_authorization_details", managed_policy_details(get_policy_condition))
     results = iam_mngd_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
     )
@@ -300,8 +349,7 @@ def test_iam_mngd_policy_cond_check(iam_stubber):
 
 
 def test_iam_mngd_policy_star_star_check(iam_stubber):
-    iam_stubber.add_response("list_policies", list_policies)
-    iam_stubber.add_response("get_policy_version", get_policy_star_star)
+    iam_stubber.add_response("get_account_authorization_details", managed_policy_details(get_policy_star_star))
     results = iam_mngd_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
     )
@@ -312,8 +360,7 @@ def test_iam_mngd_policy_star_star_check(iam_stubber):
 
 
 def test_iam_mngd_policy_action_star_star_check(iam_stubber):
-    iam_stubber.add_response("list_policies", list_policies)
-    iam_stubber.add_response("get_policy_version", get_policy_action_star_star)
+    iam_stubber.add_response("get_account_authorization_details", managed_policy_details(get_policy_action_star_star))
     results = iam_mngd_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
     )
@@ -324,8 +371,7 @@ def test_iam_mngd_policy_action_star_star_check(iam_stubber):
 
 
 def test_iam_mngd_policy_action_star_resource_check(iam_stubber):
-    iam_stubber.add_response("list_policies", list_policies)
-    iam_stubber.add_response("get_policy_version", get_policy_action_star_resource)
+    iam_stubber.add_response("get_account_authorization_details", managed_policy_details(get_policy_action_star_resource))
     results = iam_mngd_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
     )
@@ -336,8 +382,7 @@ def test_iam_mngd_policy_action_star_resource_check(iam_stubber):
 
 
 def test_iam_mngd_policy_action_resource_check(iam_stubber):
-    iam_stubber.add_response("list_policies", list_policies)
-    iam_stubber.add_response("get_policy_version", get_policy_action_resource)
+    iam_stubber.add_response("get_account_authorization_details", managed_policy_details(get_policy_action_resource))
     results = iam_mngd_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
     )
@@ -348,8 +393,7 @@ def test_iam_mngd_policy_action_resource_check(iam_stubber):
 
 
 def test_iam_mngd_policy_two_statements_check(iam_stubber):
-    iam_stubber.add_response("list_policies", list_policies)
-    iam_stubber.add_response("get_policy_version", get_policy_two_statements)
+    iam_stubber.add_response("get_account_authorization_details", managed_policy_details(get_policy_two_statements))
     results = iam_mngd_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
     )
@@ -360,8 +404,7 @@ def test_iam_mngd_policy_two_statements_check(iam_stubber):
 
 
 def test_iam_mngd_policy_action_star_list_check(iam_stubber):
-    iam_stubber.add_response("list_policies", list_policies)
-    iam_stubber.add_response("get_policy_version", get_policy_action_list_resource)
+    iam_stubber.add_response("get_account_authorization_details", managed_policy_details(get_policy_action_list_resource))
     results = iam_mngd_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
     )
@@ -372,9 +415,10 @@ def test_iam_mngd_policy_action_star_list_check(iam_stubber):
 
 
 def test_iam_user_policy_star_star_check(iam_stubber):
-    iam_stubber.add_response("list_users", list_users)
-    iam_stubber.add_response("list_user_policies", list_user_policies)
-    iam_stubber.add_response("get_user_policy", get_user_policy_star_star)
+    iam_stubber.add_response(
+        "get_account_authorization_details",
+        inline_policy_details(list_users["Users"][0], "UserDetailList", "UserPolicyList", get_user_policy_star_star)
+    )
 
     results = iam_user_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
@@ -386,9 +430,10 @@ def test_iam_user_policy_star_star_check(iam_stubber):
 
 
 def test_iam_user_policy_condition_check(iam_stubber):
-    iam_stubber.add_response("list_users", list_users)
-    iam_stubber.add_response("list_user_policies", list_user_policies)
-    iam_stubber.add_response("get_user_policy", get_user_policy_condition)
+    iam_stubber.add_response(
+        "get_account_authorization_details",
+        inline_policy_details(list_users["Users"][0], "UserDetailList", "UserPolicyList", get_user_policy_condition)
+    )
 
     results = iam_user_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
@@ -400,9 +445,10 @@ def test_iam_user_policy_condition_check(iam_stubber):
 
 
 def test_group_policy_action_star_list_check(iam_stubber):
-    iam_stubber.add_response("list_groups", list_groups)
-    iam_stubber.add_response("list_group_policies", list_group_policies)
-    iam_stubber.add_response("get_group_policy", get_group_policy_action_list_resource)
+    iam_stubber.add_response(
+        "get_account_authorization_details",
+        inline_policy_details(list_groups["Groups"][0], "GroupDetailList", "GroupPolicyList", get_group_policy_action_list_resource)
+    )
 
     results = iam_group_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
@@ -414,9 +460,10 @@ def test_group_policy_action_star_list_check(iam_stubber):
 
 
 def test_group_policy_action_star_star_check(iam_stubber):
-    iam_stubber.add_response("list_groups", list_groups)
-    iam_stubber.add_response("list_group_policies", list_group_policies)
-    iam_stubber.add_response("get_group_policy", get_group_policy_action_star_star)
+    iam_stubber.add_response(
+        "get_account_authorization_details",
+        inline_policy_details(list_groups["Groups"][0], "GroupDetailList", "GroupPolicyList", get_group_policy_action_star_star)
+    )
 
     results = iam_group_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
@@ -428,9 +475,10 @@ def test_group_policy_action_star_star_check(iam_stubber):
 
 
 def test_role_policy_two_statements_check(iam_stubber):
-    iam_stubber.add_response("list_roles", list_roles)
-    iam_stubber.add_response("list_role_policies", list_role_policies)
-    iam_stubber.add_response("get_role_policy", get_role_policy_two_statements)
+    iam_stubber.add_response(
+        "get_account_authorization_details",
+        inline_policy_details(list_roles["Roles"][0], "RoleDetailList", "RolePolicyList", get_role_policy_two_statements)
+    )
 
     results = iam_role_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
@@ -442,9 +490,10 @@ def test_role_policy_two_statements_check(iam_stubber):
 
 
 def test_role_policy_list_list_resource_check(iam_stubber):
-    iam_stubber.add_response("list_roles", list_roles)
-    iam_stubber.add_response("list_role_policies", list_role_policies)
-    iam_stubber.add_response("get_role_policy", get_role_policy_list_list_resource)
+    iam_stubber.add_response(
+        "get_account_authorization_details",
+        inline_policy_details(list_roles["Roles"][0], "RoleDetailList", "RolePolicyList", get_role_policy_list_list_resource)
+    )
 
     results = iam_role_policy_least_priv_check(
         cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
@@ -453,3 +502,113 @@ def test_role_policy_list_list_resource_check(iam_stubber):
         assert result["RecordState"] == "ACTIVE"
         assert result["Severity"]["Label"] == "LOW"
     iam_stubber.assert_no_pending_responses()
+
+
+def test_iam_inventory_shared_across_checks(iam_stubber):
+    details = inline_policy_details(
+        list_users["Users"][0], "UserDetailList", "UserPolicyList", get_user_policy_star_star
+    )
+    details["UserDetailList"][0]["AttachedManagedPolicies"] = [
+        {"PolicyName": "Policy1234", "PolicyArn": list_policies["Policies"][0]["Arn"]}
+    ]
+    details["IsTruncated"] = True
+    details["Marker"] = "page2"
+    iam_stubber.add_response("get_account_authorization_details", details)
+    iam_stubber.add_response(
+        "get_account_authorization_details",
+        managed_policy_details(get_policy_star_star),
+        {"Filter": ANY, "Marker": "page2"}
+    )
+
+    checks = [user_inline_policy_check, user_direct_attached_policy_check, iam_mngd_policy_least_priv_check]
+    results = [
+        result
+        for check in checks
+        for result in check(cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws")
+    ]
+    assert len(results) == 3
+    for result in results:
+        assert result["RecordState"] == "ACTIVE"
+    iam_stubber.assert_no_pending_responses()
+
+
+@pytest.mark.parametrize(
+    "check,expected",
+    [
+        (
+            user_mfa_check,
+            {
+                "arn:aws:iam::805574742241:user/new-user/iam-user-mfa-check": "PASSED",
+                "arn:aws:iam::805574742241:user/old-user/iam-user-mfa-check": "FAILED",
+            },
+        ),
+        (
+            user_password_age_check,
+            {
+                "arn:aws:iam::805574742241:user/new-user/iam-user-password-age-check": "PASSED",
+                "arn:aws:iam::805574742241:user/old-user/iam-user-password-age-check": "FAILED",
+            },
+        ),
+        (
+            user_unused_credentials_check,
+            {
+                "arn:aws:iam::805574742241:user/new-user/iam-user-unused-credentials-check": "PASSED",
+                "arn:aws:iam::805574742241:user/old-user/iam-user-unused-credentials-check": "FAILED",
+            },
+        ),
+    ],
+)
+def test_credential_report_checks(iam_stubber, monkeypatch, check, expected):
+    iam_stubber.add_response("generate_credential_report", {"State": "STARTED"})
+    iam_stubber.add_response("generate_credential_report", {"State": "COMPLETE"})
+    iam_stubber.add_response("get_credential_report", get_credential_report)
+    monkeypatch.setattr(credentialReport, "pollInterval", 0)
+    credentialReport.start("012345678901")
+
+    results = list(check(cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"))
+    assert {result["Id"]: result["Compliance"]["Status"] for result in results} == expected
+    iam_stubber.assert_no_pending_responses()
+
+
+def list_access_keys(userName, *keys):
+    return {
+        "AccessKeyMetadata": [
+            {
+                "UserName": userName,
+                "AccessKeyId": keyId,
+                "Status": status,
+                "CreateDate": datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days),
+            }
+            for keyId, status, days in keys
+        ]
+    }
+
+
+def test_access_key_age_check_lists_keys_of_users_with_active_keys(iam_stubber, monkeypatch):
+    iam_stubber.add_response("generate_credential_report", {"State": "STARTED"})
+    iam_stubber.add_response("generate_credential_report", {"State": "COMPLETE"})
+    iam_stubber.add_response("get_credential_report", get_credential_report)
+    # root has no access keys in the report, so only the 2 users are listed
+    iam_stubber.add_response(
+        "list_access_keys",
+        list_access_keys("new-user", ("AKIANEW1EXAMPLE01", "Active", 10), ("AKIANEW2EXAMPLE02", "Inactive", 400)),
+        {"UserName": "new-user"},
+    )
+    iam_stubber.add_response(
+        "list_access_keys",
+        list_access_keys("old-user", ("AKIAOLD1EXAMPLE01", "Active", 400), ("AKIAOLD2EXAMPLE02", "Active", 200)),
+        {"UserName": "old-user"},
+    )
+    monkeypatch.setattr(credentialReport, "pollInterval", 0)
+    credentialReport.start("012345678901")
+
+    results = list(
+        iam_access_key_age_check(cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws")
+    )
+    assert {result["Id"]: result["Compliance"]["Status"] for result in results} == {
+        "new-userAKIANEW1EXAMPLE01/iam-access-key-age-check": "PASSED",
+        "old-userAKIAOLD1EXAMPLE01/iam-access-key-age-check": "FAILED",
+        "old-userAKIAOLD2EXAMPLE02/iam-access-key-age-check": "FAILED",
+    }
+    assert results[0]["Resources"][0]["Details"]["AwsIamAccessKey"]["PrincipalId"] == "AKIANEW1EXAMPLE01"
+    iam_stubber.assert_no_pending_responses()
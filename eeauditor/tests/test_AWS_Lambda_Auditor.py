@@ -29,6 +29,7 @@ from auditors.aws.AWS_Lambda_Auditor import (
     unused_function_check,
     lambda_client,
     cloudwatch,
+    metricBatcher,
 )
 
 print(sys.path)
@@ -84,6 +85,7 @@ def lambda_stubber():
 
 @pytest.fixture(scope="function")
 def cloudwatch_stubber():
+    metricBatcher.clear()
     cloudwatch_stubber = Stubber(cloudwatch)
     cloudwatch_stubber.activate()
     yield cloudwatch_stubber
@@ -29,7 +29,8 @@ from . import context
 from auditors.aws.Amazon_EC2_Auditor import (
     ec2_ami_age_check,
     ec2_ami_status_check,
-    ec2
+    ec2,
+    imageResolver,
 )
 
 describe_instances_response = {
@@ -70,7 +71,7 @@ describe_images_response_new = {
     'Images': [
         {
             'CreationDate': '2020-12-30T10:14:02.000Z',
-            'ImageId': 'instanceid1234',
+            'ImageId': 'image1234',
             'ImageLocation': 'string',
             'ImageType': 'machine',
             'Public': True,
@@ -85,7 +86,7 @@ describe_images_response_old = {
     'Images': [
         {
             'CreationDate': '2018-12-30T10:14:02.000Z',
-            'ImageId': 'instanceid1234',
+            'ImageId': 'image1234',
             'ImageLocation': 'string',
             'ImageType': 'machine',
             'Public': True,
@@ -100,7 +101,7 @@ describe_images_response_avail = {
     'Images': [
         {
             'CreationDate': '2018-12-30T10:14:02.000Z',
-            'ImageId': 'instanceid1234',
+            'ImageId': 'image1234',
             'ImageLocation': 'string',
             'ImageType': 'machine',
             'Public': True,
@@ -115,7 +116,7 @@ describe_images_response_failed = {
     'Images': [
         {
             'CreationDate': '2018-12-30T10:14:02.000Z',
-            'ImageId': 'instanceid1234',
+            'ImageId': 'image1234',
             'ImageLocation': 'string',
             'ImageType': 'machine',
             'Public': True,
@@ -130,7 +131,7 @@ describe_images_response_pending = {
     'Images': [
         {
             'CreationDate': '2018-12-30T10:14:02.000Z',
-            'ImageId': 'instanceid1234',
+            'ImageId': 'image1234',
             'ImageLocation': 'string',
             'ImageType': 'machine',
             'Public': True,
@@ -148,6 +149,7 @@ describe_images_response_dereg = {
 
 @pytest.fixture(scope="function")
 def ec2_stubber():
+    imageResolver.clear()
     ec2_stubber = Stubber(ec2)
     ec2_stubber.activate()
     yield ec2_stubber
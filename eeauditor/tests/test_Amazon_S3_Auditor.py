@@ -0,0 +1,137 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import threading
+
+from botocore.exceptions import ClientError
+
+from . import context
+from bucket_config import BucketConfigCollector, bucket_region
+from auditors.aws.Amazon_S3_Auditor import (
+    bucket_encryption_check,
+    bucket_lifecycle_check,
+    bucket_versioning_check,
+    bucketConfigCollector,
+)
+
+
+class FakeMeta(object):
+    def __init__(self, region_name):
+        self.region_name = region_name
+
+
+class FakeS3(object):
+    """Answers like S3 for buckets in its own Region and records every call"""
+
+    def __init__(self, region, buckets, calls):
+        self.meta = FakeMeta(region)
+        self.buckets = buckets
+        self.calls = calls
+        self.lock = threading.Lock()
+
+    def record(self, operation, bucket):
+        with self.lock:
+            self.calls.append((self.meta.region_name, operation, bucket))
+
+    def get_bucket_location(self, Bucket):
+        self.record("get_bucket_location", Bucket)
+        region = self.buckets[Bucket]["Region"]
+        return {"LocationConstraint": None if region == "us-east-1" else region, "ResponseMetadata": {}}
+
+    def __getattr__(self, operation):
+        def read(Bucket):
+            self.record(operation, Bucket)
+            assert self.buckets[Bucket]["Region"] == self.meta.region_name
+            response = self.buckets[Bucket].get(operation)
+            if isinstance(response, ClientError):
+                raise response
+            return dict(response or {}, ResponseMetadata={})
+        return read
+
+
+def not_found(code, message, operation):
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation)
+
+
+BUCKETS = {
+    "east-bucket": {
+        "Region": "us-east-1",
+        "get_bucket_encryption": {
+            "ServerSideEncryptionConfiguration": {"Rules": [{"ApplyServerSideEncryptionByDefault": {"SSEAlgorithm": "aws:kms"}}]}
+        },
+        "get_bucket_lifecycle_configuration": {"Rules": []},
+        "get_bucket_versioning": {"Status": "Enabled"},
+    },
+    "west-bucket": {
+        "Region": "eu-west-1",
+        "get_bucket_encryption": not_found(
+            "ServerSideEncryptionConfigurationNotFoundError",
+            "The server side encryption configuration was not found",
+            "GetBucketEncryption",
+        ),
+        "get_bucket_lifecycle_configuration": not_found(
+            "NoSuchLifecycleConfiguration", "The lifecycle configuration does not exist", "GetBucketLifecycleConfiguration"
+        ),
+        "get_bucket_versioning": {},
+    },
+}
+
+
+def test_bucket_region():
+    assert bucket_region(None) == "us-east-1"
+    assert bucket_region("EU") == "eu-west-1"
+    assert bucket_region("ap-south-1") == "ap-south-1"
+
+
+def test_bucket_config_collector_reads_each_bucket_once_in_its_region():
+    calls = []
+    collector = BucketConfigCollector(FakeS3("us-east-1", BUCKETS, calls), operations=["get_bucket_versioning"])
+    collector.clients["eu-west-1"] = FakeS3("eu-west-1", BUCKETS, calls)
+    records = collector.collect(["east-bucket", "west-bucket"])
+    assert records["west-bucket"].region == "eu-west-1"
+    assert records["east-bucket"].get("get_bucket_versioning") == {"Status": "Enabled"}
+    collector.collect(["west-bucket"])
+    assert sorted(calls) == [
+        ("eu-west-1", "get_bucket_versioning", "west-bucket"),
+        ("us-east-1", "get_bucket_location", "east-bucket"),
+        ("us-east-1", "get_bucket_location", "west-bucket"),
+        ("us-east-1", "get_bucket_versioning", "east-bucket"),
+    ]
+
+
+def test_s3_checks_evaluate_collected_configs(monkeypatch):
+    calls = []
+    eastClient = FakeS3("us-east-1", BUCKETS, calls)
+    monkeypatch.setattr(bucketConfigCollector, "client", eastClient)
+    monkeypatch.setattr(
+        bucketConfigCollector, "clients", {"us-east-1": eastClient, "eu-west-1": FakeS3("eu-west-1", BUCKETS, calls)}
+    )
+    bucketConfigCollector.clear()
+    expected = {
+        bucket_encryption_check: ["ARCHIVED", "ACTIVE"],
+        bucket_lifecycle_check: ["ARCHIVED", "ACTIVE"],
+        bucket_versioning_check: ["ARCHIVED", "ACTIVE"],
+    }
+    for check, recordStates in expected.items():
+        cache = {"list_buckets": {"Buckets": [{"Name": "east-bucket"}, {"Name": "west-bucket"}]}}
+        results = list(check(cache=cache, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"))
+        assert [result["RecordState"] for result in results] == recordStates
+    # 2 locations and 6 reads for each bucket, no matter how many Checks evaluate them
+    assert len(calls) == 14
+    bucketConfigCollector.clear()
@@ -30,7 +30,8 @@ from auditors.aws.Amazon_SQS_Auditor import (
     sqs,
     cloudwatch,
     sqs_queue_encryption_check,
-    sqs_queue_public_accessibility_check
+    sqs_queue_public_accessibility_check,
+    metricBatcher,
 )
 
 print(sys.path)
@@ -164,6 +165,7 @@ def sqs_stubber():
 
 @pytest.fixture(scope="function")
 def cloudwatch_stubber():
+    metricBatcher.clear()
     cloudwatch_stubber = Stubber(cloudwatch)
     cloudwatch_stubber.activate()
     yield cloudwatch_stubber
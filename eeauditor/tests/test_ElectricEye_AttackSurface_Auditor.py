@@ -0,0 +1,93 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import pytest
+
+from botocore.stub import Stubber
+
+from . import context
+from auditors.aws import ElectricEye_AttackSurface_Auditor
+from auditors.aws.ElectricEye_AttackSurface_Auditor import ec2, eip_attack_surface_open_tcp_port_check
+from port_scanner import PortScanner
+
+
+class FakeNmap(object):
+    def __init__(self):
+        self.scans = []
+
+    def nmap_tcp_scan(self, target, args=None):
+        self.scans.append(target.split(" "))
+        ports = [{"portid": "22", "state": "open", "reason": "syn-ack", "service": {"name": "ssh"}}]
+        return {ip: {"ports": ports} for ip in target.split(" ")}
+
+
+@pytest.fixture(scope="function")
+def ec2_stubber():
+    ec2_stubber = Stubber(ec2)
+    ec2_stubber.activate()
+    yield ec2_stubber
+    ec2_stubber.deactivate()
+
+
+def test_port_scanner_dedupes_ips_and_caches(tmp_path, monkeypatch):
+    cacheFile = str(tmp_path / "attack-surface-cache.json")
+    scanner = PortScanner(ports="22", cacheFile=cacheFile)
+    scanner.nmap = FakeNmap()
+    resolved = {"a.example.com": "203.0.113.10", "b.example.com": "203.0.113.10", "203.0.113.11": "203.0.113.11"}
+    monkeypatch.setattr(PortScanner, "resolve", lambda self, host: resolved.get(host))
+
+    results = scanner.scan(["a.example.com", "b.example.com", "203.0.113.11", "unresolvable.example.com"], "Test")
+    assert scanner.nmap.scans == [["203.0.113.10", "203.0.113.11"]]
+    assert list(results["a.example.com"]) == ["203.0.113.10"]
+    assert results["b.example.com"]["203.0.113.10"]["ports"][0]["portid"] == "22"
+    assert results["unresolvable.example.com"] is None
+
+    # fresh results are reused across Checks and runs
+    nextRun = PortScanner(ports="22", cacheFile=cacheFile)
+    nextRun.nmap = FakeNmap()
+    nextRun.scan(["203.0.113.11"], "Test")
+    assert nextRun.nmap.scans == []
+    # results for other ports are stale
+    otherPorts = PortScanner(ports="22,80", cacheFile=cacheFile)
+    otherPorts.nmap = FakeNmap()
+    otherPorts.scan(["203.0.113.11"], "Test")
+    assert otherPorts.nmap.scans == [["203.0.113.11"]]
+
+
+def test_eip_attack_surface_open_tcp_port_check(ec2_stubber, monkeypatch):
+    scanner = PortScanner(ports="22")
+    scanner.nmap = FakeNmap()
+    monkeypatch.setattr(ElectricEye_AttackSurface_Auditor, "portScanner", scanner)
+    ec2_stubber.add_response(
+        "describe_addresses",
+        {
+            "Addresses": [
+                {"PublicIp": "203.0.113.10", "AllocationId": "eipalloc-1", "PrivateIpAddress": "10.0.0.1"},
+                {"PublicIp": "203.0.113.10", "AllocationId": "eipalloc-2", "PrivateIpAddress": "10.0.0.2"},
+            ]
+        },
+    )
+    results = list(
+        eip_attack_surface_open_tcp_port_check(
+            cache={}, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws"
+        )
+    )
+    assert scanner.nmap.scans == [["203.0.113.10"]]
+    assert {result["Compliance"]["Status"] for result in results} == {"FAILED"}
+    assert len(results) == 2
@@ -0,0 +1,58 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import pytest
+
+from botocore.stub import Stubber, ANY
+
+from . import context
+from discovery import DISCOVERY_SERVICES, ResourceDiscovery, resourceExplorer
+
+
+@pytest.fixture(scope="function")
+def resource_explorer_stubber():
+    resource_explorer_stubber = Stubber(resourceExplorer)
+    resource_explorer_stubber.activate()
+    yield resource_explorer_stubber
+    resource_explorer_stubber.deactivate()
+
+
+def test_discovery_from_aggregator_index(resource_explorer_stubber):
+    resource_explorer_stubber.add_response("get_index", {"Type": "AGGREGATOR", "State": "ACTIVE"})
+    for service in DISCOVERY_SERVICES:
+        resource_explorer_stubber.add_response(
+            "search",
+            {"Resources": [], "Count": {"TotalResources": 3 if service == "sqs" else 0, "Complete": True}},
+            {"QueryString": ANY, "MaxResults": 1},
+        )
+    results = ResourceDiscovery(["eu-west-1"]).load()
+    resource_explorer_stubber.assert_no_pending_responses()
+    assert not results.is_empty("eu-west-1", "sqs")
+    assert results.is_empty("eu-west-1", "dynamodb")
+    # services which are not discovered are never pruned
+    assert not results.is_empty("eu-west-1", "guardduty")
+
+
+def test_discovery_probes_without_index(resource_explorer_stubber, monkeypatch):
+    resource_explorer_stubber.add_client_error("get_index", "ResourceNotFoundException")
+    monkeypatch.setattr(ResourceDiscovery, "probe_count", lambda self, region, service: None if service == "eks" else 0)
+    results = ResourceDiscovery(["eu-west-1"]).load()
+    assert results.is_empty("eu-west-1", "kinesis")
+    # services which could not be counted still run
+    assert not results.is_empty("eu-west-1", "eks")
@@ -0,0 +1,107 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import datetime
+import threading
+
+from botocore.exceptions import ClientError
+
+from . import context
+from distribution_collector import DistributionCollector, from_summary
+from auditors.aws.Amazon_CloudFront_Auditor import (
+    cloudfront_distro_default_root_object_check,
+    cloudfront_distro_logging_check,
+    cloudfront_waf_enabled_check,
+    distributionCollector,
+)
+
+
+def summary(distributionId, webAclId=""):
+    return {
+        "Id": distributionId,
+        "ARN": f"arn:aws:cloudfront::012345678901:distribution/{distributionId}",
+        "Status": "Deployed",
+        "LastModifiedTime": datetime.datetime(2021, 5, 9),
+        "DomainName": f"{distributionId.lower()}.cloudfront.net",
+        "WebACLId": webAclId,
+        "Enabled": True,
+    }
+
+
+class FakeCloudFront(object):
+    def __init__(self, distributions):
+        self.distributions = distributions
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_distribution(self, Id):
+        with self.lock:
+            self.calls.append(Id)
+        if Id not in self.distributions:
+            raise ClientError({"Error": {"Code": "NoSuchDistribution", "Message": "gone"}}, "GetDistribution")
+        return {"Distribution": self.distributions[Id]}
+
+
+def details(distributionId, loggingEnabled, defaultRootObject):
+    distribution = from_summary(summary(distributionId))
+    distribution["DistributionConfig"]["Logging"] = {"Enabled": loggingEnabled, "Bucket": ""}
+    distribution["DistributionConfig"]["DefaultRootObject"] = defaultRootObject
+    return distribution
+
+
+def test_from_summary_matches_get_distribution_shape():
+    distribution = from_summary(summary("E1", webAclId="acl"))
+    assert distribution["Id"] == "E1"
+    assert distribution["DomainName"] == "e1.cloudfront.net"
+    assert distribution["DistributionConfig"] == {"WebACLId": "acl", "Enabled": True}
+
+
+def test_distribution_collector_fetches_each_distribution_once():
+    client = FakeCloudFront({"E1": details("E1", True, "index.html"), "E2": details("E2", False, "")})
+    collector = DistributionCollector(client, maxWorkers=4)
+    summaries = [summary("E1"), summary("E2"), summary("E3")]
+    distributions = collector.collect(summaries)
+    # E3 was deleted after it was listed
+    assert sorted(distributions) == ["E1", "E2"]
+    collector.collect(summaries)
+    assert sorted(client.calls) == ["E1", "E2", "E3"]
+    # a modified distribution is fetched again
+    modified = summary("E1")
+    modified["LastModifiedTime"] = datetime.datetime(2021, 6, 1)
+    collector.collect([modified])
+    assert sorted(client.calls) == ["E1", "E1", "E2", "E3"]
+
+
+def test_checks_share_collected_distributions(monkeypatch):
+    client = FakeCloudFront({"E1": details("E1", True, "index.html"), "E2": details("E2", False, "")})
+    monkeypatch.setattr(distributionCollector, "client", client)
+    distributionCollector.clear()
+    checks = [cloudfront_distro_logging_check, cloudfront_distro_default_root_object_check, cloudfront_waf_enabled_check]
+    results = []
+    for check in checks:
+        # paginate() reads the list_distributions summaries from the cache
+        cache = {"items": [summary("E1", webAclId="acl"), summary("E2")]}
+        results.extend(
+            check(cache=cache, awsAccountId="012345678901", awsRegion="us-east-1", awsPartition="aws")
+        )
+    assert len(results) == 6
+    assert [result["RecordState"] for result in results] == ["ARCHIVED", "ACTIVE"] * 3
+    # the WAF Check only needs the summaries
+    assert sorted(client.calls) == ["E1", "E2"]
+    distributionCollector.clear()
@@ -55,3 +55,126 @@ def test_eeauditor_plugin_run_one_check():
     app.load_plugins(plugin_name="plugin1")
     for result in app.run_checks(requested_check_name="plugin_func_1"):
         assert result == {"SchemaVersion": "2018-10-08", "Id": "test-finding"}
+
+
+def test_eeauditor_skips_service_after_access_denied():
+    from botocore.exceptions import ClientError
+    from botocore.stub import Stubber
+    from eeauditor import sts
+
+    calls = []
+
+    def denied_check(cache, awsAccountId, awsRegion, awsPartition):
+        calls.append("denied_check")
+        raise ClientError({"Error": {"Code": "SubscriptionRequiredException", "Message": "denied"}}, "ListThings")
+        yield
+
+    def skipped_check(cache, awsAccountId, awsRegion, awsPartition):
+        calls.append("skipped_check")
+        yield {"SchemaVersion": "2018-10-08", "Id": "skipped-finding"}
+
+    identity = {"Account": "012345678901", "Arn": "arn:aws:iam::012345678901:user/test", "UserId": "test"}
+    with Stubber(sts) as sts_stubber:
+        sts_stubber.add_response("get_caller_identity", identity)
+        sts_stubber.add_response("get_caller_identity", identity)
+        app = EEAuditor(name="test controller", search_path="./tests/test_modules")
+        app.awsPartition = "aws-test"
+        app.registry.checks.clear()
+        app.registry.checks["denied"] = {"denied_check": denied_check, "skipped_check": skipped_check}
+        assert list(app.run_checks()) == []
+    assert calls == ["denied_check"]
+    assert app.deniedServices["denied"] == ("ListThings", "SubscriptionRequiredException", ["skipped_check"])
+
+
+def test_eeauditor_keeps_service_after_resource_access_denied():
+    from botocore.exceptions import ClientError
+    from botocore.stub import Stubber
+    from eeauditor import sts
+
+    calls = []
+
+    def bucket_policy_check(cache, awsAccountId, awsRegion, awsPartition):
+        calls.append("bucket_policy_check")
+        # one bucket's policy denies us, that says nothing about the other buckets or Checks
+        raise ClientError({"Error": {"Code": "AccessDenied", "Message": "denied"}}, "GetBucketPolicy")
+        yield
+
+    def bucket_versioning_check(cache, awsAccountId, awsRegion, awsPartition):
+        calls.append("bucket_versioning_check")
+        yield {"SchemaVersion": "2018-10-08", "Id": "versioning-finding"}
+
+    identity = {"Account": "012345678901", "Arn": "arn:aws:iam::012345678901:user/test", "UserId": "test"}
+    with Stubber(sts) as sts_stubber:
+        sts_stubber.add_response("get_caller_identity", identity)
+        sts_stubber.add_response("get_caller_identity", identity)
+        app = EEAuditor(name="test controller", search_path="./tests/test_modules")
+        app.awsPartition = "aws-test"
+        app.registry.checks.clear()
+        app.registry.checks["s3"] = {
+            "bucket_policy_check": bucket_policy_check,
+            "bucket_versioning_check": bucket_versioning_check,
+        }
+        assert list(app.run_checks()) == [{"SchemaVersion": "2018-10-08", "Id": "versioning-finding"}]
+    assert calls == ["bucket_policy_check", "bucket_versioning_check"]
+    assert app.deniedServices == {}
+    assert app.deniedOperations[("s3", "GetBucketPolicy")] == ("AccessDenied", ["bucket_policy_check"])
+
+
+def test_eeauditor_keeps_service_after_resource_list_denied():
+    from botocore.exceptions import ClientError
+    from botocore.stub import Stubber
+    from eeauditor import sts
+
+    calls = []
+
+    def access_key_check(cache, awsAccountId, awsRegion, awsPartition):
+        calls.append("access_key_check")
+        # ListAccessKeys is made per user, a policy denying it for one user does not deny IAM
+        raise ClientError({"Error": {"Code": "AccessDenied", "Message": "denied"}}, "ListAccessKeys")
+        yield
+
+    def mfa_check(cache, awsAccountId, awsRegion, awsPartition):
+        calls.append("mfa_check")
+        yield {"SchemaVersion": "2018-10-08", "Id": "mfa-finding"}
+
+    identity = {"Account": "012345678901", "Arn": "arn:aws:iam::012345678901:user/test", "UserId": "test"}
+    with Stubber(sts) as sts_stubber:
+        sts_stubber.add_response("get_caller_identity", identity)
+        sts_stubber.add_response("get_caller_identity", identity)
+        app = EEAuditor(name="test controller", search_path="./tests/test_modules")
+        app.awsPartition = "aws-test"
+        app.registry.checks.clear()
+        app.registry.checks["iam"] = {"access_key_check": access_key_check, "mfa_check": mfa_check}
+        assert list(app.run_checks()) == [{"SchemaVersion": "2018-10-08", "Id": "mfa-finding"}]
+    assert calls == ["access_key_check", "mfa_check"]
+    assert app.deniedServices == {}
+    assert app.deniedOperations[("iam", "ListAccessKeys")] == ("AccessDenied", ["access_key_check"])
+
+
+def test_eeauditor_prefetches_before_checks():
+    from botocore.stub import Stubber
+    from eeauditor import sts
+
+    calls = []
+
+    def prefetch(awsAccountId, awsRegion, awsPartition):
+        calls.append("prefetch")
+
+    def check(cache, awsAccountId, awsRegion, awsPartition):
+        calls.append("check")
+        yield {"SchemaVersion": "2018-10-08", "Id": "test-finding"}
+
+    identity = {"Account": "012345678901", "Arn": "arn:aws:iam::012345678901:user/test", "UserId": "test"}
+    with Stubber(sts) as sts_stubber:
+        sts_stubber.add_response("get_caller_identity", identity)
+        sts_stubber.add_response("get_caller_identity", identity)
+        app = EEAuditor(name="test controller", search_path="./tests/test_modules")
+        app.awsPartition = "aws-test"
+        app.registry.checks.clear()
+        app.registry.prefetchers.clear()
+        app.registry.checks["other"] = {"other_check": check}
+        app.registry.checks["prefetched"] = {"check": check}
+        app.registry.register_prefetch("prefetched")(prefetch)
+        app.registry.register_prefetch("unregistered")(prefetch)
+        assert len(list(app.run_checks())) == 2
+    assert calls == ["prefetch", "check", "check"]
@@ -0,0 +1,76 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+from botocore.exceptions import ClientError
+
+from . import context
+from image_resolver import ImageResolver
+
+
+class FakeEC2(object):
+    def __init__(self, images, missing=(), errorCode=None):
+        self.images = images
+        self.missing = missing
+        self.errorCode = errorCode
+        self.requests = []
+
+    def describe_images(self, ImageIds):
+        self.requests.append(ImageIds)
+        if self.errorCode:
+            raise ClientError({"Error": {"Code": self.errorCode, "Message": "error"}}, "DescribeImages")
+        if any(imageId in self.missing for imageId in ImageIds):
+            raise ClientError(
+                {"Error": {"Code": "InvalidAMIID.NotFound", "Message": "does not exist"}}, "DescribeImages"
+            )
+        return {"Images": [self.images[imageId] for imageId in ImageIds if imageId in self.images]}
+
+
+def image(imageId, state="available"):
+    return {"ImageId": imageId, "State": state, "CreationDate": "2021-05-09T00:00:00.000Z"}
+
+
+def test_image_resolver_describes_unique_images_in_batches():
+    client = FakeEC2({f"ami-{i}": image(f"ami-{i}") for i in range(5)})
+    resolver = ImageResolver(client, batchSize=2)
+    # the fleet was launched from a handful of AMIs
+    instanceImages = [f"ami-{i % 5}" for i in range(1000)]
+    images = resolver.resolve(instanceImages)
+    assert [len(request) for request in client.requests] == [2, 2, 1]
+    assert images["ami-3"]["State"] == "available"
+    # the second Check shares the first one's lookup
+    resolver.resolve(instanceImages)
+    assert len(client.requests) == 3
+
+
+def test_image_resolver_isolates_missing_images():
+    # ami-1 was deregistered a while ago and fails the request, ami-2 was just deregistered and is left out
+    client = FakeEC2({"ami-0": image("ami-0"), "ami-3": image("ami-3")}, missing=["ami-1"])
+    resolver = ImageResolver(client)
+    images = resolver.resolve(["ami-0", "ami-1", "ami-2", "ami-3"])
+    assert images == {"ami-0": image("ami-0"), "ami-1": None, "ami-2": None, "ami-3": image("ami-3")}
+    assert client.requests == [["ami-0", "ami-1", "ami-2", "ami-3"], ["ami-0", "ami-1"], ["ami-0"], ["ami-1"], ["ami-2", "ami-3"]]
+
+
+def test_image_resolver_leaves_failed_lookups_unresolved():
+    client = FakeEC2({"ami-0": image("ami-0")}, errorCode="RequestLimitExceeded")
+    resolver = ImageResolver(client)
+    assert resolver.resolve(["ami-0"]) == {}
+    # nothing was memoized, so the next Check tries again
+    client.errorCode = None
+    assert resolver.resolve(["ami-0"]) == {"ami-0": image("ami-0")}
@@ -0,0 +1,145 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import pytest
+
+from botocore.stub import Stubber, ANY
+
+from . import context
+from inventory import ConfigInventory, config
+
+
+def config_item(resourceType, resourceName, configuration, awsRegion="us-east-1"):
+    return json.dumps(
+        {
+            "accountId": "012345678901",
+            "awsRegion": awsRegion,
+            "resourceType": resourceType,
+            "resourceName": resourceName,
+            "resourceCreationTime": "2021-01-01T00:00:00.000Z",
+            "configuration": configuration,
+        }
+    )
+
+
+select_aggregate_resource_config_response = {
+    "Results": [
+        config_item(
+            "AWS::EC2::Instance",
+            "i-running",
+            {"instanceId": "i-running", "state": {"name": "running"}, "metadataOptions": {"httpTokens": "required"}},
+        ),
+        config_item("AWS::EC2::Instance", "i-stopped", {"instanceId": "i-stopped", "state": {"name": "stopped"}}),
+        config_item(
+            "AWS::EC2::SecurityGroup",
+            "sg-1",
+            {
+                "groupId": "sg-1",
+                "ipPermissions": [
+                    {"ipProtocol": "-1", "ipRanges": ["0.0.0.0/0"], "ipv4Ranges": [{"cidrIp": "0.0.0.0/0"}]}
+                ],
+            },
+        ),
+        config_item("AWS::RDS::DBInstance", "db-1", {"dBInstanceIdentifier": "db-1", "engine": "postgres"}),
+        config_item("AWS::RDS::DBInstance", "docdb-1", {"dBInstanceIdentifier": "docdb-1", "engine": "docdb"}),
+        config_item("AWS::S3::Bucket", "bucket-1", {"name": "bucket-1"}),
+        config_item("AWS::S3::Bucket", "bucket-2", {"name": "bucket-2"}, awsRegion="eu-west-1"),
+    ]
+}
+
+
+@pytest.fixture(scope="function")
+def config_stubber():
+    config_stubber = Stubber(config)
+    config_stubber.activate()
+    yield config_stubber
+    config_stubber.deactivate()
+
+
+def test_config_inventory_seeds_auditor_caches(config_stubber):
+    config_stubber.add_response(
+        "select_aggregate_resource_config",
+        select_aggregate_resource_config_response,
+        {"Expression": ANY, "ConfigurationAggregatorName": "org", "Limit": 100},
+    )
+    inventory = ConfigInventory("org", ["012345678901"]).load()
+    config_stubber.assert_no_pending_responses()
+
+    ec2Cache = inventory.seed("Amazon_EC2_Auditor", "012345678901", "us-east-1")
+    assert [i["InstanceId"] for i in ec2Cache["instances"]] == ["i-running", "i-stopped"]
+    assert ec2Cache["instances"][0]["MetadataOptions"]["HttpTokens"] == "required"
+    ssmCache = inventory.seed("Amazon_EC2_SSM_Auditor", "012345678901", "us-east-1")
+    assert [i["InstanceId"] for i in ssmCache["instances"]] == ["i-running"]
+    sgCache = inventory.seed("Amazon_EC2_Security_Group_Auditor", "012345678901", "us-east-1")
+    assert sgCache["describe_security_groups"]["SecurityGroups"][0]["IpPermissions"][0]["IpRanges"] == [
+        {"CidrIp": "0.0.0.0/0"}
+    ]
+    rdsCache = inventory.seed("Amazon_RDS_Auditor", "012345678901", "us-east-1")
+    assert [db["DBInstanceIdentifier"] for db in rdsCache["describe_db_instances"]] == ["db-1"]
+    s3Cache = inventory.seed("Amazon_S3_Auditor", "012345678901", "us-east-1")
+    # ListBuckets is global, so every Region is handed the buckets of all Regions
+    assert [b["Name"] for b in s3Cache["list_buckets"]["Buckets"]] == ["bucket-2", "bucket-1"]
+    # Auditors without an inventory mapping keep making their own calls
+    assert inventory.seed("Amazon_DocumentDB_Auditor", "012345678901", "us-east-1") == {}
+
+
+def test_config_inventory_falls_back_without_aggregated_resources(config_stubber):
+    config_stubber.add_response(
+        "select_aggregate_resource_config",
+        {"Results": [config_item("AWS::EC2::Instance", "i-running", {"instanceId": "i-running", "state": {"name": "running"}})]},
+        {"Expression": ANY, "ConfigurationAggregatorName": "org", "Limit": 100},
+    )
+    inventory = ConfigInventory("org").load()
+    # security groups are not recorded, so the Auditor has to describe them itself
+    assert inventory.seed("Amazon_EC2_Security_Group_Auditor", "012345678901", "us-east-1") == {}
+    # nothing was aggregated for this account and Region at all
+    assert inventory.seed("Amazon_EC2_Auditor", "012345678901", "ap-south-1") == {}
+    assert inventory.seed("Amazon_S3_Auditor", "210987654321", "us-east-1") == {}
+    assert "instances" in inventory.seed("Amazon_EC2_Auditor", "012345678901", "us-east-1")
+
+
+def test_config_inventory_queries_global_resource_types_in_every_region(config_stubber):
+    # the controller scopes the inventory to the account and Region being scanned
+    inventory = ConfigInventory("org", ["012345678901"], ["us-east-1"])
+    regionalExpression, globalExpression = inventory.expressions()
+    assert "awsRegion IN ('us-east-1')" in regionalExpression
+    assert "AWS::S3::Bucket" not in regionalExpression
+    assert "resourceType IN ('AWS::S3::Bucket')" in globalExpression
+    assert "awsRegion" not in globalExpression.partition("WHERE")[2]
+
+    config_stubber.add_response(
+        "select_aggregate_resource_config",
+        {"Results": [config_item("AWS::EC2::Instance", "i-running", {"instanceId": "i-running", "state": {"name": "running"}})]},
+        {"Expression": regionalExpression, "ConfigurationAggregatorName": "org", "Limit": 100},
+    )
+    config_stubber.add_response(
+        "select_aggregate_resource_config",
+        {
+            "Results": [
+                config_item("AWS::S3::Bucket", "bucket-1", {"name": "bucket-1"}),
+                config_item("AWS::S3::Bucket", "bucket-2", {"name": "bucket-2"}, awsRegion="eu-west-1"),
+            ]
+        },
+        {"Expression": globalExpression, "ConfigurationAggregatorName": "org", "Limit": 100},
+    )
+    inventory.load()
+    config_stubber.assert_no_pending_responses()
+    s3Cache = inventory.seed("Amazon_S3_Auditor", "012345678901", "us-east-1")
+    assert [b["Name"] for b in s3Cache["list_buckets"]["Buckets"]] == ["bucket-2", "bucket-1"]
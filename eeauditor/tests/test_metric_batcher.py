@@ -0,0 +1,94 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import datetime
+
+from . import context
+from metric_batcher import MetricBatcher
+
+
+def invocations(functionName):
+    return {
+        "Metric": {
+            "Namespace": "AWS/Lambda",
+            "MetricName": "Invocations",
+            "Dimensions": [{"Name": "FunctionName", "Value": functionName}],
+        },
+        "Period": 3600,
+        "Stat": "Sum",
+    }
+
+
+class FakePaginator(object):
+    def __init__(self, requests):
+        self.requests = requests
+
+    def paginate(self, MetricDataQueries, StartTime, EndTime):
+        self.requests.append(MetricDataQueries)
+        results = [
+            {
+                "Id": query["Id"],
+                "Timestamps": [EndTime],
+                "Values": [float(query["MetricStat"]["Metric"]["Dimensions"][0]["Value"].split("-")[1])],
+            }
+            for query in MetricDataQueries
+        ]
+        # split every request across two pages the way CloudWatch does when a request returns many datapoints
+        middle = len(results) // 2
+        yield {"MetricDataResults": results[:middle]}
+        yield {"MetricDataResults": results[middle:]}
+
+
+class FakeCloudWatch(object):
+    def __init__(self):
+        self.requests = []
+
+    def get_paginator(self, operationName):
+        assert operationName == "get_metric_data"
+        return FakePaginator(self.requests)
+
+
+def test_metric_batcher_packs_500_queries_per_request():
+    client = FakeCloudWatch()
+    batcher = MetricBatcher(client)
+    metricStats = {f"function-{i}": invocations(f"function-{i}") for i in range(501)}
+    series = batcher.get_series(metricStats, datetime.timedelta(days=30))
+    assert [len(request) for request in client.requests] == [500, 1]
+    assert len(series) == 501
+    assert series["function-0"]["Values"] == [0.0]
+    assert series["function-500"]["Values"] == [500.0]
+
+
+def test_metric_batcher_only_fetches_a_series_once():
+    client = FakeCloudWatch()
+    batcher = MetricBatcher(client)
+    batcher.get_series({"function-1": invocations("function-1")}, datetime.timedelta(days=30))
+    series = batcher.get_series(
+        {"function-1": invocations("function-1"), "function-2": invocations("function-2")},
+        datetime.timedelta(days=30),
+    )
+    assert [len(request) for request in client.requests] == [1, 1]
+    assert series["function-1"]["Values"] == [1.0]
+    assert series["function-2"]["Values"] == [2.0]
+    # a different lookback is a different series
+    batcher.get_series({"function-1": invocations("function-1")}, datetime.timedelta(days=1))
+    assert len(client.requests) == 3
+    batcher.clear()
+    batcher.get_series({"function-1": invocations("function-1")}, datetime.timedelta(days=30))
+    assert len(client.requests) == 4
@@ -0,0 +1,81 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import pytest
+
+from . import context
+import policy_analyzer
+from policy_analyzer import PolicyAnalyzer, analyze_document
+
+
+def policy(*statements):
+    return json.dumps({"Version": "2012-10-17", "Statement": list(statements)})
+
+
+@pytest.mark.parametrize(
+    "document,privilegeLevel,rating",
+    [
+        (policy({"Effect": "Allow", "Action": "*", "Resource": "*"}), "admin", "failed_high"),
+        (policy({"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"}), "admin", "failed_high"),
+        (policy({"Effect": "Allow", "Action": "iam:*", "Resource": "*"}), "service-admin", "failed_high"),
+        (policy({"Effect": "Allow", "Action": ["s3:*"], "Resource": ["arn:aws:s3:::bucket"]}), "service-admin", "failed_low"),
+        (policy({"Effect": "Allow", "Action": "s3:Put*", "Resource": "*"}), "write-wildcard", "failed_low"),
+        (policy({"Effect": "Allow", "Action": "s3:*Object", "Resource": "*"}), "write-wildcard", "failed_low"),
+        (policy({"Effect": "Allow", "Action": ["ec2:Describe*", "s3:get*"], "Resource": "*"}), "read-wildcard", "passing"),
+        (policy({"Effect": "Allow", "Action": "iam:ListRoles", "Resource": "*"}), "scoped", "passing"),
+        (policy({"Effect": "Deny", "Action": "*", "Resource": "*"}), "none", "passing"),
+        (
+            policy({"Effect": "Allow", "Action": "*", "Resource": "*", "Condition": {"Bool": {"aws:MultiFactorAuthPresent": "true"}}}),
+            "none",
+            "passing",
+        ),
+        # a later, narrower statement does not lower the rating of an earlier one
+        (
+            policy(
+                {"Effect": "Allow", "Action": "*", "Resource": "*"},
+                {"Effect": "Allow", "Action": "iam:*", "Resource": ["arn:aws:iam::012345678901:role/*"]},
+            ),
+            "admin",
+            "failed_high",
+        ),
+        # a single statement does not have to be in a list
+        ({"Version": "2012-10-17", "Statement": {"Effect": "Allow", "Action": "sqs:*", "Resource": "*"}}, "service-admin", "failed_high"),
+    ],
+)
+def test_analyze_document(document, privilegeLevel, rating):
+    assert analyze_document(document) == {"PrivilegeLevel": privilegeLevel, "Rating": rating}
+
+
+def test_policy_analyzer_memoizes_by_document(monkeypatch):
+    analyzed = []
+
+    def analyze_documents(documents):
+        analyzed.extend(documents)
+        return [analyze_document(document) for document in documents]
+
+    monkeypatch.setattr(policy_analyzer, "analyze_documents", analyze_documents)
+    analyzer = PolicyAnalyzer()
+    shared = {"Statement": [{"Effect": "Allow", "Action": "*", "Resource": "*"}]}
+    # the same document with different formatting and key order is the same policy
+    reformatted = '{"Statement": [{"Resource": "*", "Action": "*", "Effect": "Allow"}]}'
+    results = analyzer.analyze_many([shared, reformatted, shared])
+    assert [result["Rating"] for result in results] == ["failed_high"] * 3
+    assert analyzer.analyze(shared)["PrivilegeLevel"] == "admin"
+    assert len(analyzed) == 1
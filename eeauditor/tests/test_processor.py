@@ -0,0 +1,517 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import json
+import pytest
+
+from botocore.stub import Stubber
+
+from . import context
+from processor import main
+from processor.main import dedupe_findings, process_findings, replay_findings
+from processor.outbox import Outbox
+from processor.outputs.output_base import ElectricEyeOutput
+from processor.payload import FindingsPayload
+from processor.validator import validate_findings
+
+
+
+def asff_finding(findingId, recordState):
+    return {
+        "SchemaVersion": "2018-10-08",
+        "Id": findingId,
+        "ProductArn": "arn:aws:securityhub:us-east-1:012345678901:product/012345678901/default",
+        "GeneratorId": findingId,
+        "AwsAccountId": "012345678901",
+        "Types": ["Software and Configuration Checks/AWS Security Best Practices"],
+        "FirstObservedAt": "2022-03-08T12:00:00.000000+00:00",
+        "CreatedAt": "2022-03-08T12:00:00.000000+00:00",
+        "UpdatedAt": "2022-03-08T12:00:00.000000+00:00",
+        "Severity": {"Label": "INFORMATIONAL"},
+        "Confidence": 99,
+        "Title": "[Test.1] Test findings should be valid",
+        "Description": "Test finding",
+        "Remediation": {"Recommendation": {"Text": "None", "Url": "https://example.com"}},
+        "ProductFields": {"Product Name": "ElectricEye"},
+        "Resources": [
+            {
+                "Type": "Other",
+                "Id": findingId,
+                "Partition": "aws",
+                "Region": "us-east-1",
+                "Details": {"Other": {"Name": findingId}},
+            }
+        ],
+        "Compliance": {"Status": "PASSED", "RelatedRequirements": ["NIST CSF ID.AM-2"]},
+        "Workflow": {"Status": "RESOLVED"},
+        "RecordState": recordState,
+    }
+
+
+findings = [
+    asff_finding("finding-1", "ACTIVE"),
+    asff_finding("finding-2", "ACTIVE"),
+    asff_finding("finding-1", "ARCHIVED"),
+]
+
+
+def test_dedupe_last_write_wins():
+    results = dedupe_findings(findings, "last")
+    assert [r["Id"] for r in results] == ["finding-1", "finding-2"]
+    assert results[0]["RecordState"] == "ARCHIVED"
+
+
+def test_dedupe_first_write_wins():
+    results = dedupe_findings(findings, "first")
+    assert [r["Id"] for r in results] == ["finding-1", "finding-2"]
+    assert results[0]["RecordState"] == "ACTIVE"
+
+
+def test_dedupe_none():
+    assert dedupe_findings(findings, "none") == findings
+
+
+def test_dedupe_invalid_policy():
+    with pytest.raises(ValueError):
+        dedupe_findings(findings, "random")
+
+
+def test_payload_serialized_once():
+    payload = FindingsPayload(findings)
+    serialized = payload.serialized
+    assert len(serialized) == len(findings)
+    assert json.loads(serialized[0]) == findings[0]
+    assert payload.serialized is serialized
+
+
+def test_payload_normalized_drops_incomplete_findings():
+    normalized = FindingsPayload([findings[0], {"Id": "finding-3"}]).normalized
+    assert [row["Id"] for row in normalized] == ["finding-1"]
+
+
+def test_validator_trims_oversized_finding():
+    finding = asff_finding("finding-1", "ACTIVE")
+    finding["Description"] = "x" * 2000
+    finding["Resources"][0]["Details"] = {"Other": {"Blob": "x" * 300 * 1024}}
+    validFindings, serialized, report = validate_findings([finding])
+    assert len(validFindings) == 1
+    assert json.loads(serialized[0]) == finding
+    assert len(finding["Description"]) == 1024
+    assert "Details" not in finding["Resources"][0]
+    assert report["Test.1"]["Trimmed"] == 1
+
+
+def test_validator_drops_invalid_finding():
+    finding = asff_finding("finding-1", "ACTIVE")
+    finding["Severity"] = {"Label": "PASSED"}
+    finding["CreatedAt"] = "08/03/2022"
+    del finding["Title"]
+    validFindings, serialized, report = validate_findings([finding, asff_finding("finding-2", "ACTIVE")])
+    assert [f["Id"] for f in validFindings] == ["finding-2"]
+    assert report["finding-1"]["Dropped"] == 1
+
+
+@ElectricEyeOutput
+class FlakyProvider(object):
+    __provider__ = "test_flaky"
+    available = False
+    written = []
+
+    def write_findings(self, findings: list, **kwargs):
+        if not FlakyProvider.available:
+            raise ConnectionError("output is unreachable")
+        FlakyProvider.written.extend(findings)
+        return True
+
+
+def test_outbox_replay_after_failed_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "BACKOFF_SECONDS", 0)
+    outboxFile = str(tmp_path / "outbox.db")
+    with pytest.raises(ConnectionError):
+        process_findings(findings, ["test_flaky"], outbox_file=outboxFile, output_file="")
+    pendingRuns = Outbox(outboxFile).pending_runs()
+    assert len(pendingRuns) == 1
+    assert pendingRuns[0][2] == ["test_flaky"]
+
+    FlakyProvider.available = True
+    replay_findings(outboxFile)
+    assert [f["Id"] for f in FlakyProvider.written] == ["finding-1", "finding-2"]
+    assert Outbox(outboxFile).pending_runs() == []
+
+
+
+@ElectricEyeOutput
+class RecordingProvider(object):
+    __provider__ = "test_recording"
+    written = []
+
+    def write_findings(self, findings: list, **kwargs):
+        RecordingProvider.written.extend(f["Id"] for f in findings)
+        return True
+
+
+@ElectricEyeOutput
+class OtherRecordingProvider(object):
+    __provider__ = "test_other_recording"
+    written = []
+
+    def write_findings(self, findings: list, payload=None, **kwargs):
+        OtherRecordingProvider.written.extend(json.loads(doc)["Id"] for doc in payload.serialized)
+        return True
+
+
+def test_rules_suppress_and_route(tmp_path):
+    ruleFindings = [asff_finding(f"finding-{i}", "ACTIVE") for i in range(4)]
+    ruleFindings[1]["Resources"][0]["Id"] = "arn:aws:s3:::sandbox-bucket"
+    ruleFindings[2]["Severity"]["Label"] = "CRITICAL"
+    ruleFindings[3]["Resources"][0]["Tags"] = {"Environment": "prod-eu"}
+    rulesFile = tmp_path / "rules.json"
+    rulesFile.write_text(json.dumps([
+        {"Name": "sandbox", "Action": "suppress", "CheckId": ["Test.1"], "ResourceArn": ["arn:aws:s3:::sandbox-*"]},
+        {"Name": "critical", "Action": "route", "Outputs": ["test_other_recording"], "Severity": ["CRITICAL"]},
+        {"Name": "prod", "Action": "suppress", "Outputs": ["test_other_recording"], "Tags": {"Environment": "prod-*"}},
+    ]))
+    RecordingProvider.written = []
+    OtherRecordingProvider.written = []
+    process_findings(ruleFindings, ["test_recording", "test_other_recording"], rules_file=str(rulesFile), output_file="")
+    assert sorted(RecordingProvider.written) == ["finding-0", "finding-3"]
+    assert sorted(OtherRecordingProvider.written) == ["finding-0", "finding-2"]
+
+
+def test_outbox_replays_routed_run_without_rules_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "BACKOFF_SECONDS", 0)
+    ruleFindings = [asff_finding(f"finding-{i}", "ACTIVE") for i in range(4)]
+    ruleFindings[1]["Resources"][0]["Id"] = "arn:aws:s3:::sandbox-bucket"
+    ruleFindings[2]["Severity"]["Label"] = "CRITICAL"
+    rulesFile = tmp_path / "rules.json"
+    rulesFile.write_text(json.dumps([
+        {"Name": "sandbox", "Action": "suppress", "CheckId": ["Test.1"], "ResourceArn": ["arn:aws:s3:::sandbox-*"]},
+        {"Name": "critical", "Action": "route", "Outputs": ["test_recording"], "Severity": ["CRITICAL"]},
+    ]))
+    outboxFile = str(tmp_path / "outbox.db")
+    RecordingProvider.written = []
+    FlakyProvider.available = False
+    FlakyProvider.written = []
+    with pytest.raises(ConnectionError):
+        process_findings(
+            ruleFindings, ["test_recording", "test_flaky"], outbox_file=outboxFile, rules_file=str(rulesFile), output_file=""
+        )
+    assert sorted(RecordingProvider.written) == ["finding-0", "finding-2", "finding-3"]
+
+    # the rules are not given again, the routes recorded with the run still keep finding-2 from test_flaky
+    FlakyProvider.available = True
+    replay_findings(outboxFile)
+    assert [f["Id"] for f in FlakyProvider.written] == ["finding-0", "finding-3"]
+    assert Outbox(outboxFile).pending_runs() == []
+
+def test_firehose_retries_only_failed_records(monkeypatch):
+    from processor.outputs import kinesis
+
+    monkeypatch.setenv("FIREHOSE_DELIVERY_STREAM_NAME", "electriceye")
+    monkeypatch.setattr(kinesis, "BACKOFF_SECONDS", 0)
+    provider = kinesis.FirehoseProvider()
+    serialized = FindingsPayload(findings).serialized
+    with Stubber(provider.firehose) as firehose_stubber:
+        firehose_stubber.add_response(
+            "put_record_batch",
+            {
+                "FailedPutCount": 1,
+                "RequestResponses": [
+                    {"RecordId": "1"},
+                    {"ErrorCode": "ServiceUnavailableException", "ErrorMessage": "Slow down"},
+                    {"RecordId": "3"},
+                ],
+            },
+            {
+                "DeliveryStreamName": "electriceye",
+                "Records": [{"Data": (document + "\n").encode("utf-8")} for document in serialized],
+            },
+        )
+        firehose_stubber.add_response(
+            "put_record_batch",
+            {"FailedPutCount": 0, "RequestResponses": [{"RecordId": "2"}]},
+            {
+                "DeliveryStreamName": "electriceye",
+                "Records": [{"Data": (serialized[1] + "\n").encode("utf-8")}],
+            },
+        )
+        assert provider.write_findings(findings)
+        firehose_stubber.assert_no_pending_responses()
+
+
+def test_kinesis_batches_within_request_limits(monkeypatch):
+    from processor.outputs import kinesis
+
+    monkeypatch.setenv("KINESIS_STREAM_NAME", "electriceye")
+    provider = kinesis.KinesisProvider()
+    records = [{"Data": b"x" * 1024 * 1024, "PartitionKey": "key"} for _ in range(5)]
+    records += [{"Data": b"x", "PartitionKey": "key"} for _ in range(600)]
+    batches = list(provider.batches(records))
+    assert [len(batch) for batch in batches] == [3, 500, 102]
+
+
+class FakeS3(object):
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.uploads[Key] = []
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[Key].append(Body)
+        return {"ETag": str(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = b"".join(self.uploads.pop(Key))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(Key)
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.objects[Key] = Body
+
+
+@pytest.mark.parametrize("outputFormat,manifests", [("ndjson", 2), ("parquet", 0)])
+def test_s3_partitions_on_utc_date_for_every_format(monkeypatch, outputFormat, manifests):
+    from processor.outputs.s3 import S3Provider
+
+    monkeypatch.setenv("S3_OUTPUT_BUCKET", "electriceye-findings")
+    monkeypatch.setenv("S3_OUTPUT_FORMAT", outputFormat)
+    provider = S3Provider()
+    provider.s3 = FakeS3()
+    finding = asff_finding("finding-1", "ACTIVE")
+    # 23:30 at UTC-2 is already the next day in UTC
+    finding["CreatedAt"] = "2022-03-08T23:30:00.000000-02:00"
+    assert provider.write_findings([finding], "output")
+
+    keys = sorted(provider.s3.objects)
+    dataKeys = [key for key in keys if "/manifests/" not in key]
+    assert len(dataKeys) == 1
+    assert "/AwsAccountId=012345678901/Region=us-east-1/date=2022-03-09/" in dataKeys[0]
+    # QuickSight manifests can only describe the ndjson objects
+    assert len(keys) - len(dataKeys) == manifests
+
+
+def test_process_findings_drops_findings_without_an_id():
+    RecordingProvider.written = []
+    withoutId = asff_finding("finding-2", "ACTIVE")
+    del withoutId["Id"]
+    process_findings([asff_finding("finding-1", "ACTIVE"), withoutId, "not a finding", None], ["test_recording"])
+    assert RecordingProvider.written == ["finding-1"]
+
+
+def sqlite_rows(dbFile, query):
+    import sqlite3
+
+    conn = sqlite3.connect(dbFile)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_sqlite_upsert_keeps_first_observed_at_and_replaces_children(tmp_path):
+    from processor.outputs.sqlite import SqliteProvider
+
+    outputFile = str(tmp_path / "findings")
+    dbFile = f"{outputFile}.db"
+    first = asff_finding("finding-1", "ACTIVE")
+    first["Resources"].append({"Type": "Other", "Id": "resource-2", "Partition": "aws", "Region": "us-east-1"})
+    assert SqliteProvider().write_findings([first], outputFile)
+
+    rescan = asff_finding("finding-1", "ARCHIVED")
+    rescan["FirstObservedAt"] = "2022-04-08T12:00:00.000000+00:00"
+    rescan["UpdatedAt"] = "2022-04-08T12:00:00.000000+00:00"
+    rescan["Compliance"]["RelatedRequirements"] = ["NIST CSF PR.AC-1", "NIST SP 800-53 AC-1"]
+    assert SqliteProvider().write_findings([rescan], outputFile)
+
+    assert sqlite_rows(dbFile, "SELECT first_observed_at, updated_at, record_state, control_id FROM findings") == [
+        ("2022-03-08T12:00:00.000000+00:00", "2022-04-08T12:00:00.000000+00:00", "ARCHIVED", "Test.1")
+    ]
+    assert sqlite_rows(dbFile, "SELECT resource_id FROM resources") == [("finding-1",)]
+    assert sorted(sqlite_rows(dbFile, "SELECT requirement FROM compliance_requirements")) == [
+        ("NIST CSF PR.AC-1",),
+        ("NIST SP 800-53 AC-1",),
+    ]
+    indexes = sqlite_rows(dbFile, "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'findings'")
+    assert ("idx_findings_control_id",) in indexes
+
+
+def test_sqlite_batch_with_duplicate_id_writes_one_row(tmp_path):
+    from processor.outputs.sqlite import SqliteProvider
+
+    outputFile = str(tmp_path / "findings")
+    assert SqliteProvider().write_findings(findings, outputFile)
+    assert sqlite_rows(f"{outputFile}.db", "SELECT id, record_state FROM findings ORDER BY id") == [
+        ("finding-1", "ARCHIVED"),
+        ("finding-2", "ACTIVE"),
+    ]
+    assert sqlite_rows(f"{outputFile}.db", "SELECT COUNT(*) FROM resources") == [(2,)]
+    assert sqlite_rows(f"{outputFile}.db", "SELECT COUNT(*) FROM compliance_requirements") == [(2,)]
+
+
+def test_sqlite_migrates_stores_without_control_id(tmp_path):
+    import sqlite3
+    from processor.outputs.sqlite import SqliteProvider
+
+    outputFile = str(tmp_path / "findings")
+    conn = sqlite3.connect(f"{outputFile}.db")
+    conn.execute("CREATE TABLE findings(id TEXT PRIMARY KEY, schema_version TEXT, product_arn TEXT, generator_id TEXT, "
+                 "aws_account_id TEXT, types TEXT, first_observed_at TEXT, created_at TEXT, updated_at TEXT, "
+                 "severity_label TEXT, confidence INTEGER, title TEXT, description TEXT, recommendation_text TEXT, "
+                 "recommendation_url TEXT, compliance_status TEXT, workflow_status TEXT, record_state TEXT, finding TEXT)")
+    conn.close()
+    assert SqliteProvider().write_findings([asff_finding("finding-1", "ACTIVE")], outputFile)
+    assert sqlite_rows(f"{outputFile}.db", "SELECT control_id FROM findings") == [("Test.1",)]
+
+
+def test_parquet_round_trips_partitioned_findings(tmp_path):
+    import glob
+    import os
+    import pyarrow.parquet as pq
+    from processor.outputs.parquet import DICTIONARY_COLUMNS, PARQUET_SCHEMA, ParquetProvider
+
+    outputFile = str(tmp_path / "findings")
+    otherRegion = asff_finding("finding-3", "ACTIVE")
+    otherRegion["Resources"][0]["Region"] = "eu-west-1"
+    otherRegion["Compliance"]["RelatedRequirements"] = ["NIST CSF PR.AC-1", "ISO 27001:2013 A.9.1.1"]
+    assert ParquetProvider().write_findings(findings + [otherRegion], outputFile)
+
+    files = sorted(os.path.relpath(path, f"{outputFile}-parquet") for path in glob.glob(f"{outputFile}-parquet/**/*.parquet", recursive=True))
+    assert [os.path.dirname(path) for path in files] == [
+        "AwsAccountId=012345678901/Region=eu-west-1/date=2022-03-08",
+        "AwsAccountId=012345678901/Region=us-east-1/date=2022-03-08",
+    ]
+
+    parquetFile = pq.ParquetFile(os.path.join(f"{outputFile}-parquet", files[1]))
+    # partition columns are only in the path
+    assert parquetFile.schema_arrow == PARQUET_SCHEMA
+    rowGroup = parquetFile.metadata.row_group(0)
+    encodings = {rowGroup.column(i).path_in_schema: rowGroup.column(i).encodings for i in range(rowGroup.num_columns)}
+    for column in DICTIONARY_COLUMNS:
+        assert any("DICTIONARY" in encoding for encoding in encodings[column]), column
+    assert not any("DICTIONARY" in encoding for encoding in encodings["Id"])
+
+    table = pq.read_table(f"{outputFile}-parquet", partitioning="hive")
+    rows = {row["Id"]: row for row in table.to_pylist()}
+    # duplicate Ids are removed before outputs, the provider writes whatever it is handed
+    assert table.num_rows == 4
+    assert str(rows["finding-3"]["AwsAccountId"]) == "012345678901"
+    assert rows["finding-3"]["Region"] == "eu-west-1"
+    assert rows["finding-3"]["ComplianceRelatedRequirements"] == ["NIST CSF PR.AC-1", "ISO 27001:2013 A.9.1.1"]
+    assert rows["finding-3"]["ResourceDetails"] == str(otherRegion["Resources"][0]["Details"])
+    assert rows["finding-3"]["CreatedAt"].isoformat() == "2022-03-08T12:00:00+00:00"
+
+
+def read_csv(path, opener=open):
+    import csv
+
+    with opener(path, "rt", newline="") as csvfile:
+        return list(csv.reader(csvfile))
+
+
+def test_csv_writes_default_columns_in_order(tmp_path, monkeypatch):
+    from processor.outputs.csv import DEFAULT_CSV_COLUMNS, CsvProvider
+
+    monkeypatch.delenv("CSV_COLUMNS", raising=False)
+    monkeypatch.delenv("CSV_GZIP", raising=False)
+    incomplete = asff_finding("finding-3", "ACTIVE")
+    del incomplete["Compliance"]
+    del incomplete["Remediation"]["Recommendation"]
+    outputFile = str(tmp_path / "findings")
+    # findings are consumed as an iterable
+    assert CsvProvider().write_findings(iter([findings[0], incomplete]), outputFile)
+
+    rows = read_csv(f"{outputFile}.csv")
+    assert rows[0] == [column["name"] for column in DEFAULT_CSV_COLUMNS]
+    assert rows[1][rows[0].index("Severity")] == "INFORMATIONAL"
+    assert rows[1][rows[0].index("Compliance Status")] == "PASSED"
+    # missing keys are written as empty cells rather than failing the finding
+    assert rows[2][rows[0].index("Compliance Status")] == ""
+    assert rows[2][rows[0].index("Remediation Recommendation Link")] == ""
+    assert len(rows) == 3
+
+
+def test_csv_custom_columns_join_lists_and_gzip(tmp_path, monkeypatch):
+    import gzip
+    from processor.outputs.csv import CsvProvider
+
+    monkeypatch.setenv(
+        "CSV_COLUMNS",
+        "Requirements=Compliance.RelatedRequirements, Id, Resource=Resources.0.Id, Missing=Resources.5.Id, Resources.Id",
+    )
+    monkeypatch.setenv("CSV_GZIP", "true")
+    finding = asff_finding("finding-1", "ACTIVE")
+    finding["Compliance"]["RelatedRequirements"] = ["NIST CSF PR.AC-1", "NIST SP 800-53 AC-1"]
+    outputFile = str(tmp_path / "findings")
+    assert CsvProvider().write_findings([finding], outputFile)
+
+    rows = read_csv(f"{outputFile}.csv.gz", gzip.open)
+    assert rows == [
+        ["Requirements", "Id", "Resource", "Missing", "Resources.Id"],
+        ["NIST CSF PR.AC-1, NIST SP 800-53 AC-1", "finding-1", "finding-1", "", ""],
+    ]
+
+
+def test_output_registry_imports_providers_lazily(monkeypatch):
+    import sys
+
+    providerModules = set(ElectricEyeOutput._modules.values())
+    monkeypatch.setattr(ElectricEyeOutput, "_outputs", {})
+    for module in providerModules:
+        if module in sys.modules:
+            monkeypatch.delitem(sys.modules, module)
+
+    # listing the providers (--list-options) does not import any of them
+    assert set(ElectricEyeOutput._modules) <= set(ElectricEyeOutput.get_all_providers())
+    assert not providerModules & set(sys.modules)
+
+    provider = ElectricEyeOutput.get_provider("csv")
+    assert provider.__provider__ == "csv"
+    assert providerModules & set(sys.modules) == {"processor.outputs.csv"}
+
+    assert ElectricEyeOutput.get_provider("not_a_provider") is None
+    assert providerModules & set(sys.modules) == {"processor.outputs.csv"}
+
+
+
+@ElectricEyeOutput
+class MisconfiguredProvider(object):
+    __provider__ = "test_misconfigured"
+    attempts = 0
+
+    def write_findings(self, findings: list, **kwargs):
+        MisconfiguredProvider.attempts += 1
+        # the way providers give up on missing configuration such as an SSM parameter
+        exit(2)
+
+
+def test_write_output_does_not_retry_exit(tmp_path, monkeypatch):
+    slept = []
+    monkeypatch.setattr(main, "sleep", slept.append)
+    outboxFile = str(tmp_path / "outbox.db")
+    MisconfiguredProvider.attempts = 0
+    with pytest.raises(SystemExit):
+        process_findings(findings, ["test_misconfigured"], outbox_file=outboxFile, output_file="")
+    assert MisconfiguredProvider.attempts == 1
+    assert slept == []
+    # the failed delivery is kept in the outbox for a replay once the configuration is fixed
+    assert Outbox(outboxFile).pending_runs()[0][2] == ["test_misconfigured"]
@@ -0,0 +1,79 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import pytest
+
+from . import context
+from shodan_client import ShodanClient
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class FakeSession(object):
+    def __init__(self, responses):
+        self.responses = responses
+        self.requested = []
+
+    def get(self, url, params=None, timeout=None):
+        ip = url.rpartition("/")[2]
+        self.requested.append(ip)
+        assert params == {"key": "test-key"}
+        assert timeout
+        return self.responses[ip]
+
+
+responses = {
+    "203.0.113.10": FakeResponse(200, {"ip_str": "203.0.113.10", "ports": [443]}),
+    "203.0.113.11": FakeResponse(404, {"error": "No information available for that IP."}),
+    "203.0.113.12": FakeResponse(401, {"error": "Invalid API key"}),
+}
+
+
+def test_shodan_lookups_are_deduped_and_cached(tmp_path):
+    cacheFile = str(tmp_path / "shodan-cache.json")
+    client = ShodanClient("test-key", cacheFile=cacheFile, requestsPerSecond=1000)
+    client.session = FakeSession(responses)
+    results = client.lookup_many(["203.0.113.10", "203.0.113.11", "203.0.113.10", "203.0.113.12"])
+    assert sorted(client.session.requested) == ["203.0.113.10", "203.0.113.11", "203.0.113.12"]
+    assert results["203.0.113.11"] == {"error": "No information available for that IP."}
+
+    # the next run only asks again for the answer which was an error
+    nextRun = ShodanClient("test-key", cacheFile=cacheFile, requestsPerSecond=1000)
+    nextRun.session = FakeSession(responses)
+    assert nextRun.lookup("203.0.113.10") == {"ip_str": "203.0.113.10", "ports": [443]}
+    nextRun.lookup_many(["203.0.113.11", "203.0.113.12"])
+    assert nextRun.session.requested == ["203.0.113.12"]
+
+
+def test_shodan_cache_expires(tmp_path):
+    cacheFile = str(tmp_path / "shodan-cache.json")
+    client = ShodanClient("test-key", cacheFile=cacheFile, requestsPerSecond=1000)
+    client.session = FakeSession(responses)
+    client.lookup("203.0.113.10")
+    expired = ShodanClient("test-key", cacheFile=cacheFile, cacheTtl=0, requestsPerSecond=1000)
+    expired.session = FakeSession(responses)
+    expired.lookup("203.0.113.10")
+    assert expired.session.requested == ["203.0.113.10"]
@@ -0,0 +1,101 @@
+#This file is part of ElectricEye.
+#SPDX-License-Identifier: Apache-2.0
+
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+
+#http://www.apache.org/licenses/LICENSE-2.0
+
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+import pytest
+
+from botocore.stub import Stubber
+
+from . import context
+from tag_enrichment import TagIndex, parse_tag_scope, tagging
+
+get_resources_response = {
+    "ResourceTagMappingList": [
+        {
+            "ResourceARN": "arn:aws:s3:::prod-bucket",
+            "Tags": [{"Key": "Environment", "Value": "prod"}, {"Key": "aws:cloudformation:stack-name", "Value": "stack"}],
+        },
+        {
+            "ResourceARN": "arn:aws:s3:::dev-bucket",
+            "Tags": [{"Key": "Environment", "Value": "dev"}],
+        },
+    ]
+}
+
+
+def finding(arn):
+    return {"Id": arn, "Resources": [{"Type": "AwsS3Bucket", "Id": arn, "Tags": {"Owner": "security"}}]}
+
+
+@pytest.fixture(scope="function")
+def tagging_stubber():
+    tagging_stubber = Stubber(tagging)
+    tagging_stubber.activate()
+    yield tagging_stubber
+    tagging_stubber.deactivate()
+
+
+def test_parse_tag_scope():
+    assert parse_tag_scope(["Environment=prod", "Environment=staging", "Owner"]) == {
+        "Environment": ["prod", "staging"],
+        "Owner": [],
+    }
+
+
+def test_tag_index_enrich_and_scope(tagging_stubber):
+    tagging_stubber.add_response("get_resources", get_resources_response)
+    index = TagIndex(parse_tag_scope(["Environment=prod"])).load()
+    tagging_stubber.assert_no_pending_responses()
+
+    enriched = index.enrich(finding("arn:aws:s3:::prod-bucket"))
+    assert enriched["Resources"][0]["Tags"] == {"Environment": "prod", "Owner": "security"}
+    assert index.in_scope(finding("arn:aws:s3:::prod-bucket"))
+    assert not index.in_scope(finding("arn:aws:s3:::dev-bucket"))
+    # the Tagging API leaves out resources which were never tagged, they cannot match the scope
+    assert not index.in_scope(finding("arn:aws:s3:::untagged-bucket"))
+    # resources which are not identified by an ARN cannot be judged
+    assert index.in_scope(finding("203.0.113.10"))
+    assert TagIndex().in_scope(finding("arn:aws:s3:::untagged-bucket"))
+
+
+def test_eeauditor_only_enriches_with_enrich_tags(tagging_stubber):
+    from botocore.stub import Stubber
+    from eeauditor import EEAuditor, sts
+
+    def check(cache, awsAccountId, awsRegion, awsPartition):
+        yield finding("arn:aws:s3:::prod-bucket")
+        yield finding("arn:aws:s3:::dev-bucket")
+
+    tagging_stubber.add_response("get_resources", get_resources_response)
+    tagging_stubber.add_response("get_resources", get_resources_response)
+    scopeOnly = TagIndex(parse_tag_scope(["Environment=prod"]), enrichTags=False).load()
+    scopeAndEnrich = TagIndex(parse_tag_scope(["Environment=prod"])).load()
+
+    identity = {"Account": "012345678901", "Arn": "arn:aws:iam::012345678901:user/test", "UserId": "test"}
+    with Stubber(sts) as sts_stubber:
+        for _ in range(3):
+            sts_stubber.add_response("get_caller_identity", identity)
+        app = EEAuditor(name="test controller", search_path="./tests/test_modules")
+        app.awsPartition = "aws-test"
+        app.registry.checks.clear()
+        app.registry.checks["s3"] = {"check": check}
+        scoped = list(app.run_checks(tag_index=scopeOnly))
+        enriched = list(app.run_checks(tag_index=scopeAndEnrich))
+    assert [f["Id"] for f in scoped] == ["arn:aws:s3:::prod-bucket"]
+    assert scoped[0]["Resources"][0]["Tags"] == {"Owner": "security"}
+    assert enriched[0]["Resources"][0]["Tags"] == {"Environment": "prod", "Owner": "security"}
@@ -296,6 +296,9 @@ resource "aws_iam_role_policy" "Electric_Eye_Task_Role_Policy" {
                 "iam:ListUserPolicies",
                 "iam:ListAttachedUserPolicies",
                 "iam:ListServerCertificates",
+                "iam:GetAccountAuthorizationDetails",
+                "iam:GenerateCredentialReport",
+                "iam:GetCredentialReport",
                 "macie2:GetMacieSession",
                 "managedblockchain:Get*",
                 "managedblockchain:List*",
@@ -339,6 +342,7 @@ resource "aws_iam_role_policy" "Electric_Eye_Task_Role_Policy" {
                 "backup:DescribeProtectedResource",
                 "s3:GetEncryptionConfiguration",
                 "s3:GetBucketLogging",
+                "s3:GetBucketLocation",
                 "s3:GetBucketPolicy",
                 "s3:GetBucketPolicyStatus",
                 "s3:GetBucketVersioning",